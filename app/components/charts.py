@@ -1,25 +1,31 @@
 import plotly.graph_objects as go
-import plotly.express as px
 import sys
 import os
 import pandas as pd
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.constants import COLORS, CHART_CONFIG, QUALITY_THRESHOLDS, GAUGE_CONFIG
+from utils.perf import timed
+from utils.party_index import last_parties_rows
+from utils.status import (
+    STATUS_GOOD, STATUS_WARN, STATUS_BAD, PROBLEM_BANDS, PROBLEM_PALETTE,
+    check_values, status_codes, quality_status, trend_status, status_colors, band_colors
+)
 import numpy as np
 
 
+@timed('charts.create_gauge_chart')
 def create_gauge_chart(value, config_key, good_count=None, total_count=None):
     """Создание анимированного gauge-индикатора в стиле спидометра"""
     config = GAUGE_CONFIG[config_key]
     
     # Определяем статус (хорошо/плохо)
     if config_key == 'cv':
-        is_good = value <= config['threshold']
+        is_good = check_values(value, config['threshold'], 'less')
     elif config_key == 'density':
-        is_good = config['range'][0] <= value <= config['range'][1]
+        is_good = check_values(value, config['range'], 'range')
     else:
-        is_good = value >= config['threshold']
+        is_good = check_values(value, config['threshold'], 'greater')
     
     # Цвет стрелки в зависимости от статуса
     needle_color = COLORS['success'] if is_good else COLORS['danger']
@@ -83,12 +89,14 @@ def create_gauge_chart(value, config_key, good_count=None, total_count=None):
     return fig
 
 
-def create_heatmap(df, metric_column, title, threshold_config):
+@timed('charts.create_heatmap')
+def create_heatmap(df, metric_column, title, threshold_config, party_index=None):
     """Создание тепловой карты качества по машинам и партиям"""
     
-    # Получаем последние N партий
-    parties = sorted(df['№ партии'].dropna().unique())[-15:]
+    # Получаем последние N партий (с индексом партий — срез без фильтрации)
     machines = sorted(df['№ ПМ'].dropna().unique())
+    df = last_parties_rows(df, 15, party_index)
+    parties = sorted(df['№ партии'].dropna().unique())
     
     # Создаём матрицу данных
     matrix = []
@@ -186,6 +194,7 @@ def create_heatmap(df, metric_column, title, threshold_config):
     return fig
 
 
+@timed('charts.create_trend_chart')
 def create_trend_chart(last_10_parties, df=None, speed_col=None, strength_min=None, party_offset=714):
     """Создание графика тенденций с разделением по скоростям"""
     fig = go.Figure()
@@ -360,6 +369,7 @@ def create_trend_chart(last_10_parties, df=None, speed_col=None, strength_min=No
     return fig
 
 
+@timed('charts.create_pie_chart')
 def create_pie_chart(total, bad, title, good_label, bad_label):
     """Создание круговой диаграммы (legacy)"""
     colors = [COLORS['success'], COLORS['danger']]
@@ -396,42 +406,35 @@ def create_pie_chart(total, bad, title, good_label, bad_label):
 
 
 
-def create_problem_machines_chart(df, last_n_parties=10, strength_min=None):
+@timed('charts.create_problem_machines_chart')
+def create_problem_machines_chart(df, last_n_parties=10, strength_min=None, cv_max=None, party_index=None):
     """Топ проблемных машин - простой горизонтальный bar chart"""
     
-    recent_parties = sorted(df['№ партии'].dropna().unique())[-last_n_parties:]
-    recent_data = df[df['№ партии'].isin(recent_parties)]
+    recent_data = last_parties_rows(df, last_n_parties, party_index)
+    recent_data = recent_data[recent_data['№ ПМ'].notna()]
     
-    machines = recent_data['№ ПМ'].dropna().unique()
-    problems = []
+    _s_min = strength_min if strength_min is not None else QUALITY_THRESHOLDS['strength_min']
+    _cv_max = cv_max if cv_max is not None else QUALITY_THRESHOLDS['cv_max']
     
-    for machine in machines:
-        machine_data = recent_data[recent_data['№ ПМ'] == machine]
-        
-        _s_min = strength_min if strength_min is not None else QUALITY_THRESHOLDS['strength_min']
-        low_strength = (machine_data['Относительная разрывная нагрузка, сН/текс'] < _s_min).sum()
-        high_cv = (machine_data['Коэффициент вариации, %'] > QUALITY_THRESHOLDS['cv_max']).sum()
-        
-        total = low_strength + high_cv
-        
-        if total > 0:
-            problems.append({
-                'machine': f"М{int(machine)}",
-                'total': total
-            })
-    
-    problems = sorted(problems, key=lambda x: x['total'], reverse=True)[:10]
+    # Отклонения всех строк сразу, затем сумма по машинам
+    low_strength = recent_data['Относительная разрывная нагрузка, сН/текс'].to_numpy(dtype=float) < _s_min
+    high_cv = recent_data['Коэффициент вариации, %'].to_numpy(dtype=float) > _cv_max
+    totals = (
+        pd.Series(low_strength.astype(int) + high_cv.astype(int), index=recent_data.index)
+        .groupby(recent_data['№ ПМ'], sort=False).sum()
+    )
+    totals = totals[totals > 0].sort_values(ascending=False, kind='stable').head(10)
     
-    if not problems:
+    if totals.empty:
         fig = go.Figure()
         fig.add_annotation(x=0.5, y=0.5, text="Все машины в норме",
             font=dict(size=18, color=COLORS['success']), showarrow=False, xref="paper", yref="paper")
         fig.update_layout(height=450, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
         return fig
     
-    machines_list = [p['machine'] for p in problems]
-    values = [p['total'] for p in problems]
-    colors = [COLORS['danger'] if v >= 4 else COLORS['warning'] if v >= 2 else COLORS['accent'] for v in values]
+    machines_list = [f"М{int(m)}" for m in totals.index]
+    values = totals.to_numpy()
+    colors = band_colors(values, PROBLEM_BANDS, PROBLEM_PALETTE).tolist()
     
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -453,7 +456,8 @@ def create_problem_machines_chart(df, last_n_parties=10, strength_min=None):
 
 
 
-def create_quality_scatter(df, party_number=None, strength_min=None, party_offset=714):
+@timed('charts.create_quality_scatter')
+def create_quality_scatter(df, party_number=None, strength_min=None, party_offset=714, cv_max=None):
     """Scatter: Нагрузка vs CV - данные выбранной партии"""
     
     # Если партия не указана - берём последнюю
@@ -461,43 +465,39 @@ def create_quality_scatter(df, party_number=None, strength_min=None, party_offse
         party_number = df['№ партии'].max()
     
     _strength_min = strength_min if strength_min is not None else QUALITY_THRESHOLDS['strength_min']
+    _cv_max = cv_max if cv_max is not None else QUALITY_THRESHOLDS['cv_max']
 
-    party_data = df[df['№ партии'] == party_number].copy()
+    party_data = df[df['№ партии'] == party_number]
     
     # Статус каждой машины
-    def get_color(row):
-        s_ok = row['Относительная разрывная нагрузка, сН/текс'] >= _strength_min
-        c_ok = row['Коэффициент вариации, %'] <= QUALITY_THRESHOLDS['cv_max']
-        if s_ok and c_ok:
-            return COLORS['success']
-        elif s_ok or c_ok:
-            return COLORS['warning']
-        return COLORS['danger']
-    
-    party_data['color'] = party_data.apply(get_color, axis=1)
+    codes = quality_status(
+        party_data['Относительная разрывная нагрузка, сН/текс'],
+        party_data['Коэффициент вариации, %'],
+        {'strength_min': _strength_min, 'cv_max': _cv_max}
+    )
     
     fig = go.Figure()
     
     # Зона нормы (зелёная)
     fig.add_shape(type="rect",
-        x0=_strength_min, x1=350, y0=0, y1=QUALITY_THRESHOLDS['cv_max'],
+        x0=_strength_min, x1=350, y0=0, y1=_cv_max,
         fillcolor="rgba(16, 185, 129, 0.15)", line=dict(width=0), layer="below")
     
     # Зона критично (красная)
     fig.add_shape(type="rect",
-        x0=200, x1=_strength_min, y0=QUALITY_THRESHOLDS['cv_max'], y1=20,
+        x0=200, x1=_strength_min, y0=_cv_max, y1=20,
         fillcolor="rgba(239, 68, 68, 0.15)", line=dict(width=0), layer="below")
     
     # Пороговые линии
     fig.add_vline(x=_strength_min, line=dict(color=COLORS['danger'], dash='dash', width=1.5))
-    fig.add_hline(y=QUALITY_THRESHOLDS['cv_max'], line=dict(color=COLORS['danger'], dash='dash', width=1.5))
+    fig.add_hline(y=_cv_max, line=dict(color=COLORS['danger'], dash='dash', width=1.5))
     
     # Точки машин
     fig.add_trace(go.Scatter(
         x=party_data['Относительная разрывная нагрузка, сН/текс'],
         y=party_data['Коэффициент вариации, %'],
         mode='markers',
-        marker=dict(size=12, color=party_data['color'], line=dict(width=1, color=COLORS['background'])),
+        marker=dict(size=12, color=status_colors(codes).tolist(), line=dict(width=1, color=COLORS['background'])),
         text=[f"М{int(m)}" for m in party_data['№ ПМ']],
         textposition='top center',
         textfont=dict(size=8, color=COLORS['text']),
@@ -505,9 +505,9 @@ def create_quality_scatter(df, party_number=None, strength_min=None, party_offse
     ))
     
     # Считаем статистику
-    good_count = (party_data['color'] == COLORS['success']).sum()
-    warn_count = (party_data['color'] == COLORS['warning']).sum()
-    bad_count = (party_data['color'] == COLORS['danger']).sum()
+    good_count = int((codes == STATUS_GOOD).sum())
+    warn_count = int((codes == STATUS_WARN).sum())
+    bad_count = int((codes == STATUS_BAD).sum())
     
     fig.update_layout(
         title=dict(
@@ -550,7 +550,8 @@ def create_quality_scatter(df, party_number=None, strength_min=None, party_offse
 
 
 
-def create_sparkline(values, parties, metric_type='strength', height=50, strength_min=None):
+@timed('charts.create_sparkline')
+def create_sparkline(values, parties, metric_type='strength', height=50, strength_min=None, cv_max=None):
     """Компактный мини-график без подписей"""
     
     if len(values) == 0:
@@ -561,15 +562,15 @@ def create_sparkline(values, parties, metric_type='strength', height=50, strengt
     # Настройки по типу метрики
     if metric_type == 'strength':
         threshold = strength_min if strength_min is not None else QUALITY_THRESHOLDS['strength_min']
-        colors = [COLORS['success'] if v >= mean_val else COLORS['danger'] if v < threshold else COLORS['warning'] for v in values]
+        colors = status_colors(trend_status(values, threshold, 'greater')).tolist()
         y_range = [min(min(values) - 10, threshold - 20), max(max(values) + 10, threshold + 50)]
     elif metric_type == 'cv':
-        threshold = QUALITY_THRESHOLDS['cv_max']
-        colors = [COLORS['success'] if v <= mean_val else COLORS['danger'] if v > threshold else COLORS['warning'] for v in values]
+        threshold = cv_max if cv_max is not None else QUALITY_THRESHOLDS['cv_max']
+        colors = status_colors(trend_status(values, threshold, 'less')).tolist()
         y_range = [0, max(max(values) + 2, 12)]
     else:
         thresh_min, thresh_max = QUALITY_THRESHOLDS['density_range']
-        colors = [COLORS['success'] if thresh_min <= v <= thresh_max else COLORS['danger'] for v in values]
+        colors = status_colors(status_codes(values, (thresh_min, thresh_max), 'range')).tolist()
         y_range = [min(min(values) - 0.5, 27.5), max(max(values) + 0.5, 30)]
     
     fig = go.Figure()
@@ -609,7 +610,8 @@ def create_sparkline(values, parties, metric_type='strength', height=50, strengt
     return fig
 
 
-def create_plastification_comparison(df, last_n_parties=10, strength_min=None):
+@timed('charts.create_plastification_comparison')
+def create_plastification_comparison(df, last_n_parties=10, strength_min=None, party_index=None):
     """Сравнение прочности - Strip plot с точками и линией среднего"""
     stretch_col = 'Пласт. вытяжка, %'
 
@@ -619,8 +621,7 @@ def create_plastification_comparison(df, last_n_parties=10, strength_min=None):
         fig.update_layout(height=400, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
         return fig, None
 
-    recent_parties = sorted(df['№ партии'].dropna().unique())[-last_n_parties:]
-    recent_data = df[df['№ партии'].isin(recent_parties)].copy()
+    recent_data = last_parties_rows(df, last_n_parties, party_index).copy()
     recent_data[stretch_col] = pd.to_numeric(recent_data[stretch_col], errors='coerce')
 
     data_60 = recent_data[recent_data[stretch_col] == 60]['Относительная разрывная нагрузка, сН/текс'].dropna()
@@ -706,7 +707,8 @@ def create_plastification_comparison(df, last_n_parties=10, strength_min=None):
     return fig, stats
 
 
-def create_cv_plastification_comparison(df, last_n_parties=10):
+@timed('charts.create_cv_plastification_comparison')
+def create_cv_plastification_comparison(df, last_n_parties=10, party_index=None):
     """Сравнение CV - Strip plot с точками и линией среднего"""
     stretch_col = 'Пласт. вытяжка, %'
 
@@ -716,8 +718,7 @@ def create_cv_plastification_comparison(df, last_n_parties=10):
         fig.update_layout(height=400, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
         return fig, None
 
-    recent_parties = sorted(df['№ партии'].dropna().unique())[-last_n_parties:]
-    recent_data = df[df['№ партии'].isin(recent_parties)].copy()
+    recent_data = last_parties_rows(df, last_n_parties, party_index).copy()
     recent_data[stretch_col] = pd.to_numeric(recent_data[stretch_col], errors='coerce')
 
     data_60 = recent_data[recent_data[stretch_col] == 60]['Коэффициент вариации, %'].dropna()
@@ -0,0 +1,625 @@
+import streamlit as st
+import plotly.graph_objects as go
+import numpy as np
+import pandas as pd
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.charts import create_trend_chart, create_problem_machines_chart, create_quality_scatter
+from components.metrics import get_profile_aggregates
+from components.kiosk import render_kiosk_mode
+from components.layout import render_page_header, render_party_header, render_metrics_section, render_navigation, render_skeleton
+from utils.data_processing import load_data, get_snapshot_version
+from utils.constants import COLORS, TWIST_PROFILES
+from utils.auth import login_form, logout_button, is_admin, is_kiosk
+from utils.perf import timed_profile, record_timing, render_timings_panel
+from utils.profiler import profiled_page
+from utils.tracking import track_page_view, track_event
+from utils.freshness import render_data_age, render_freshness_banner
+from utils.status import check_values, strength_band_colors, cv_band_colors
+
+
+# ============================================================
+# СЕКЦИИ СТРАНИЦЫ ДАШБОРДА
+# Все секции принимают первым аргументом профиль крутки.
+# Секции с собственными виджетами оформлены как фрагменты:
+# смена значения виджета перезапускает только свою секцию.
+# ============================================================
+
+def find_speed_column(df):
+    """Поиск колонки скорости формования"""
+    for col in df.columns:
+        if 'Скорость' in col and 'формования' in col:
+            return col
+    return None
+
+
+def progress_bar_html(label, value, min_val, max_val, threshold, mode='greater', good_count=None, total=None):
+    """HTML прогресс-бара показателя качества"""
+    pct = min(100, max(0, (value - min_val) / (max_val - min_val) * 100))
+    color = '#22c55e' if check_values(value, threshold, mode) else '#ef4444'
+    count_text = f"<span style='color:#94a3b8;font-size:12px;'>{good_count}/{total} в норме</span>" if good_count is not None else ""
+    return f"""
+    <div style="background:#1e293b;padding:16px;border-radius:8px;border:1px solid #334155;margin-bottom:8px;">
+        <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:8px;">
+            <span style="color:#e2e8f0;font-size:14px;font-weight:600;">{label}</span>
+            <span style="color:{color};font-size:20px;font-weight:700;">{value}</span>
+        </div>
+        <div style="background:#334155;border-radius:4px;height:8px;overflow:hidden;">
+            <div style="background:{color};height:100%;width:{pct}%;border-radius:4px;transition:width 0.5s;"></div>
+        </div>
+        <div style="margin-top:4px;text-align:right;">{count_text}</div>
+    </div>
+    """
+
+
+def diff_color_html(val_a, val_b, metric='strength'):
+    """Цветная разница показателей (b - a)"""
+    try:
+        diff = float(val_b) - float(val_a)
+        if metric == 'strength':
+            color = '#22c55e' if diff > 0 else '#ef4444' if diff < 0 else '#94a3b8'
+        else:  # CV - меньше лучше
+            color = '#22c55e' if diff < 0 else '#ef4444' if diff > 0 else '#94a3b8'
+        sign = '+' if diff > 0 else ''
+        return f"<span style='color:{color};font-weight:bold'>{sign}{diff:.1f}</span>"
+    except (TypeError, ValueError):
+        return '-'
+
+
+@timed_profile('dashboard', 'kpi')
+def render_kpi_section(profile, summary):
+    """Заголовок партии, метрики и баннер отклонений (из кэшированной сводки)"""
+    metrics = summary['metrics']
+    prev_metrics = summary['prev_metrics']
+
+    # Заголовок партии
+    render_party_header(summary['last_party'], offset=profile['party_offset'])
+
+    # Секция метрик
+    render_metrics_section(metrics, prev_metrics, strength_min=profile['thresholds']['strength_min'])
+
+    # Alert banner если много отклонений
+    total_issues = metrics['low_strength_count'] + metrics['high_cv_count'] + metrics['bad_density_count']
+    if total_issues >= 5:
+        st.markdown(f"""
+            <div class="alert-banner">
+                Внимание: обнаружено {total_issues} отклонений в текущей партии
+                (прочность: {metrics['low_strength_count']}, CV: {metrics['high_cv_count']}, плотность: {metrics['bad_density_count']})
+            </div>
+        """, unsafe_allow_html=True)
+
+    st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
+    return metrics
+
+
+@timed_profile('dashboard', 'quality_bars')
+def render_quality_bars(profile, metrics):
+    """Показатели качества — прогресс-бары"""
+    thresholds = profile['thresholds']
+    st.markdown(f'<div class="section-header">Показатели качества</div>', unsafe_allow_html=True)
+
+    bar_cols = st.columns(3)
+    with bar_cols[0]:
+        good_s = metrics['total_machines'] - metrics['low_strength_count']
+        st.markdown(progress_bar_html("Разрывная нагрузка, сН/текс", metrics['avg_strength'], 200, 350, thresholds['strength_min'], 'greater', good_s, metrics['total_machines']), unsafe_allow_html=True)
+    with bar_cols[1]:
+        good_c = metrics['total_machines'] - metrics['high_cv_count']
+        st.markdown(progress_bar_html("Коэф. вариации, %", metrics['avg_cv'], 0, 15, thresholds['cv_max'], 'less', good_c, metrics['total_machines']), unsafe_allow_html=True)
+    with bar_cols[2]:
+        good_d = metrics['total_machines'] - metrics['bad_density_count']
+        density_val = metrics['avg_density'] if metrics['avg_density'] > 0 else 28.9
+        st.markdown(progress_bar_html("Лин. плотность, текс", density_val, 27, 31, thresholds['density_range'], 'range', good_d, metrics['total_machines']), unsafe_allow_html=True)
+
+    st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
+
+
+@timed_profile('dashboard', 'trend')
+def render_trend_section(profile, party_index):
+    """График динамики по последним 10 партиям"""
+    st.markdown(f"""
+        <div class="section-header">Динамика по партиям</div>
+    """, unsafe_allow_html=True)
+
+    recent = party_index.last_n(10)
+    last_10_parties = (
+        recent.groupby('№ партии')
+        .agg({'Относительная разрывная нагрузка, сН/текс': 'mean'})
+        .round(1)
+    )
+
+    trend_fig = create_trend_chart(
+        last_10_parties, df=recent, speed_col=find_speed_column(recent),
+        strength_min=profile['thresholds']['strength_min'], party_offset=profile['party_offset']
+    )
+    st.plotly_chart(trend_fig, use_container_width=True, config={'displayModeBar': False}, key=f"{profile['chart_key']}_trend")
+
+    st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
+
+
+@timed_profile('dashboard', 'problem_machines')
+def render_problem_machines_section(profile, party_index):
+    """Топ проблемных машин"""
+    st.markdown(f"""
+        <div class="info-block">
+            <h4>Топ проблемных машин</h4>
+            <p>Машины с наибольшим количеством отклонений за последние 10 партий.
+            Красный — критично (4+), оранжевый — требует внимания.</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    problem_chart = create_problem_machines_chart(
+        party_index.df, last_n_parties=10,
+        strength_min=profile['thresholds']['strength_min'], cv_max=profile['thresholds']['cv_max'],
+        party_index=party_index
+    )
+    st.plotly_chart(problem_chart, use_container_width=True, config={'displayModeBar': False}, key=f"{profile['chart_key']}_problem")
+
+    st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
+
+
+@st.fragment
+@timed_profile('dashboard', 'quality_scatter')
+def render_quality_scatter_section(profile, party_index, n_recent=20):
+    """Карта качества партии из последних n_recent (фрагмент: перезапускается при смене партии)"""
+    st.markdown(f"""
+        <div class="info-block">
+            <h4>Карта качества партии</h4>
+            <p>Каждая точка — машина. По X — разрывная нагрузка (↑ лучше),
+            по Y — коэф. вариации (↓ лучше). Зелёная зона — норма.</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Выбор партии (от новых к старым)
+    recent_parties_desc = party_index.last_parties(n_recent)[::-1]
+    display_parties = [f"Партия {label}" for label in party_index.labels[-n_recent:][::-1]]
+
+    selected_idx = st.selectbox(
+        "Выберите партию для анализа:",
+        range(len(display_parties)),
+        format_func=lambda x: display_parties[x],
+        key=f"party_selector{profile['key_suffix']}"
+    )
+    selected_party = recent_parties_desc[selected_idx]
+
+    scatter_chart = create_quality_scatter(
+        party_index.party(selected_party), selected_party,
+        strength_min=profile['thresholds']['strength_min'], cv_max=profile['thresholds']['cv_max'],
+        party_offset=profile['party_offset']
+    )
+    st.plotly_chart(scatter_chart, use_container_width=True, config={'displayModeBar': False}, key=f"{profile['chart_key']}_scatter")
+
+    st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
+
+
+def calc_group_stats(data, column, value, numeric=False):
+    """Средние прочность и CV для машин с заданным значением параметра"""
+    values = pd.to_numeric(data[column], errors='coerce') if numeric else data[column]
+    filtered = data[values == value]
+    if len(filtered) == 0:
+        return {'strength': '-', 'cv': '-', 'count': 0}
+    return {
+        'strength': f"{filtered['Относительная разрывная нагрузка, сН/текс'].mean():.1f}",
+        'cv': f"{filtered['Коэффициент вариации, %'].mean():.1f}",
+        'count': len(filtered)
+    }
+
+
+@timed_profile('dashboard', 'plast_comparison')
+def render_plastification_table(profile, aggregates):
+    """Таблица: сравнение пластификационной вытяжки 60% vs 65%"""
+    st.markdown(f"""
+        <div class="info-block">
+            <h4>Сравнение: вытяжка 60% vs 65%</h4>
+            <p>Средние показатели прочности и CV для машин с разной пластификационной вытяжкой.</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    stretch_col = 'Пласт. вытяжка, %'
+
+    if stretch_col in aggregates['df'].columns:
+        last_1, last_3, last_10 = aggregates['last_1'], aggregates['last_3'], aggregates['last_10']
+
+        # Считаем количество машин на каждой вытяжке (в последней партии)
+        last_party_plast = last_1
+        machines_60 = len(last_party_plast[pd.to_numeric(last_party_plast[stretch_col], errors='coerce') == 60]['№ ПМ'].unique())
+        machines_65 = len(last_party_plast[pd.to_numeric(last_party_plast[stretch_col], errors='coerce') == 65]['№ ПМ'].unique())
+
+        # Статистика
+        stats_1_60 = calc_group_stats(last_1, stretch_col, 60, numeric=True)
+        stats_1_65 = calc_group_stats(last_1, stretch_col, 65, numeric=True)
+        stats_3_60 = calc_group_stats(last_3, stretch_col, 60, numeric=True)
+        stats_3_65 = calc_group_stats(last_3, stretch_col, 65, numeric=True)
+        stats_10_60 = calc_group_stats(last_10, stretch_col, 60, numeric=True)
+        stats_10_65 = calc_group_stats(last_10, stretch_col, 65, numeric=True)
+
+
+        # HTML таблица
+        table_html = f"""
+        <style>
+            .compare-table {{ width: 100%; border-collapse: collapse; margin: 10px 0; }}
+            .compare-table th, .compare-table td {{ padding: 12px 8px; text-align: center; border-bottom: 1px solid #334155; }}
+            .compare-table th {{ background: #1e293b; color: #e2e8f0; font-weight: bold; }}
+            .compare-table td {{ color: #cbd5e1; }}
+            .compare-table tr:hover {{ background: #1e293b; }}
+            .val-60 {{ color: #00d4ff !important; font-weight: bold; }}
+            .val-65 {{ color: #8b5cf6 !important; font-weight: bold; }}
+            .header-row {{ background: #0f172a !important; }}
+        </style>
+        <table class="compare-table">
+            <tr class="header-row">
+                <th rowspan="2">Период</th>
+                <th colspan="3">Разрывная нагрузка, сН/текс</th>
+                <th colspan="3">Коэф. вариации, %</th>
+            </tr>
+            <tr class="header-row">
+                <th><span class="val-60">60%</span></th>
+                <th><span class="val-65">65%</span></th>
+                <th>Δ</th>
+                <th><span class="val-60">60%</span></th>
+                <th><span class="val-65">65%</span></th>
+                <th>Δ</th>
+            </tr>
+            <tr style="background:#1e293b;">
+                <td colspan="7" style="text-align:left;padding:8px 12px;">
+                    <b>Машин на вытяжке:</b>
+                    <span class="val-60">60% — {machines_60} шт.</span> |
+                    <span class="val-65">65% — {machines_65} шт.</span>
+                </td>
+            </tr>
+            <tr>
+                <td><b>Последняя партия</b><br><small>(n: {stats_1_60['count']} / {stats_1_65['count']})</small></td>
+                <td class="val-60">{stats_1_60['strength']}</td>
+                <td class="val-65">{stats_1_65['strength']}</td>
+                <td>{diff_color_html(stats_1_60['strength'], stats_1_65['strength'], 'strength')}</td>
+                <td class="val-60">{stats_1_60['cv']}</td>
+                <td class="val-65">{stats_1_65['cv']}</td>
+                <td>{diff_color_html(stats_1_60['cv'], stats_1_65['cv'], 'cv')}</td>
+            </tr>
+            <tr>
+                <td><b>3 последние партии</b><br><small>(n: {stats_3_60['count']} / {stats_3_65['count']})</small></td>
+                <td class="val-60">{stats_3_60['strength']}</td>
+                <td class="val-65">{stats_3_65['strength']}</td>
+                <td>{diff_color_html(stats_3_60['strength'], stats_3_65['strength'], 'strength')}</td>
+                <td class="val-60">{stats_3_60['cv']}</td>
+                <td class="val-65">{stats_3_65['cv']}</td>
+                <td>{diff_color_html(stats_3_60['cv'], stats_3_65['cv'], 'cv')}</td>
+            </tr>
+            <tr>
+                <td><b>10 последних партий</b><br><small>(n: {stats_10_60['count']} / {stats_10_65['count']})</small></td>
+                <td class="val-60">{stats_10_60['strength']}</td>
+                <td class="val-65">{stats_10_65['strength']}</td>
+                <td>{diff_color_html(stats_10_60['strength'], stats_10_65['strength'], 'strength')}</td>
+                <td class="val-60">{stats_10_60['cv']}</td>
+                <td class="val-65">{stats_10_65['cv']}</td>
+                <td>{diff_color_html(stats_10_60['cv'], stats_10_65['cv'], 'cv')}</td>
+            </tr>
+        </table>
+        """
+        st.markdown(table_html, unsafe_allow_html=True)
+    else:
+        st.warning("Колонка 'Пласт. вытяжка, %' не найдена в данных")
+
+    st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
+
+
+@timed_profile('dashboard', 'speed_comparison')
+def render_speed_table(profile, aggregates):
+    """Таблица: сравнение скорости формования 16.4 vs 18.8 м/мин"""
+    st.markdown(f"""
+        <div class="info-block">
+            <h4>Сравнение: скорость 16.4 vs 18.8 м/мин</h4>
+            <p>Средние показатели прочности и CV для машин с разной скоростью формования.</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    speed_col = find_speed_column(aggregates['df'])
+
+    if speed_col is not None:
+        last_1, last_3, last_10 = aggregates['last_1'], aggregates['last_3'], aggregates['last_10']
+
+        # Считаем количество машин на каждой скорости (в последней партии)
+        last_party_speed = last_1
+        machines_164 = len(last_party_speed[last_party_speed[speed_col] == 164]['№ ПМ'].unique())
+        machines_188 = len(last_party_speed[last_party_speed[speed_col] == 188]['№ ПМ'].unique())
+
+        # Статистика по скоростям
+        speed_stats_1_164 = calc_group_stats(last_1, speed_col, 164)
+        speed_stats_1_188 = calc_group_stats(last_1, speed_col, 188)
+        speed_stats_3_164 = calc_group_stats(last_3, speed_col, 164)
+        speed_stats_3_188 = calc_group_stats(last_3, speed_col, 188)
+        speed_stats_10_164 = calc_group_stats(last_10, speed_col, 164)
+        speed_stats_10_188 = calc_group_stats(last_10, speed_col, 188)
+
+        # HTML таблица для скорости
+        speed_table_html = f"""
+        <table class="compare-table">
+            <tr class="header-row">
+                <th rowspan="2">Период</th>
+                <th colspan="3">Разрывная нагрузка, сН/текс</th>
+                <th colspan="3">Коэф. вариации, %</th>
+            </tr>
+            <tr class="header-row">
+                <th><span style="color:#f59e0b;font-weight:bold">16.4</span></th>
+                <th><span style="color:#06b6d4;font-weight:bold">18.8</span></th>
+                <th>Δ</th>
+                <th><span style="color:#f59e0b;font-weight:bold">16.4</span></th>
+                <th><span style="color:#06b6d4;font-weight:bold">18.8</span></th>
+                <th>Δ</th>
+            </tr>
+            <tr style="background:#1e293b;">
+                <td colspan="7" style="text-align:left;padding:8px 12px;">
+                    <b>Машин на скорости:</b>
+                    <span style="color:#f59e0b;font-weight:bold">16.4 м/мин — {machines_164} шт.</span> |
+                    <span style="color:#06b6d4;font-weight:bold">18.8 м/мин — {machines_188} шт.</span>
+                </td>
+            </tr>
+            <tr>
+                <td><b>Последняя партия</b><br><small>(n: {speed_stats_1_164['count']} / {speed_stats_1_188['count']})</small></td>
+                <td style="color:#f59e0b;font-weight:bold">{speed_stats_1_164['strength']}</td>
+                <td style="color:#06b6d4;font-weight:bold">{speed_stats_1_188['strength']}</td>
+                <td>{diff_color_html(speed_stats_1_164['strength'], speed_stats_1_188['strength'], 'strength')}</td>
+                <td style="color:#f59e0b;font-weight:bold">{speed_stats_1_164['cv']}</td>
+                <td style="color:#06b6d4;font-weight:bold">{speed_stats_1_188['cv']}</td>
+                <td>{diff_color_html(speed_stats_1_164['cv'], speed_stats_1_188['cv'], 'cv')}</td>
+            </tr>
+            <tr>
+                <td><b>3 последние партии</b><br><small>(n: {speed_stats_3_164['count']} / {speed_stats_3_188['count']})</small></td>
+                <td style="color:#f59e0b;font-weight:bold">{speed_stats_3_164['strength']}</td>
+                <td style="color:#06b6d4;font-weight:bold">{speed_stats_3_188['strength']}</td>
+                <td>{diff_color_html(speed_stats_3_164['strength'], speed_stats_3_188['strength'], 'strength')}</td>
+                <td style="color:#f59e0b;font-weight:bold">{speed_stats_3_164['cv']}</td>
+                <td style="color:#06b6d4;font-weight:bold">{speed_stats_3_188['cv']}</td>
+                <td>{diff_color_html(speed_stats_3_164['cv'], speed_stats_3_188['cv'], 'cv')}</td>
+            </tr>
+            <tr>
+                <td><b>10 последних партий</b><br><small>(n: {speed_stats_10_164['count']} / {speed_stats_10_188['count']})</small></td>
+                <td style="color:#f59e0b;font-weight:bold">{speed_stats_10_164['strength']}</td>
+                <td style="color:#06b6d4;font-weight:bold">{speed_stats_10_188['strength']}</td>
+                <td>{diff_color_html(speed_stats_10_164['strength'], speed_stats_10_188['strength'], 'strength')}</td>
+                <td style="color:#f59e0b;font-weight:bold">{speed_stats_10_164['cv']}</td>
+                <td style="color:#06b6d4;font-weight:bold">{speed_stats_10_188['cv']}</td>
+                <td>{diff_color_html(speed_stats_10_164['cv'], speed_stats_10_188['cv'], 'cv')}</td>
+            </tr>
+        </table>
+        """
+        st.markdown(speed_table_html, unsafe_allow_html=True)
+    else:
+        st.warning("Колонка 'Скорость формования, м/мин' не найдена в данных")
+
+    st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
+
+
+@timed_profile('dashboard', 'machine_grid')
+def render_machine_grid(profile, aggregates):
+    """Результаты по машинам: цветные значения и детальные графики"""
+    st.markdown(f"""
+        <div class="section-header">Результаты по машинам</div>
+        <p style="color: {COLORS['text_secondary']}; margin-bottom: 16px; font-size: 13px;">
+            Последние 5 партий. Нажмите на машину для детального просмотра.
+        </p>
+    """, unsafe_allow_html=True)
+
+    party_index = aggregates['index']
+    strength_min = profile['thresholds']['strength_min']
+    cv_max = profile['thresholds']['cv_max']
+    # Данные за последние 10 партий (для детального просмотра)
+    df_last10 = party_index.last_n(10)
+
+    # Данные за последние 5 партий (для превью)
+    df_last5 = party_index.last_n(5)
+
+    machines = sorted(df_last10['№ ПМ'].dropna().unique())
+
+    # Заголовки (без линейной плотности)
+    header_cols = st.columns([1, 3, 3])
+    headers = ['Машина', 'Разрывная нагрузка (последние 5)', 'Коэф. вариации (последние 5)']
+    for col, header in zip(header_cols, headers):
+        with col:
+            st.markdown(f"<div style='text-align:center; font-weight:bold; color:{COLORS['text']}; font-size:13px;'>{header}</div>", unsafe_allow_html=True)
+
+    st.markdown("<hr style='margin: 5px 0; border-color: #334155'>", unsafe_allow_html=True)
+
+    # Строки машин
+    for machine in machines:
+        machine_data_full = df_last10[df_last10['№ ПМ'] == machine].sort_values('№ партии')
+        machine_data_5 = df_last5[df_last5['№ ПМ'] == machine].sort_values('№ партии')
+        parties = machine_data_full['№ партии'].values
+
+        with st.expander(f"№ {int(machine)}", expanded=False):
+            # Развёрнутый вид с графиками (только 2 колонки)
+            st.markdown(f"<h4 style='color:{COLORS['text']}'>Машина № {int(machine)} — детальный анализ</h4>", unsafe_allow_html=True)
+
+            detail_cols = st.columns(2)
+
+            # Разрывная нагрузка - детально
+            with detail_cols[0]:
+                strength_vals = machine_data_full['Относительная разрывная нагрузка, сН/текс'].values
+                if len(strength_vals) > 0:
+                    mean_s = np.mean(strength_vals)
+                    fig = go.Figure()
+                    party_labels = [party_index.label(p) for p in parties]
+                    colors = strength_band_colors(strength_vals, profile)
+
+                    fig.add_trace(go.Scatter(x=party_labels, y=strength_vals, mode='lines+markers+text',
+                        line=dict(color=COLORS['text_secondary'], width=2),
+                        marker=dict(size=10, color=colors.tolist()),
+                        text=[f"{v:.1f}" for v in strength_vals], textposition='top center',
+                        textfont=dict(size=10, color=COLORS['text']), name='Значение'))
+                    fig.add_hline(y=strength_min, line=dict(color=COLORS['danger'], width=2, dash='dash'),
+                        annotation_text=f"Мин: {strength_min:g}", annotation_position="right")
+                    fig.add_hline(y=mean_s, line=dict(color=COLORS['success'], width=2),
+                        annotation_text=f"Ср: {mean_s:.1f}", annotation_position="right")
+                    fig.update_layout(title='Разрывная нагрузка, сН/текс', height=300,
+                        xaxis=dict(title='Партия', tickfont=dict(color=COLORS['text_secondary'])),
+                        yaxis=dict(range=[min(min(strength_vals)-10, profile['strength_axis'][0]), max(max(strength_vals)+15, profile['strength_axis'][1])],
+                            tickfont=dict(color=COLORS['text_secondary'])),
+                        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                        font=dict(color=COLORS['text']), showlegend=False, margin=dict(t=40,b=40,l=40,r=60))
+                    st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False}, key=f"{profile['chart_key']}_strength_m{int(machine)}")
+
+            # Коэф. вариации - детально
+            with detail_cols[1]:
+                cv_vals = machine_data_full['Коэффициент вариации, %'].values
+                if len(cv_vals) > 0:
+                    mean_c = np.mean(cv_vals)
+                    fig = go.Figure()
+                    colors = cv_band_colors(cv_vals, profile)
+
+                    fig.add_trace(go.Scatter(x=party_labels, y=cv_vals, mode='lines+markers+text',
+                        line=dict(color=COLORS['text_secondary'], width=2),
+                        marker=dict(size=10, color=colors.tolist()),
+                        text=[f"{v:.1f}" for v in cv_vals], textposition='top center',
+                        textfont=dict(size=10, color=COLORS['text']), name='Значение'))
+                    fig.add_hline(y=cv_max, line=dict(color=COLORS['danger'], width=2, dash='dash'),
+                        annotation_text=f"Макс: {cv_max:g}", annotation_position="right")
+                    fig.add_hline(y=mean_c, line=dict(color=COLORS['success'], width=2),
+                        annotation_text=f"Ср: {mean_c:.1f}", annotation_position="right")
+                    fig.update_layout(title='Коэф. вариации, %', height=300,
+                        xaxis=dict(title='Партия', tickfont=dict(color=COLORS['text_secondary'])),
+                        yaxis=dict(range=[0, max(max(cv_vals)+3, 12)], tickfont=dict(color=COLORS['text_secondary'])),
+                        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                        font=dict(color=COLORS['text']), showlegend=False, margin=dict(t=40,b=40,l=40,r=60))
+                    st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False}, key=f"{profile['chart_key']}_cv_m{int(machine)}")
+
+        # Компактная строка с цветными цифрами
+        cols = st.columns([1, 3, 3])
+        with cols[0]:
+            pass  # Номер уже в expander
+
+        # Разрывная нагрузка - цветные цифры
+        with cols[1]:
+            strength_vals = machine_data_5['Относительная разрывная нагрузка, сН/текс'].values[-5:]
+            if len(strength_vals) > 0:
+                html_parts = [
+                    f"<span style='color:{color}; font-weight:bold; font-size:14px; margin:0 4px;'>{v:.0f}</span>"
+                    for v, color in zip(strength_vals, strength_band_colors(strength_vals, profile))
+                ]
+                st.markdown(f"<div style='text-align:center; padding:8px 0;'>{''.join(html_parts)}</div>", unsafe_allow_html=True)
+
+        # Коэф. вариации - цветные цифры
+        with cols[2]:
+            cv_vals = machine_data_5['Коэффициент вариации, %'].values[-5:]
+            if len(cv_vals) > 0:
+                html_parts = [
+                    f"<span style='color:{color}; font-weight:bold; font-size:14px; margin:0 4px;'>{v:.1f}</span>"
+                    for v, color in zip(cv_vals, cv_band_colors(cv_vals, profile))
+                ]
+                st.markdown(f"<div style='text-align:center; padding:8px 0;'>{''.join(html_parts)}</div>", unsafe_allow_html=True)
+
+
+@profiled_page('dashboard')
+def render_dashboard_page(twist):
+    """Страница дашборда для профиля крутки из TWIST_PROFILES"""
+    profile = TWIST_PROFILES[twist]
+    page_start = time.perf_counter()
+
+    # Проверка авторизации
+    if not login_form():
+        return
+
+    track_page_view(f"dashboard_{twist}")
+    render_page_header(subtitle=profile['label'])
+
+    # Компактная шапка: имя + timestamp + обновить + выход
+    header_cols = st.columns([3, 2, 1, 1])
+    with header_cols[0]:
+        st.markdown(f"<span style='color:#94a3b8;font-size:13px;'>Пользователь: <b>{st.session_state.user_info['name']}</b></span>", unsafe_allow_html=True)
+    if is_kiosk():
+        render_kiosk_mode()
+    else:
+        with header_cols[2]:
+            if st.button('Обновить', key=f"refresh_button{profile['key_suffix']}"):
+                track_event(f"dashboard_{twist}", 'refresh')
+                with st.spinner('Обновление...'):
+                    load_data.clear()
+                    new_data = load_data()
+                    if new_data is not None:
+                        st.session_state.df = new_data
+                        st.success('Данные обновлены!')
+                        st.rerun()
+                    else:
+                        st.error('Ошибка обновления')
+        with header_cols[3]:
+            logout_button()
+        render_navigation()
+
+    # Загружаем данные
+    with st.spinner('Загрузка данных...'):
+        if 'df' not in st.session_state:
+            st.session_state.df = load_data()
+        df = st.session_state.df
+
+    if df is None:
+        st.error("Не удалось загрузить данные. Проверьте подключение к Google Sheets.")
+        return
+
+    with header_cols[1]:
+        render_data_age(df)
+    render_freshness_banner(df)
+
+    try:
+        if df.empty:
+            st.warning("Данные отсутствуют")
+            return
+
+        # Срез по крутке и агрегаты профиля (общие для всех сессий)
+        aggregates = get_profile_aggregates(df, get_snapshot_version(df), twist)
+        if not aggregates['parties']:
+            st.warning("Нет данных о номерах партий")
+            return
+
+        party_index = aggregates['index']
+
+        # Этап 1: шапка партии и KPI из кэшированной сводки
+        metrics = render_kpi_section(profile, aggregates['summary'])
+        render_quality_bars(profile, metrics)
+        record_timing(f"dashboard_{twist}.first_kpi", (time.perf_counter() - page_start) * 1000)
+
+        # Этап 2: заглушки секций, заполняемые по очереди
+        trend_slot = st.empty()
+        analytics_slot = st.empty()
+        comparison_slot = st.empty()
+        machines_slot = st.empty()
+        render_skeleton(trend_slot, 550, 'Динамика по партиям...')
+        render_skeleton(analytics_slot, 450, 'Аналитика качества...')
+        render_skeleton(comparison_slot, 300, 'Сравнительные таблицы...')
+        render_skeleton(machines_slot, 400, 'Результаты по машинам...')
+
+        with trend_slot.container():
+            render_trend_section(profile, party_index)
+
+        with analytics_slot.container():
+            # === АНАЛИТИКА КАЧЕСТВА ===
+            st.markdown(f"""
+                <div class="section-header">Аналитика качества</div>
+            """, unsafe_allow_html=True)
+
+            render_problem_machines_section(profile, party_index)
+            render_quality_scatter_section(profile, party_index)
+
+        with comparison_slot.container():
+            render_plastification_table(profile, aggregates)
+            if profile['speed_table']:
+                render_speed_table(profile, aggregates)
+
+        with machines_slot.container():
+            render_machine_grid(profile, aggregates)
+
+        record_timing(f"dashboard_{twist}.full_render", (time.perf_counter() - page_start) * 1000)
+
+        # Футер
+        st.markdown(f"""
+            <div style="text-align: center; margin-top: 40px; padding: 20px; color: {COLORS['text_secondary']};">
+                <small>Дашборд прядильного цеха. Данные обновляются из Google Sheets</small>
+            </div>
+        """, unsafe_allow_html=True)
+
+        if is_admin():
+            render_timings_panel()
+
+    except Exception as e:
+        st.error(f"Ошибка при обработке данных: {str(e)}")
+        st.exception(e)
@@ -0,0 +1,48 @@
+import streamlit as st
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.constants import KIOSK_CONFIG
+from utils.data_processing import load_data, get_snapshot_version
+from utils.perf import tracked_cache
+
+
+@tracked_cache('data_version', st.cache_data(ttl=KIOSK_CONFIG['poll_seconds'], show_spinner=False))
+def get_data_version():
+    """Версия текущего снимка данных (общая для всех экранов, обновляется раз в период опроса)"""
+    df = load_data()
+    if df is None or df.empty:
+        return None
+    return get_snapshot_version(df)
+
+
+@st.fragment(run_every=KIOSK_CONFIG['poll_seconds'])
+def watch_data_version():
+    """Опрос версии данных: страница перезапускается только при появлении нового снимка"""
+    version = get_data_version()
+    if version is None:
+        return
+
+    if st.session_state.get('kiosk_version') is None:
+        st.session_state.kiosk_version = version
+        return
+
+    if version != st.session_state.kiosk_version:
+        st.session_state.df = load_data()
+        st.session_state.kiosk_version = version
+        st.rerun(scope='app')
+
+
+def render_kiosk_mode():
+    """Оформление экрана-киоска и фоновый опрос версии данных"""
+    st.markdown("""
+        <style>
+        [data-testid="stSidebar"], [data-testid="stSidebarCollapsedControl"] {display: none;}
+        </style>
+    """, unsafe_allow_html=True)
+
+    if st.session_state.get('kiosk_version') is None and st.session_state.get('df') is not None:
+        st.session_state.kiosk_version = get_snapshot_version(st.session_state.df)
+
+    watch_data_version()
@@ -3,7 +3,7 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.constants import COLORS
+from utils.constants import COLORS, TWIST_PROFILES
 
 def inject_custom_css():
     """Внедрение кастомных CSS стилей для корпоративной тёмной темы"""
@@ -274,6 +274,26 @@ def inject_custom_css():
             border-bottom: 1px solid {COLORS['grid']};
         }}
 
+        /* === ЗАГЛУШКИ ПРИ ЗАГРУЗКЕ СЕКЦИЙ === */
+        @keyframes skeleton-shimmer {{
+            0% {{ background-position: -400px 0; }}
+            100% {{ background-position: 400px 0; }}
+        }}
+
+        .skeleton {{
+            background: linear-gradient(90deg, {COLORS['card']} 0%, {COLORS['card_hover']} 50%, {COLORS['card']} 100%);
+            background-size: 800px 100%;
+            animation: skeleton-shimmer 1.4s linear infinite;
+            border-radius: 8px;
+            border: 1px solid {COLORS['grid']};
+            margin-bottom: 16px;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            color: {COLORS['muted']};
+            font-size: 13px;
+        }}
+
         /* === INFO БЛОК === */
         .info-block {{
             background: {COLORS['card']};
@@ -300,6 +320,20 @@ def inject_custom_css():
     """, unsafe_allow_html=True)
 
 
+def render_navigation():
+    """Боковая навигация с русскими названиями (строится по профилям крутки)"""
+    st.markdown("""<style>[data-testid="stSidebarNav"] {display: none;}</style>""", unsafe_allow_html=True)
+    st.sidebar.markdown("### Дашборды")
+    for profile in TWIST_PROFILES.values():
+        st.sidebar.page_link(profile['dashboard_page'], label=profile['label'], icon=profile['dashboard_icon'])
+    st.sidebar.markdown("### Контрольные карты")
+    for profile in TWIST_PROFILES.values():
+        st.sidebar.page_link(profile['spc_page'], label=f"Контрольные карты {profile['short_label']}", icon=profile['spc_icon'])
+    st.sidebar.markdown("### Администратор")
+    st.sidebar.page_link("pages/5_Статистика_для_администратора.py", label="Статистика посещений", icon="👤")
+    st.sidebar.page_link("pages/6_Производительность.py", label="Производительность", icon="⏱️")
+
+
 def render_page_header(subtitle=None):
     """Отрисовка заголовка страницы"""
     inject_custom_css()
@@ -311,12 +345,12 @@ def render_page_header(subtitle=None):
     )
 
 
-def render_party_header(party_number):
+def render_party_header(party_number, offset=714):
     """Отрисовка заголовка партии"""
     st.markdown(f'''
         <div class="party-header">
             <span>Текущая партия</span>
-            <span class="party-badge">№ {int(party_number) - 714}</span>
+            <span class="party-badge">№ {int(party_number) - offset}</span>
         </div>
     ''', unsafe_allow_html=True)
 
@@ -375,3 +409,11 @@ def render_metrics_section(metrics, prev_metrics=None, strength_min=270):
                     <div style="color:#22c55e; font-size:13px;">всё в норме</div>
                 </div>
             """, unsafe_allow_html=True)
+
+
+def render_skeleton(placeholder, height=300, label='Загрузка...'):
+    """Заглушка секции до её отрисовки"""
+    placeholder.markdown(
+        f'<div class="skeleton" style="height:{height}px;">{label}</div>',
+        unsafe_allow_html=True
+    )
@@ -3,7 +3,10 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.constants import COLORS, QUALITY_THRESHOLDS, QUALITY_THRESHOLDS_50
+from utils.constants import COLORS, QUALITY_THRESHOLDS, QUALITY_THRESHOLDS_50, TWIST_PROFILES
+from utils.status import STATUS_NA, STATUS_GOOD, status_codes
+from utils.perf import timed, tracked_cache
+from utils.party_index import PartyIndex, twist_rows
 import streamlit as st
 
 def calculate_party_metrics(party_data, thresholds=None):
@@ -33,22 +36,52 @@ def calculate_party_metrics(party_data, thresholds=None):
     return metrics
 
 
+@timed('metrics.profile_aggregates')
+@tracked_cache('profile_aggregates', st.cache_resource(show_spinner=False, max_entries=8))
+def get_profile_aggregates(_df, snapshot_version, twist):
+    """Срез по крутке и общие агрегаты профиля, строятся один раз на снимок данных.
+
+    'df' — непрерывный срез снимка (упорядочен по крутке и партиям), 'index' —
+    индекс партий (utils.party_index) для срезов без копирования, 'cold_parties' —
+    число партий профиля, вынесенных в холодную историю. Результат общий
+    для всех сессий — страницы не должны его изменять.
+    """
+    profile = TWIST_PROFILES[twist]
+    df = twist_rows(_df, twist)
+    index = PartyIndex(df, profile['party_offset'])
+    parties = index.parties.tolist()
+
+    cold_parties = (_df.attrs.get('cold_parties') or {}).get(str(twist), 0)
+    aggregates = {'df': index.df, 'parties': parties, 'index': index, 'cold_parties': cold_parties, 'summary': None}
+    if not parties:
+        return aggregates
+
+    # Сводка по последней и предыдущей партии
+    last_party = parties[-1]
+    metrics = calculate_party_metrics(index.party(last_party), thresholds=profile['thresholds'])
+    prev_metrics = None
+    if len(parties) >= 2:
+        prev_metrics = calculate_party_metrics(index.party(parties[-2]), thresholds=profile['thresholds'])
+    aggregates['summary'] = {
+        'last_party': last_party,
+        'metrics': metrics,
+        'prev_metrics': prev_metrics,
+    }
+
+    # Окна последних партий для сравнительных таблиц
+    aggregates['last_1'] = index.last_n(1)
+    aggregates['last_3'] = index.last_n(3) if len(parties) >= 3 else pd.DataFrame()
+    aggregates['last_10'] = index.last_n(10) if len(parties) >= 10 else pd.DataFrame()
+    return aggregates
+
+
 def get_status_indicator(value, threshold, mode='greater'):
     """Создание индикатора статуса с новым дизайном"""
-    if pd.isna(value):
+    code = status_codes([value], threshold, mode)[0]
+    if code == STATUS_NA:
         return f'<span class="status-indicator" style="color: {COLORS["muted"]};">◯</span>'
     
-    if mode == 'greater':
-        is_good = value >= threshold
-    elif mode == 'less':
-        is_good = value <= threshold
-    elif mode == 'range':
-        min_val, max_val = threshold
-        is_good = min_val <= value <= max_val
-    else:
-        is_good = True
-    
-    if is_good:
+    if code == STATUS_GOOD:
         return f'<span style="color: {COLORS["success"]}; font-size: 20px; text-shadow: 0 0 10px {COLORS["success"]};">●</span>'
     else:
         return f'<span style="color: {COLORS["danger"]}; font-size: 20px; text-shadow: 0 0 10px {COLORS["danger"]};">●</span>'
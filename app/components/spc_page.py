@@ -0,0 +1,377 @@
+import streamlit as st
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_processing import load_data, get_snapshot_version
+from utils.constants import COLORS, TWIST_PROFILES, SPC_PARTY_WINDOWS, SPC_HEAVY_PARTIES
+from utils.compute import request_result
+from utils.auth import login_form, logout_button, is_admin, is_kiosk
+from utils.tracking import track_page_view, track_event
+from utils.freshness import render_data_age, render_freshness_banner
+from utils.perf import timed_profile, timed_section, render_timings_panel
+from utils.profiler import profiled_page
+from utils.history import cold_window, window_party_count
+from components.kiosk import render_kiosk_mode
+from components.layout import inject_custom_css, render_navigation
+from components.metrics import get_profile_aggregates
+from components.spc import (
+    STRENGTH_COL, CV_COL, select_last_parties, compute_spc_job,
+    create_control_chart, create_p_chart, render_spc_summary, select_history_window
+)
+
+
+# ============================================================
+# СЕКЦИИ СТРАНИЦЫ КОНТРОЛЬНЫХ КАРТ
+# Все секции принимают первым аргументом профиль крутки.
+# ============================================================
+
+def get_spc_result(job, profile, version, n_parties, df_filtered, cold=None, **params):
+    """Результат задания SPC: готовый из вычислительного процесса, иначе расчёт здесь"""
+    key = (profile['twist'], n_parties, tuple(sorted(params.items())))
+    found, result = request_result(f'spc.{job}', version, key)
+    if found:
+        return result
+    return compute_spc_job(df_filtered, profile, job, cold=cold, **params)
+
+
+@timed_profile('spc', 'xbar_r')
+def render_xbar_r_section(profile, xbar_r):
+    """X-bar - R карта прочности (xbar_r — результат задания 'xbar_r')"""
+    st.markdown('<div class="section-header">X\u0304-R карта: Разрывная нагрузка</div>', unsafe_allow_html=True)
+
+    if xbar_r:
+        xbar_r_data = xbar_r['data']
+        signals_xbar, signals_r = xbar_r['signals_x'], xbar_r['signals_spread']
+        render_xbar_r_charts(profile, xbar_r_data, signals_xbar, signals_r)
+
+        with st.expander("Параметры расчёта X\u0304-R карты"):
+            param_cols = st.columns(4)
+            with param_cols[0]:
+                st.markdown(f"**Средний размер подгруппы (n):** {xbar_r_data['avg_n']}")
+                st.markdown(f"**Число подгрупп (k):** {len(xbar_r_data['x_bars'])}")
+            with param_cols[1]:
+                st.markdown(f"**X\u0304\u0304 (grand mean):** {xbar_r_data['x_bar_bar']:.2f}")
+                st.markdown(f"**R\u0304 (mean range):** {xbar_r_data['r_bar']:.2f}")
+            with param_cols[2]:
+                st.markdown(f"**A2:** {xbar_r_data['A2']}")
+                st.markdown(f"**D3:** {xbar_r_data['D3']}")
+                st.markdown(f"**D4:** {xbar_r_data['D4']}")
+            with param_cols[3]:
+                st.markdown(f"**UCL (X\u0304):** {xbar_r_data['x_ucl']:.2f}")
+                st.markdown(f"**LCL (X\u0304):** {xbar_r_data['x_lcl']:.2f}")
+                st.markdown(f"**UCL (R):** {xbar_r_data['r_ucl']:.2f}")
+    else:
+        st.warning("Недостаточно данных для построения X\u0304-R карты")
+
+    st.markdown("<div style='height:32px'></div>", unsafe_allow_html=True)
+
+
+@st.fragment
+@timed_profile('spc', 'xbar_r_charts')
+def render_xbar_r_charts(profile, xbar_r_data, signals_xbar, signals_r):
+    """Графики X-bar - R (фрагмент: окно просмотра перерисовывает только графики)"""
+    thresholds = profile['thresholds']
+    render_spc_summary(xbar_r_data, signals_xbar, "Среднее прочности (X\u0304)")
+    window = select_history_window(xbar_r_data['party_labels'], key=f"spc_window_xbar_r{profile['key_suffix']}")
+
+    fig_xbar = create_control_chart(
+        xbar_r_data['party_labels'], xbar_r_data['x_bars'],
+        xbar_r_data['x_bar_bar'], xbar_r_data['x_ucl'], xbar_r_data['x_lcl'],
+        title='X\u0304-карта: Средняя разрывная нагрузка по партии',
+        y_title='Средняя нагрузка, сН/текс',
+        signals=signals_xbar,
+        spec_limit=thresholds['strength_min'],
+        spec_label=f"Мин. допуск: {thresholds['strength_min']}",
+        sigma=xbar_r_data['sigma_x'], x_range=window
+    )
+    st.plotly_chart(fig_xbar, use_container_width=True, config={'displayModeBar': False})
+
+    render_spc_summary({'x_bars': xbar_r_data['ranges']}, signals_r, "Размах (R)")
+
+    fig_r = create_control_chart(
+        xbar_r_data['party_labels'], xbar_r_data['ranges'],
+        xbar_r_data['r_bar'], xbar_r_data['r_ucl'], xbar_r_data['r_lcl'],
+        title='R-карта: Размах разрывной нагрузки в партии',
+        y_title='Размах, сН/текс', signals=signals_r, zone_lines=False, x_range=window
+    )
+    st.plotly_chart(fig_r, use_container_width=True, config={'displayModeBar': False})
+
+
+@timed_profile('spc', 'xbar_s')
+def render_xbar_s_section(profile, xbar_s):
+    """X-bar - S карта CV (xbar_s — результат задания 'xbar_s')"""
+    st.markdown('<div class="section-header">X\u0304-S карта: Коэффициент вариации</div>', unsafe_allow_html=True)
+
+    if xbar_s:
+        xbar_s_data = xbar_s['data']
+        signals_xbar_cv, signals_s = xbar_s['signals_x'], xbar_s['signals_spread']
+        render_xbar_s_charts(profile, xbar_s_data, signals_xbar_cv, signals_s)
+
+        with st.expander("Параметры расчёта X\u0304-S карты"):
+            param_cols = st.columns(4)
+            with param_cols[0]:
+                st.markdown(f"**Средний размер подгруппы (n):** {xbar_s_data['avg_n']}")
+            with param_cols[1]:
+                st.markdown(f"**X\u0304\u0304:** {xbar_s_data['x_bar_bar']:.2f}%")
+                st.markdown(f"**S\u0304:** {xbar_s_data['s_bar']:.2f}")
+            with param_cols[2]:
+                st.markdown(f"**B3:** {xbar_s_data['B3']}")
+                st.markdown(f"**B4:** {xbar_s_data['B4']}")
+            with param_cols[3]:
+                st.markdown(f"**UCL (S):** {xbar_s_data['s_ucl']:.2f}")
+                st.markdown(f"**LCL (S):** {xbar_s_data['s_lcl']:.2f}")
+    else:
+        st.warning("Недостаточно данных для построения X\u0304-S карты")
+
+    st.markdown("<div style='height:32px'></div>", unsafe_allow_html=True)
+
+
+@st.fragment
+@timed_profile('spc', 'xbar_s_charts')
+def render_xbar_s_charts(profile, xbar_s_data, signals_xbar_cv, signals_s):
+    """Графики X-bar - S (фрагмент: окно просмотра перерисовывает только графики)"""
+    thresholds = profile['thresholds']
+    render_spc_summary(xbar_s_data, signals_xbar_cv, "Среднее CV (X\u0304)")
+    window = select_history_window(xbar_s_data['party_labels'], key=f"spc_window_xbar_s{profile['key_suffix']}")
+
+    fig_xbar_cv = create_control_chart(
+        xbar_s_data['party_labels'], xbar_s_data['x_bars'],
+        xbar_s_data['x_bar_bar'], xbar_s_data['x_ucl'], xbar_s_data['x_lcl'],
+        title='X\u0304-карта: Средний CV по партии',
+        y_title='Средний CV, %', signals=signals_xbar_cv,
+        spec_limit=thresholds['cv_max'],
+        spec_label=f"Макс. допуск: {thresholds['cv_max']}%",
+        sigma=xbar_s_data['sigma_x'], x_range=window
+    )
+    st.plotly_chart(fig_xbar_cv, use_container_width=True, config={'displayModeBar': False})
+
+    render_spc_summary({'x_bars': xbar_s_data['stds']}, signals_s, "Стандартное отклонение CV (S)")
+
+    fig_s = create_control_chart(
+        xbar_s_data['party_labels'], xbar_s_data['stds'],
+        xbar_s_data['s_bar'], xbar_s_data['s_ucl'], xbar_s_data['s_lcl'],
+        title='S-карта: Стандартное отклонение CV в партии',
+        y_title='Стд. отклонение CV, %', signals=signals_s, zone_lines=False, x_range=window
+    )
+    st.plotly_chart(fig_s, use_container_width=True, config={'displayModeBar': False})
+
+
+@timed_profile('spc', 'p_charts')
+def render_p_charts_section(profile, p_strength, p_cv):
+    """p-карты доли несоответствующих машин (результаты заданий 'p_strength' и 'p_cv')"""
+    thresholds = profile['thresholds']
+    st.markdown('<div class="section-header">p-карта: Доля несоответствующих машин</div>', unsafe_allow_html=True)
+
+    p_chart_col1, p_chart_col2 = st.columns(2)
+
+    with p_chart_col1:
+        if p_strength:
+            p_data_strength = p_strength['data']
+            fig_p_str, sig_p_str = create_p_chart(
+                p_data_strength,
+                f'p-карта: прочность < {thresholds["strength_min"]}'
+            )
+            render_spc_summary(p_data_strength, sig_p_str, "Доля слабых")
+            st.plotly_chart(fig_p_str, use_container_width=True, config={'displayModeBar': False})
+
+    with p_chart_col2:
+        if p_cv:
+            p_data_cv = p_cv['data']
+            fig_p_cv, sig_p_cv = create_p_chart(
+                p_data_cv,
+                f'p-карта: CV > {thresholds["cv_max"]}%'
+            )
+            render_spc_summary(p_data_cv, sig_p_cv, "Доля нестабильных")
+            st.plotly_chart(fig_p_cv, use_container_width=True, config={'displayModeBar': False})
+
+    st.markdown("<div style='height:32px'></div>", unsafe_allow_html=True)
+
+
+@st.fragment
+@timed_profile('spc', 'xmr')
+def render_xmr_section(profile, version, n_parties, df_filtered):
+    """X-MR карта по отдельной машине (фрагмент: перезапускается при смене машины или метрики)"""
+    thresholds = profile['thresholds']
+    st.markdown('<div class="section-header">X-MR карта: Мониторинг отдельной машины</div>', unsafe_allow_html=True)
+
+    st.markdown("""
+        <div class="info-block">
+            <h4>Индивидуальная контрольная карта</h4>
+            <p>Выберите машину для отслеживания её разрывной нагрузки от партии к партии.
+            X-карта показывает индивидуальные значения, MR-карта — скользящие размахи между соседними партиями.</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    machines = sorted(df_filtered['№ ПМ'].dropna().unique())
+    machine_cols = st.columns([2, 2, 2])
+
+    with machine_cols[0]:
+        selected_machine = st.selectbox(
+            "Выберите машину:", machines,
+            format_func=lambda x: f"ПМ {int(x)}", key=f"spc_machine{profile['key_suffix']}"
+        )
+
+    with machine_cols[1]:
+        xmr_metric = st.selectbox(
+            "Метрика:", [STRENGTH_COL, CV_COL],
+            format_func=lambda x: "Разрывная нагрузка" if "нагрузка" in x else "Коэф. вариации",
+            key=f"spc_xmr_metric{profile['key_suffix']}"
+        )
+
+    if selected_machine:
+        # X-MR строится только для окон до SPC_HEAVY_PARTIES партий, а они целиком
+        # в горячей части (hot_parties >= SPC_HEAVY_PARTIES): хватает строк окна
+        xmr = get_spc_result('xmr', profile, version, n_parties, df_filtered,
+                             machine=selected_machine, metric_col=xmr_metric)
+
+        if xmr:
+            xmr_data = xmr['data']
+            signals_xmr, signals_mr = xmr['signals_x'], xmr['signals_mr']
+            metric_label = "Прочность" if "нагрузка" in xmr_metric else "CV"
+            render_spc_summary({'x_bars': xmr_data['values']}, signals_xmr, f"ПМ {int(selected_machine)} — {metric_label}")
+
+            xmr_cols = st.columns(2)
+
+            with xmr_cols[0]:
+                spec = thresholds['strength_min'] if "нагрузка" in xmr_metric else thresholds['cv_max']
+                spec_lbl = f"Мин: {spec}" if "нагрузка" in xmr_metric else f"Макс: {spec}"
+                fig_x = create_control_chart(
+                    xmr_data['party_labels'], xmr_data['values'],
+                    xmr_data['x_bar'], xmr_data['x_ucl'], xmr_data['x_lcl'],
+                    title=f'X-карта: ПМ {int(selected_machine)}',
+                    y_title=xmr_metric.split(',')[0], signals=signals_xmr,
+                    spec_limit=spec, spec_label=spec_lbl, sigma=xmr_data['sigma_est']
+                )
+                st.plotly_chart(fig_x, use_container_width=True, config={'displayModeBar': False})
+
+            with xmr_cols[1]:
+                fig_mr = create_control_chart(
+                    xmr_data['mr_parties'], xmr_data['mr'],
+                    xmr_data['mr_bar'], xmr_data['mr_ucl'], xmr_data['mr_lcl'],
+                    title=f'MR-карта: ПМ {int(selected_machine)}',
+                    y_title='Скользящий размах', signals=signals_mr, zone_lines=False
+                )
+                st.plotly_chart(fig_mr, use_container_width=True, config={'displayModeBar': False})
+
+            with st.expander(f"Параметры X-MR карты для ПМ {int(selected_machine)}"):
+                param_cols = st.columns(3)
+                with param_cols[0]:
+                    st.markdown(f"**Точек:** {len(xmr_data['values'])}")
+                    st.markdown(f"**X\u0304:** {xmr_data['x_bar']:.2f}")
+                with param_cols[1]:
+                    st.markdown(f"**MR\u0304:** {xmr_data['mr_bar']:.2f}")
+                    st.markdown(f"**sigma (MR\u0304/d2):** {xmr_data['sigma_est']:.2f}")
+                with param_cols[2]:
+                    st.markdown(f"**UCL (X):** {xmr_data['x_ucl']:.2f}")
+                    st.markdown(f"**LCL (X):** {xmr_data['x_lcl']:.2f}")
+                    st.markdown(f"**UCL (MR):** {xmr_data['mr_ucl']:.2f}")
+        else:
+            st.warning(f"Недостаточно данных для машины ПМ {int(selected_machine)}")
+
+
+# ============================================================
+# ГЛАВНАЯ СТРАНИЦА
+# ============================================================
+
+
+@profiled_page('spc')
+def render_spc_page(twist):
+    """Страница контрольных карт для профиля крутки из TWIST_PROFILES"""
+    profile = TWIST_PROFILES[twist]
+    suffix = profile['key_suffix']
+
+    render_navigation()
+
+    if not login_form():
+        return
+
+    track_page_view(f"spc_{twist}")
+    inject_custom_css()
+
+    st.markdown(
+        f'<div class="dashboard-header">Контрольные карты Шухарта — {profile["short_label"]}</div>',
+        unsafe_allow_html=True
+    )
+
+    header_cols = st.columns([3, 2, 1, 1])
+    with header_cols[0]:
+        st.markdown(f"<span style='color:#94a3b8;font-size:13px;'>Пользователь: <b>{st.session_state.user_info['name']}</b></span>", unsafe_allow_html=True)
+    if is_kiosk():
+        render_kiosk_mode()
+    else:
+        with header_cols[2]:
+            if st.button('Обновить', key=f"spc_refresh{suffix}"):
+                track_event(f"spc_{twist}", 'refresh')
+                load_data.clear()
+                st.rerun()
+        with header_cols[3]:
+            logout_button()
+
+    with st.spinner('Загрузка данных...'):
+        if 'df' not in st.session_state:
+            st.session_state.df = load_data()
+        df = st.session_state.df
+
+    if df is None or df.empty:
+        st.error("Не удалось загрузить данные.")
+        return
+
+    with header_cols[1]:
+        render_data_age(df)
+    render_freshness_banner(df)
+
+    # Срез по крутке из общих агрегатов профиля
+    version = get_snapshot_version(df)
+    aggregates = get_profile_aggregates(df, version, twist)
+
+    st.markdown(f"""
+        <div class="info-block">
+            <h4>Статистическое управление процессом (SPC) — Нить {profile['short_label']}</h4>
+            <p>Контрольные карты построены по ГОСТ ISO 7870-2.
+            Подгруппа = все машины одной партии. Красные точки — сигналы выхода из управляемого состояния.
+            Жёлтые пунктирные линии — предупредительные границы (±2σ).</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    settings_cols = st.columns([2, 2, 2])
+    with settings_cols[0]:
+        n_parties = st.selectbox(
+            "Количество партий для анализа:",
+            SPC_PARTY_WINDOWS, index=2, key=f"spc_n_parties{suffix}"
+        )
+
+    # Горячие строки окна и готовые характеристики холодных партий
+    all_parties = aggregates['parties']
+    df_filtered = select_last_parties(aggregates['index'], n_parties)
+    cold = cold_window(twist, version, len(all_parties), n_parties)
+    n_window = window_party_count(version, len(all_parties), aggregates['cold_parties'], n_parties)
+    if n_window is None:
+        st.warning(f"Холодная история снимка недоступна: карты построены только по последним "
+                   f"{len(all_parties)} партиям. Нажмите «Обновить», чтобы загрузить данные заново.")
+
+    with timed_section(f"spc_{twist}.page"):
+        render_xbar_r_section(profile, get_spc_result('xbar_r', profile, version, n_parties, df_filtered, cold))
+        render_xbar_s_section(profile, get_spc_result('xbar_s', profile, version, n_parties, df_filtered, cold))
+
+        # Пропуск тяжёлых графиков при большом объёме данных
+        # Без холодной истории окно не считается коротким: число партий неизвестно
+        if n_window is None or n_window > SPC_HEAVY_PARTIES:
+            st.info(f"p-карты и X-MR карта не отображаются при выборе более {SPC_HEAVY_PARTIES} партий (долгие вычисления).")
+        else:
+            render_p_charts_section(
+                profile,
+                get_spc_result('p_strength', profile, version, n_parties, df_filtered, cold),
+                get_spc_result('p_cv', profile, version, n_parties, df_filtered, cold),
+            )
+            render_xmr_section(profile, version, n_parties, df_filtered)
+
+    st.markdown(f"""
+        <div style="text-align: center; margin-top: 40px; padding: 20px; color: {COLORS['text_secondary']};">
+            <small>Контрольные карты по ГОСТ ISO 7870-2 | Нить {profile['short_label']} | Данные из Google Sheets</small>
+        </div>
+    """, unsafe_allow_html=True)
+
+    if is_admin():
+        render_timings_panel()
@@ -0,0 +1,148 @@
+"""Вычислительный процесс: снимок данных и готовые результаты контрольных карт.
+
+Процесс только читает общий снимок SPINNING_SNAPSHOT_PATH: загружает данные
+и пишет снимок и холодную историю воркер Streamlit.
+После каждого нового снимка процесс считает карты X̄-R, X̄-S и p-карты
+обоих профилей крутки для всех вариантов числа партий. Страницы
+получают готовые результаты по локальному сокету, а задания, которых
+нет в готовых (X-MR по машине), процесс считает по запросу. Тяжёлые
+расчёты не занимают потоки Streamlit, а при остановленном процессе
+страницы считают сами.
+
+Запуск (нужны SPINNING_SNAPSHOT_PATH и ключ SPINNING_COMPUTE_KEY):
+    python app/compute_worker.py                      # 127.0.0.1:8520
+    python app/compute_worker.py --address /tmp/spinning-compute.sock
+
+Страницам адрес передаётся через SPINNING_COMPUTE_ADDRESS (тот же host:port или путь),
+ключ — тот же SPINNING_COMPUTE_KEY.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from streamlit.logger import set_log_level
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from components.metrics import get_profile_aggregates
+from components.spc import SPC_JOBS, select_last_parties, compute_spc_job
+from utils.compute import RESULT_OK, RESULT_STALE, COMPUTE_ADDRESS_ENV, COMPUTE_KEY_ENV, compute_address, serve
+from utils.constants import TWIST_PROFILES, SPC_PARTY_WINDOWS, SPC_HEAVY_PARTIES, COMPUTE_CONFIG
+from utils.data_processing import get_snapshot_version
+from utils.history import cold_window, window_party_count
+from utils.snapshot import SNAPSHOT_PATH_ENV, snapshot_path, read_snapshot
+
+DEFAULT_ADDRESS = '127.0.0.1:8520'
+
+# Текущий снимок: (версия, агрегаты профилей) и результаты заданий
+_state = {'current': (None, {}), 'mtime': None}
+_results = OrderedDict()
+_lock = threading.Lock()
+
+
+def load_snapshot():
+    """Общий снимок воркеров, если файл сменился; None — снимка нет или он прежний"""
+    path = snapshot_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except (OSError, TypeError):
+        return None
+    if mtime == _state['mtime']:
+        return None
+    _state['mtime'] = mtime
+    return read_snapshot(path)
+
+
+def _run_job(version, aggregates, job, key):
+    """Результат задания из памяти или расчёт; ключ — (крутка, число партий, параметры)"""
+    cache_key = (version, job, key)
+    with _lock:
+        if cache_key in _results:
+            _results.move_to_end(cache_key)
+            return _results[cache_key]
+
+    twist, n_parties, params = key
+    df_filtered = select_last_parties(aggregates[twist]['index'], n_parties)
+    cold = cold_window(twist, version, len(aggregates[twist]['parties']), n_parties)
+    result = compute_spc_job(df_filtered, TWIST_PROFILES[twist], job, cold=cold, **dict(params))
+    with _lock:
+        _results[cache_key] = result
+        while len(_results) > COMPUTE_CONFIG['max_results']:
+            _results.popitem(last=False)
+    return result
+
+
+def handle_request(job, version, key):
+    current_version, aggregates = _state['current']
+    job = job.removeprefix('spc.')
+    if version != current_version or job not in SPC_JOBS:
+        return RESULT_STALE, None
+    return RESULT_OK, _run_job(version, aggregates, job, key)
+
+
+def precompute(version, aggregates):
+    """Карты всех профилей и вариантов числа партий для нового снимка"""
+    start = time.perf_counter()
+    count = 0
+    for twist, profile_aggregates in aggregates.items():
+        for n_parties in SPC_PARTY_WINDOWS:
+            jobs = ['xbar_r', 'xbar_s']
+            n = window_party_count(version, len(profile_aggregates['parties']),
+                                   profile_aggregates['cold_parties'], n_parties)
+            if n is not None and n <= SPC_HEAVY_PARTIES:
+                jobs += ['p_strength', 'p_cv']
+            for job in jobs:
+                _run_job(version, aggregates, job, (twist, n_parties, ()))
+                count += 1
+    print(f"{datetime.now():%H:%M:%S} Снимок {version}: {count} заданий за {time.perf_counter() - start:.1f} с")
+
+
+def refresh():
+    """Переход на новый снимок данных (результаты прежнего снимка удаляются)"""
+    df = load_snapshot()
+    if df is None or df.empty:
+        return False
+    version = get_snapshot_version(df)
+    if version == _state['current'][0]:
+        return False
+
+    aggregates = {twist: get_profile_aggregates(df, version, twist) for twist in TWIST_PROFILES}
+    with _lock:
+        _results.clear()
+        _state['current'] = (version, aggregates)
+    precompute(version, aggregates)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Вычислительный процесс контрольных карт')
+    parser.add_argument('--address', default=os.getenv(COMPUTE_ADDRESS_ENV) or DEFAULT_ADDRESS,
+                        help='host:port или путь к unix-сокету')
+    args = parser.parse_args()
+    os.environ[COMPUTE_ADDRESS_ENV] = args.address
+    for env in (SNAPSHOT_PATH_ENV, COMPUTE_KEY_ENV):
+        if not os.getenv(env):
+            parser.error(f"не задана переменная окружения {env}")
+
+    # Предупреждения Streamlit о запуске вне сервера не нужны
+    set_log_level('error')
+
+    threading.Thread(target=serve, args=(compute_address(), handle_request), daemon=True).start()
+    print(f"Вычислительный процесс: {args.address}")
+
+    try:
+        while True:
+            try:
+                refresh()
+            except Exception as e:
+                print(f"{datetime.now():%H:%M:%S} Ошибка обновления: {e}")
+            time.sleep(COMPUTE_CONFIG['refresh_seconds'])
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""Статический экспорт дашбордов для цеховых экранов.
+
+Рендерит дашборд и контрольные карты последней партии каждого профиля
+крутки в самодостаточные HTML-файлы (и PNG при установленном kaleido).
+Пассивным экранам не нужна живая сессия Streamlit — они открывают
+готовые файлы, которые пересобираются только при появлении нового
+снимка данных.
+
+Запуск:
+    python app/export_static.py                  # однократный экспорт
+    python app/export_static.py --watch 300      # проверка снимка каждые 5 минут
+    python app/export_static.py --watch 300 --serve 8502
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from components.charts import create_trend_chart, create_problem_machines_chart, create_quality_scatter
+from components.dashboard_page import find_speed_column
+from components.metrics import get_profile_aggregates
+from components.spc import calc_xbar_r_data, calc_p_chart_data, detect_out_of_control, create_control_chart, create_p_chart
+from utils.constants import COLORS, TWIST_PROFILES
+from utils.data_processing import load_data, get_snapshot_version
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'static')
+MANIFEST_FILE = 'manifest.json'
+
+# Число партий на контрольных картах (как по умолчанию на странице)
+SPC_PARTIES = 20
+
+# Период автообновления страниц на экранах, сек
+REFRESH_SECONDS = 60
+
+STRENGTH_COL = 'Относительная разрывная нагрузка, сН/текс'
+CV_COL = 'Коэффициент вариации, %'
+
+
+def _page_html(title, body, refresh=REFRESH_SECONDS):
+    """Обёртка страницы в тёмной теме дашборда"""
+    return f"""<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<meta http-equiv="refresh" content="{refresh}">
+<title>{title}</title>
+<style>
+    body {{ background: {COLORS['background']}; color: {COLORS['text']}; font-family: 'Inter', 'Segoe UI', sans-serif; margin: 24px; }}
+    h1 {{ text-align: center; font-size: 28px; margin-bottom: 4px; }}
+    h2 {{ border-left: 4px solid {COLORS['primary']}; padding-left: 12px; font-size: 20px; margin-top: 32px; }}
+    .subtitle {{ text-align: center; color: {COLORS['text_secondary']}; font-size: 14px; }}
+    .kpi {{ display: flex; gap: 16px; justify-content: center; margin: 24px 0; }}
+    .kpi div {{ background: {COLORS['card']}; border: 1px solid {COLORS['grid']}; border-radius: 8px; padding: 16px 24px; text-align: center; min-width: 180px; }}
+    .kpi b {{ display: block; font-size: 28px; margin-top: 6px; }}
+    .row {{ display: flex; gap: 16px; }}
+    .row > div {{ flex: 1; }}
+    a {{ color: {COLORS['primary']}; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def _write_atomic(path, text):
+    """Запись через временный файл: экран не увидит наполовину записанную страницу"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class _FigureWriter:
+    """Сборка графиков страницы: plotly.js встраивается один раз, PNG — по возможности"""
+
+    def __init__(self, out_dir, prefix, png):
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.png = png
+        self._js_included = False
+
+    def __call__(self, fig, name):
+        html = fig.to_html(full_html=False, include_plotlyjs=not self._js_included,
+                           config={'displayModeBar': False})
+        self._js_included = True
+        if self.png:
+            try:
+                fig.write_image(os.path.join(self.out_dir, f"{self.prefix}_{name}.png"), width=1400, height=fig.layout.height or 500)
+            except Exception as e:
+                print(f"PNG не сохранён ({name}): {e}")
+                self.png = False
+        return html
+
+
+def _kpi_html(metrics, thresholds):
+    """Карточки KPI последней партии"""
+    def card(label, value, good):
+        color = COLORS['success'] if good else COLORS['danger']
+        return f"<div>{label}<b style='color:{color}'>{value}</b></div>"
+
+    density_min, density_max = thresholds['density_range']
+    return '<div class="kpi">' + ''.join([
+        card('Разрывная нагрузка, сН/текс', metrics['avg_strength'], metrics['avg_strength'] >= thresholds['strength_min']),
+        card('Коэф. вариации, %', metrics['avg_cv'], metrics['avg_cv'] <= thresholds['cv_max']),
+        card('Лин. плотность, текс', metrics['avg_density'], density_min <= metrics['avg_density'] <= density_max),
+        card('Отклонений', metrics['low_strength_count'] + metrics['high_cv_count'] + metrics['bad_density_count'],
+             metrics['low_strength_count'] + metrics['high_cv_count'] + metrics['bad_density_count'] < 5),
+    ]) + '</div>'
+
+
+def export_dashboard(profile, aggregates, out_dir, png=False):
+    """Дашборд последней партии профиля"""
+    party_index = aggregates['index']
+    summary = aggregates['summary']
+    thresholds = profile['thresholds']
+    party_label = party_index.label(summary['last_party'])
+    figure = _FigureWriter(out_dir, f"{profile['chart_key']}_dashboard", png)
+
+    recent = party_index.last_n(10)
+    last_10_parties = recent.groupby('№ партии').agg({STRENGTH_COL: 'mean'}).round(1)
+    trend_fig = create_trend_chart(
+        last_10_parties, df=recent, speed_col=find_speed_column(recent),
+        strength_min=thresholds['strength_min'], party_offset=profile['party_offset']
+    )
+    problem_fig = create_problem_machines_chart(
+        party_index.df, last_n_parties=10, strength_min=thresholds['strength_min'], cv_max=thresholds['cv_max'],
+        party_index=party_index
+    )
+    scatter_fig = create_quality_scatter(
+        party_index.party(summary['last_party']), summary['last_party'],
+        strength_min=thresholds['strength_min'], cv_max=thresholds['cv_max'], party_offset=profile['party_offset']
+    )
+
+    body = f"""
+<h1>{profile['label']}</h1>
+<div class="subtitle">Партия № {party_label} | Сформировано: {datetime.now().strftime('%d.%m.%Y %H:%M')}</div>
+{_kpi_html(summary['metrics'], thresholds)}
+<h2>Динамика по партиям</h2>
+{figure(trend_fig, 'trend')}
+<div class="row">
+    <div><h2>Топ проблемных машин</h2>{figure(problem_fig, 'problem')}</div>
+    <div><h2>Карта качества партии</h2>{figure(scatter_fig, 'scatter')}</div>
+</div>
+"""
+    path = os.path.join(out_dir, f"{profile['chart_key']}_dashboard.html")
+    _write_atomic(path, _page_html(f"Дашборд | Нить {profile['short_label']}", body))
+    return path
+
+
+def export_spc(profile, aggregates, out_dir, png=False):
+    """Контрольные карты по последним партиям профиля"""
+    thresholds = profile['thresholds']
+    offset = profile['party_offset']
+    df_filtered = aggregates['index'].last_n(SPC_PARTIES)
+    figure = _FigureWriter(out_dir, f"{profile['chart_key']}_spc", png)
+
+    sections = []
+    xbar_r = calc_xbar_r_data(df_filtered, STRENGTH_COL, offset=offset)
+    if xbar_r:
+        signals = detect_out_of_control(xbar_r['x_bars'], xbar_r['x_bar_bar'], xbar_r['x_ucl'], xbar_r['x_lcl'])
+        fig = create_control_chart(
+            xbar_r['party_labels'], xbar_r['x_bars'], xbar_r['x_bar_bar'], xbar_r['x_ucl'], xbar_r['x_lcl'],
+            title='X\u0304-карта: Средняя разрывная нагрузка по партии',
+            y_title='Средняя нагрузка, сН/текс', signals=signals,
+            spec_limit=thresholds['strength_min'], spec_label=f"Мин. допуск: {thresholds['strength_min']}",
+            sigma=xbar_r['sigma_x']
+        )
+        sections.append(f"<h2>X\u0304-R карта: Разрывная нагрузка</h2>{figure(fig, 'xbar_strength')}")
+
+    xbar_s = calc_xbar_r_data(df_filtered, CV_COL, offset=offset)
+    if xbar_s:
+        signals = detect_out_of_control(xbar_s['x_bars'], xbar_s['x_bar_bar'], xbar_s['x_ucl'], xbar_s['x_lcl'])
+        fig = create_control_chart(
+            xbar_s['party_labels'], xbar_s['x_bars'], xbar_s['x_bar_bar'], xbar_s['x_ucl'], xbar_s['x_lcl'],
+            title='X\u0304-карта: Средний CV по партии',
+            y_title='Средний CV, %', signals=signals,
+            spec_limit=thresholds['cv_max'], spec_label=f"Макс. допуск: {thresholds['cv_max']}%",
+            sigma=xbar_s['sigma_x']
+        )
+        sections.append(f"<h2>X\u0304-S карта: Коэффициент вариации</h2>{figure(fig, 'xbar_cv')}")
+
+    p_charts = []
+    p_strength = calc_p_chart_data(df_filtered, STRENGTH_COL, threshold=thresholds['strength_min'], mode='less', offset=offset)
+    if p_strength:
+        fig, _ = create_p_chart(p_strength, f"p-карта: прочность < {thresholds['strength_min']}")
+        p_charts.append(f"<div>{figure(fig, 'p_strength')}</div>")
+    p_cv = calc_p_chart_data(df_filtered, CV_COL, threshold=thresholds['cv_max'], mode='greater', offset=offset)
+    if p_cv:
+        fig, _ = create_p_chart(p_cv, f"p-карта: CV > {thresholds['cv_max']}%")
+        p_charts.append(f"<div>{figure(fig, 'p_cv')}</div>")
+    if p_charts:
+        sections.append(f"<h2>p-карта: Доля несоответствующих машин</h2><div class=\"row\">{''.join(p_charts)}</div>")
+
+    body = f"""
+<h1>Контрольные карты Шухарта — {profile['short_label']}</h1>
+<div class="subtitle">Последние {SPC_PARTIES} партий | Сформировано: {datetime.now().strftime('%d.%m.%Y %H:%M')}</div>
+{''.join(sections)}
+"""
+    path = os.path.join(out_dir, f"{profile['chart_key']}_spc.html")
+    _write_atomic(path, _page_html(f"Контрольные карты | {profile['short_label']}", body))
+    return path
+
+
+def read_manifest(out_dir=STATIC_DIR):
+    """Сведения о последнем экспорте (None, если экспорта не было)"""
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def export_all(df, out_dir=STATIC_DIR, png=False, force=False):
+    """Экспорт всех профилей; пропускается, если снимок данных не изменился"""
+    version = get_snapshot_version(df)
+    manifest = read_manifest(out_dir)
+    if not force and manifest and manifest.get('snapshot_version') == version:
+        return False
+
+    os.makedirs(out_dir, exist_ok=True)
+    links = []
+    parties = {}
+    for twist, profile in TWIST_PROFILES.items():
+        aggregates = get_profile_aggregates(df, version, twist)
+        if not aggregates['parties']:
+            continue
+        dashboard_path = export_dashboard(profile, aggregates, out_dir, png=png)
+        spc_path = export_spc(profile, aggregates, out_dir, png=png)
+        party_label = int(aggregates['summary']['last_party']) - profile['party_offset']
+        parties[str(twist)] = party_label
+        links.append(
+            f"<li>{profile['label']} — партия № {party_label}: "
+            f"<a href=\"{os.path.basename(dashboard_path)}\">дашборд</a> | "
+            f"<a href=\"{os.path.basename(spc_path)}\">контрольные карты</a></li>"
+        )
+
+    _write_atomic(os.path.join(out_dir, 'index.html'),
+                  _page_html('Дашборды прядильного цеха', f"<h1>Дашборды прядильного цеха</h1><ul>{''.join(links)}</ul>"))
+
+    # Манифест пишется последним: по нему определяется, что экспорт завершён
+    manifest = {
+        'snapshot_version': version,
+        'parties': parties,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    _write_atomic(os.path.join(out_dir, MANIFEST_FILE), json.dumps(manifest, ensure_ascii=False, indent=2))
+    return True
+
+
+def serve(out_dir, port):
+    """Раздача экспортированных файлов простым HTTP-сервером в фоновом потоке"""
+    handler = partial(SimpleHTTPRequestHandler, directory=out_dir)
+    server = ThreadingHTTPServer(('0.0.0.0', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Статические дашборды: http://0.0.0.0:{port}/")
+    return server
+
+
+def _png_available():
+    try:
+        import kaleido  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Статический экспорт дашбордов последней партии')
+    parser.add_argument('--out', default=STATIC_DIR, help='папка для HTML/PNG')
+    parser.add_argument('--watch', type=int, default=0, metavar='SEC', help='проверять новый снимок данных каждые SEC секунд')
+    parser.add_argument('--serve', type=int, default=0, metavar='PORT', help='раздавать папку по HTTP на порту PORT')
+    parser.add_argument('--no-png', action='store_true', help='не сохранять PNG')
+    parser.add_argument('--force', action='store_true', help='экспортировать даже без изменения данных')
+    args = parser.parse_args()
+
+    out_dir = os.path.abspath(args.out)
+    os.makedirs(out_dir, exist_ok=True)
+
+    png = not args.no_png and _png_available()
+    if not args.no_png and not png:
+        print("kaleido не установлен — PNG не сохраняются (pip install kaleido)")
+
+    if args.serve:
+        serve(out_dir, args.serve)
+
+    force = args.force
+    while True:
+        # Только свой кэш: с общим снимком новые данные приходят от воркеров,
+        # пометка снимка устаревшим заставила бы всех перезагружать лист каждый цикл
+        load_data.clear_local()
+        df = load_data()
+        if df is None or df.empty:
+            print(f"{datetime.now():%H:%M:%S} Не удалось загрузить данные")
+        elif export_all(df, out_dir, png=png, force=force):
+            print(f"{datetime.now():%H:%M:%S} Экспорт обновлён: снимок {get_snapshot_version(df)}")
+        force = False
+
+        if not args.watch:
+            break
+        time.sleep(args.watch)
+
+    # Без режима наблюдения сервер продолжает раздавать последний экспорт
+    if args.serve and not args.watch:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""Хеш пароля для config/users.yaml.
+
+Запуск:
+    python app/hash_password.py <пароль>
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.auth import hash_password
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    print(hash_password(sys.argv[1]))
@@ -0,0 +1,33 @@
+"""Новый токен экрана-киоска в config/kiosk_tokens.yaml (файл не хранится в репозитории).
+
+Запуск при развёртывании:
+    python app/kiosk_token.py "Экран цеха"
+Печатает ссылку-параметр ?kiosk=<токен>.
+"""
+import os
+import secrets
+import sys
+
+import yaml
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.auth import KIOSK_TOKENS_PATH
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+
+    config = {}
+    if KIOSK_TOKENS_PATH.exists():
+        with open(KIOSK_TOKENS_PATH, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+    token = secrets.token_urlsafe(16)
+    config.setdefault('tokens', {})[token] = {'name': sys.argv[1]}
+
+    KIOSK_TOKENS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(KIOSK_TOKENS_PATH, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, allow_unicode=True, sort_keys=False)
+    os.chmod(KIOSK_TOKENS_PATH, 0o600)
+    print(f"?kiosk={token}")
@@ -5,8 +5,13 @@ from datetime import datetime
 import pandas as pd
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.auth import is_admin, get_visit_stats, logout_button
+from utils.auth import (
+    is_admin, get_visit_stats, get_visit_history, get_peak_concurrency, logout_button,
+    VISIT_HISTORY_PAGE_SIZE, VISIT_STALE_MINUTES
+)
 from utils.constants import COLORS
+from components.layout import render_navigation
+from utils.tracking import track_page_view, get_tracking_stats, render_heartbeat
 
 st.set_page_config(
     page_title="Статистика для администратора",
@@ -17,15 +22,7 @@ st.set_page_config(
 def main():
 
     # --- Кастомная навигация с русскими названиями ---
-    st.markdown("""<style>[data-testid="stSidebarNav"] {display: none;}</style>""", unsafe_allow_html=True)
-    st.sidebar.markdown("### Дашборды")
-    st.sidebar.page_link("dashboard.py", label="Нить с круткой 100 кр/м", icon="🏭")
-    st.sidebar.page_link("pages/1_Дашборд_нити_с_круткой_50_крм.py", label="Нить с круткой 50 кр/м", icon="🧵")
-    st.sidebar.markdown("### Контрольные карты")
-    st.sidebar.page_link("pages/2_Контрольные_карты_100_крм.py", label="Контрольные карты 100 кр/м", icon="📊")
-    st.sidebar.page_link("pages/3_Контрольные_карты_50_крм.py", label="Контрольные карты 50 кр/м", icon="📈")
-    st.sidebar.markdown("### Администратор")
-    st.sidebar.page_link("pages/5_Статистика_для_администратора.py", label="Статистика посещений", icon="👤")
+    render_navigation()
 
     if not st.session_state.get('authenticated'):
         st.warning("Необходима авторизация. Перейдите на главную страницу.")
@@ -36,6 +33,8 @@ def main():
         st.stop()
     
     logout_button()
+    track_page_view('admin_stats')
+    render_heartbeat()
     
     st.title("📊 Статистика посещений")
     st.markdown(f"Администратор: **{st.session_state.user_info['name']}**")
@@ -43,12 +42,17 @@ def main():
     
     stats = get_visit_stats()
     
-    col1, col2, col3 = st.columns(3)
+    peak, peak_time = get_peak_concurrency()
+    
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("👥 Всего посещений", len(stats['visits']))
+        st.metric("👥 Всего посещений", stats['total_visits'])
     with col2:
-        st.metric("🟢 Активных сессий", len(stats['active_sessions']))
+        st.metric("🟢 Сейчас онлайн", len(stats['active_sessions']))
     with col3:
+        st.metric("📈 Пик одновременно (7 дней)", peak,
+                  help=f"Момент пика: {peak_time[:16]}" if peak_time else None)
+    with col4:
         total_minutes = sum([v[3] or 0 for v in stats['user_stats']])
         st.metric("⏱️ Общее время (мин)", total_minutes)
     
@@ -56,15 +60,27 @@ def main():
     
     st.subheader("🟢 Сейчас онлайн")
     if stats['active_sessions']:
+        now = datetime.now()
         for session in stats['active_sessions']:
-            login_time = datetime.fromisoformat(session[2])
-            duration = int((datetime.now() - login_time).total_seconds() / 60)
-            st.markdown(f"**{session[1]}** ({session[0]}) — {duration} мин")
+            duration = int((now - datetime.fromisoformat(session[2])).total_seconds() / 60)
+            idle = int((now - datetime.fromisoformat(session[3])).total_seconds() / 60)
+            st.markdown(f"**{session[1]}** ({session[0]}) — {duration} мин, активность {idle} мин назад")
     else:
         st.info("Нет активных сессий")
+    st.caption(f"Онлайн — открытая вкладка с отметкой активности за последние {VISIT_STALE_MINUTES} мин")
     
     st.markdown("<br>", unsafe_allow_html=True)
     
+    st.subheader("📅 Посещения по дням (30 дней)")
+    if stats['daily_stats']:
+        df_daily = pd.DataFrame(stats['daily_stats'], columns=['День', 'Посещений', 'Пользователей', 'Минут'])
+        df_daily['День'] = pd.to_datetime(df_daily['День'])
+        st.bar_chart(df_daily.set_index('День')[['Посещений', 'Пользователей']])
+    else:
+        st.info("Нет данных")
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
     st.subheader("👥 Статистика по пользователям")
     if stats['user_stats']:
         df_users = pd.DataFrame(stats['user_stats'], 
@@ -76,9 +92,36 @@ def main():
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    st.subheader("📋 Последние посещения")
-    if stats['visits']:
-        df_visits = pd.DataFrame(stats['visits'],
+    st.subheader("📄 Страницы за 30 дней")
+    if stats['page_stats']:
+        df_pages = pd.DataFrame(stats['page_stats'],
+            columns=['Страница', 'Просмотров', 'Действий', 'Пользователей', 'Последний просмотр'])
+        df_pages['Последний просмотр'] = pd.to_datetime(df_pages['Последний просмотр']).dt.strftime('%d.%m.%Y %H:%M')
+        st.dataframe(df_pages, use_container_width=True, hide_index=True)
+    else:
+        st.info("Нет данных")
+
+    tracking = get_tracking_stats()
+    st.caption(
+        f"Очередь событий: в очереди {tracking['queued']}, записано {tracking['written']} "
+        f"({tracking['batches']} пачек), отброшено {tracking['dropped']}, ошибок записи {tracking['failed']}, "
+        f"ошибок фоновых задач {tracking['task_failed']}"
+    )
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    st.subheader("📋 История посещений")
+    render_visit_history()
+
+
+def render_visit_history():
+    """История посещений с постраничной навигацией по ключу (login_time, id)"""
+    # Стек курсоров: начало каждой открытой страницы
+    cursors = st.session_state.setdefault('visit_history_cursors', [None])
+    rows = get_visit_history(cursors[-1])
+
+    if rows:
+        df_visits = pd.DataFrame([row[1:] for row in rows],
             columns=['Логин', 'Имя', 'Вход', 'Выход', 'Длительность (мин)'])
         df_visits['Вход'] = pd.to_datetime(df_visits['Вход']).dt.strftime('%d.%m.%Y %H:%M')
         df_visits['Выход'] = df_visits['Выход'].apply(
@@ -88,5 +131,17 @@ def main():
     else:
         st.info("Нет данных")
 
+    nav_cols = st.columns([1, 1, 6])
+    with nav_cols[0]:
+        if st.button("← Новее", disabled=len(cursors) == 1, key="visit_history_prev"):
+            cursors.pop()
+            st.rerun()
+    with nav_cols[1]:
+        if st.button("Старее →", disabled=len(rows) < VISIT_HISTORY_PAGE_SIZE, key="visit_history_next"):
+            cursors.append((rows[-1][3], rows[-1][0]))
+            st.rerun()
+    with nav_cols[2]:
+        st.caption(f"Страница {len(cursors)}")
+
 if __name__ == "__main__":
     main()
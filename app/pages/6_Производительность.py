@@ -0,0 +1,187 @@
+import streamlit as st
+import sys
+import os
+from datetime import datetime
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.auth import is_admin, logout_button
+from components.layout import render_navigation
+from utils.tracking import track_page_view, render_heartbeat
+from utils.constants import FRESHNESS_SLO
+from utils.freshness import get_fetch_log, get_last_fetch, get_last_change, FETCH_COLUMNS
+from utils.profiler import list_profiles, PROFILE_INTERVAL_MS
+from utils.perf import (
+    summarize_timings, get_slowest_reruns, get_cache_stats, get_rollup_history,
+    TIMINGS_BUFFER_SIZE, RERUN_SUFFIXES
+)
+
+# Последних профилей на странице
+PROFILES_SHOWN = 10
+
+st.set_page_config(
+    page_title="Производительность",
+    page_icon="⏱️",
+    layout="wide"
+)
+
+
+def main():
+
+    render_navigation()
+
+    if not st.session_state.get('authenticated'):
+        st.warning("Необходима авторизация. Перейдите на главную страницу.")
+        st.stop()
+
+    if not is_admin():
+        st.error("Доступ запрещён. Только для администраторов.")
+        st.stop()
+
+    logout_button()
+    track_page_view('admin_perf')
+    render_heartbeat()
+
+    st.title("⏱️ Производительность страниц")
+    st.markdown("---")
+
+    render_ingestion_section()
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    st.subheader("📊 Секции: последние замеры процесса")
+    summary = summarize_timings()
+    if not summary.empty:
+        summary['bytes'] = summary['bytes'] / 1024
+        summary.columns = ['Секция', 'Замеров', 'p50, мс', 'p95, мс', 'Макс, мс', 'Строк (сред.)', 'Результат, КБ (сред.)']
+        st.dataframe(summary.round(1), use_container_width=True, hide_index=True)
+        st.caption(f"Кольцевой буфер на {TIMINGS_BUFFER_SIZE} замеров, общий для всех сессий процесса")
+    else:
+        st.info("Нет замеров — откройте дашборд или контрольные карты")
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    st.subheader("🐢 Самые долгие перезапуски")
+    reruns = get_slowest_reruns()
+    if reruns:
+        df_reruns = pd.DataFrame([
+            (datetime.fromtimestamp(r['ts']).strftime('%d.%m.%Y %H:%M:%S'), r['section'], r['user'], round(r['ms'], 1))
+            for r in reruns
+        ], columns=['Время', 'Страница', 'Пользователь', 'мс'])
+        st.dataframe(df_reruns, use_container_width=True, hide_index=True)
+    else:
+        st.info("Нет данных")
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    st.subheader("🗄️ Кэши")
+    cache_stats = get_cache_stats()
+    if cache_stats:
+        df_cache = pd.DataFrame([
+            (name, counts['calls'], counts['misses'],
+             f"{counts['hit_rate']:.0%}" if counts['hit_rate'] is not None else '—')
+            for name, counts in sorted(cache_stats.items())
+        ], columns=['Кэш', 'Обращений', 'Промахов', 'Попаданий'])
+        st.dataframe(df_cache, use_container_width=True, hide_index=True)
+    else:
+        st.info("Нет данных")
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    st.subheader("📅 История за 24 часа")
+    history = get_rollup_history()
+    if history['by_section']:
+        df_sections = pd.DataFrame(history['by_section'],
+            columns=['Секция', 'Замеров', 'Среднее, мс', 'p50, мс', 'p95, мс', 'Макс, мс', 'Строк (сред.)', 'Результат, байт (сред.)'])
+        st.dataframe(df_sections.round(1), use_container_width=True, hide_index=True)
+
+        df_hours = pd.DataFrame(history['by_hour'], columns=['Час', 'Секция', 'Среднее, мс', 'p95, мс'])
+        df_hours = df_hours[df_hours['Секция'].str.endswith(RERUN_SUFFIXES)]
+        if not df_hours.empty:
+            df_hours['Час'] = pd.to_datetime(df_hours['Час'])
+            st.line_chart(df_hours.pivot(index='Час', columns='Секция', values='p95, мс'))
+            st.caption("p95 полного перезапуска страниц по часам")
+    else:
+        st.info("Агрегаты ещё не записаны — они сбрасываются в базу раз в минуту")
+
+    if history['cache']:
+        df_cache_history = pd.DataFrame(history['cache'], columns=['Кэш', 'Обращений', 'Промахов'])
+        df_cache_history['Попаданий'] = (1 - df_cache_history['Промахов'] / df_cache_history['Обращений']).map('{:.0%}'.format)
+        st.dataframe(df_cache_history, use_container_width=True, hide_index=True)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    render_profiles_section()
+
+
+
+def render_profiles_section():
+    """Профили перезапусков страниц, снятые по ?profile=1"""
+    st.subheader("🔬 Профили перезапусков")
+    st.caption(
+        f"Добавьте ?profile=1 к адресу дашборда или контрольных карт: каждый перезапуск страницы "
+        f"профилируется (снимок стека раз в {PROFILE_INTERVAL_MS} мс). Флеймграф открывается на speedscope.app"
+    )
+    profiles = list_profiles()
+    if not profiles:
+        st.info("Профилей нет")
+        return
+
+    for name, files in profiles[:PROFILES_SHOWN]:
+        with st.expander(name):
+            top = files.get('.top.txt')
+            if top is not None:
+                st.code(top.read_text(encoding='utf-8'), language=None)
+            cols = st.columns(3)
+            for col, (suffix, label) in zip(cols, [('.speedscope.json', 'speedscope'), ('.folded', 'folded'), ('.top.txt', 'Топ функций')]):
+                if suffix in files:
+                    with col:
+                        st.download_button(label, files[suffix].read_bytes(), file_name=files[suffix].name,
+                                           key=f"profile_{name}{suffix}")
+
+
+def render_ingestion_section():
+    """Загрузки данных из Google Sheets: свежесть, длительность, ошибки"""
+    st.subheader("📥 Загрузка данных")
+    log = pd.DataFrame(get_fetch_log(), columns=FETCH_COLUMNS)
+    if log.empty:
+        st.info("Загрузок ещё не было")
+        return
+
+    now = datetime.now()
+    last_ok = get_last_fetch('ok')
+    last_change = get_last_change()
+    ok_age = (now - datetime.fromisoformat(last_ok['started_at'])).total_seconds() / 60 if last_ok else None
+    p95_fetch = log.loc[log['status'] == 'ok', 'duration_ms'].quantile(0.95)
+    failures = int((log['status'] != 'ok').sum())
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("✅ Последняя успешная", f"{ok_age:.0f} мин назад" if ok_age is not None else "—")
+    with col2:
+        st.metric("🔄 Данные изменились", last_change[:16] if last_change else "—")
+    with col3:
+        st.metric("⏱️ p95 загрузки, с", f"{p95_fetch / 1000:.1f}" if pd.notna(p95_fetch) else "—")
+    with col4:
+        st.metric("❌ Ошибок", f"{failures} из {len(log)}")
+
+    if ok_age is None or ok_age >= FRESHNESS_SLO['stale_minutes']:
+        st.error(f"Нет успешной загрузки дольше {FRESHNESS_SLO['stale_minutes']} мин")
+    elif ok_age >= FRESHNESS_SLO['warn_minutes']:
+        st.warning(f"Нет успешной загрузки дольше {FRESHNESS_SLO['warn_minutes']} мин")
+    if pd.notna(p95_fetch) and p95_fetch > FRESHNESS_SLO['slow_fetch_ms']:
+        st.warning(f"Медленный источник: p95 загрузки выше {FRESHNESS_SLO['slow_fetch_ms'] / 1000:.0f} с")
+
+    log['started_at'] = pd.to_datetime(log['started_at']).dt.strftime('%d.%m.%Y %H:%M:%S')
+    log['bytes'] = log['bytes'] / 1024
+    log.columns = ['Начало', 'Статус', 'Всего, мс', 'Запрос, мс', 'Разбор, мс', 'КБ',
+                   'Строк', 'Отброшено строк', 'Повторов', 'Версия', 'Ошибка']
+    st.dataframe(log.round(1), use_container_width=True, hide_index=True)
+    st.caption(
+        f"Последние {len(log)} загрузок. Цели: данные не старше {FRESHNESS_SLO['warn_minutes']} мин "
+        f"(устаревшие — {FRESHNESS_SLO['stale_minutes']} мин), загрузка быстрее {FRESHNESS_SLO['slow_fetch_ms'] / 1000:.0f} с"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Запуск сервера Streamlit с прогревом кэшей до прихода первого пользователя.
+
+Сразу после старта сервера фоновый поток:
+- импортирует модули страниц;
+- загружает снимок данных (load_data);
+- строит агрегаты обоих профилей крутки;
+- один раз создаёт графики plotly (первая фигура загружает валидаторы).
+
+Первая сессия после перезапуска получает готовые кэши. Аргументы
+передаются в streamlit run без изменений. При заданном
+SPINNING_METRICS_PORT процесс отдаёт метрики Prometheus (utils/metrics_server.py).
+
+Запуск:
+    python app/serve.py --server.port 8501 --server.headless true
+"""
+import os
+import sys
+import threading
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_SCRIPT = os.path.join(APP_DIR, 'dashboard.py')
+
+# Ожидание запуска сервера перед прогревом, сек
+RUNTIME_WAIT_SECONDS = 60
+
+
+def _runtime_started():
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.runtime import RuntimeState
+    return Runtime.exists() and Runtime.instance().state in (
+        RuntimeState.NO_SESSIONS_CONNECTED, RuntimeState.ONE_OR_MORE_SESSIONS_CONNECTED
+    )
+
+
+def warm_up():
+    """Модули страниц, снимок данных, агрегаты профилей и первая фигура plotly"""
+    start = time.perf_counter()
+    import plotly.graph_objects as go
+    import components.dashboard_page  # noqa: F401 — импорт страниц входит в прогрев
+    import components.spc_page  # noqa: F401
+    from components.metrics import get_profile_aggregates
+    from utils.constants import TWIST_PROFILES
+    from utils.data_processing import load_data, get_snapshot_version
+
+    go.Figure([go.Scatter(x=[0], y=[0]), go.Bar(x=[0], y=[0]), go.Heatmap(z=[[0]])]).to_plotly_json()
+
+    df = load_data()
+    if df is None or df.empty:
+        print("Прогрев: данные не загружены")
+        return
+    version = get_snapshot_version(df)
+    for twist in TWIST_PROFILES:
+        get_profile_aggregates(df, version, twist)
+    print(f"Прогрев: снимок {version}, {len(df)} строк за {time.perf_counter() - start:.1f} с")
+
+
+def _warm_up_when_started():
+    # Кэши st.cache_data живут в хранилище Runtime — прогрев только после его запуска
+    deadline = time.time() + RUNTIME_WAIT_SECONDS
+    while not _runtime_started():
+        if time.time() > deadline:
+            return
+        time.sleep(0.2)
+    try:
+        warm_up()
+    except Exception as e:
+        print(f"Прогрев не удался: {e}")
+
+
+def main():
+    from streamlit.web import cli
+    sys.path.append(APP_DIR)
+    from utils.metrics_server import start_metrics_server
+
+    start_metrics_server()
+    threading.Thread(target=_warm_up_when_started, daemon=True).start()
+    sys.argv = ['streamlit', 'run', MAIN_SCRIPT, *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == '__main__':
+    main()
@@ -2,92 +2,191 @@ import streamlit as st
 import yaml
 import os
 import hashlib
-import sqlite3
+import hmac
+import secrets
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 
-# Путь к конфигурации
-CONFIG_PATH = Path(__file__).parent.parent.parent / 'config' / 'users.yaml'
-DB_PATH = Path(__file__).parent.parent.parent / 'data' / 'visits.db'
+from utils import db
+from utils.tracking import add_visit_minutes, ensure_writer, register_periodic, render_heartbeat
+
+# Путь к конфигурации; SPINNING_USERS_PATH задаёт другой файл (нагрузочные прогоны)
+CONFIG_PATH = Path(os.getenv('SPINNING_USERS_PATH') or Path(__file__).parent.parent.parent / 'config' / 'users.yaml')
+
+# Токены экранов-киосков: файл вне репозитория (SPINNING_KIOSK_TOKENS_PATH задаёт другой)
+# и переменная SPINNING_KIOSK_TOKENS вида «токен:Название,токен:Название»
+KIOSK_TOKENS_PATH = Path(os.getenv('SPINNING_KIOSK_TOKENS_PATH') or Path(__file__).parent.parent.parent / 'config' / 'kiosk_tokens.yaml')
+KIOSK_TOKENS_ENV = 'SPINNING_KIOSK_TOKENS'
+
+
+# Параметры хеширования паролей: pbkdf2_sha256$<итерации>$<соль>$<хеш>
+PASSWORD_SCHEME = 'pbkdf2_sha256'
+PASSWORD_ITERATIONS = 100_000
+
+# Справочник пользователей процесса: перечитывается только при изменении файла
+_directory = {'mtime': None, 'config': None, 'users': {}, 'kiosk_mtime': None, 'kiosk_tokens': []}
+_directory_lock = threading.Lock()
 
 
 def load_users():
-    """Загрузка пользователей из YAML"""
-    if CONFIG_PATH.exists():
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    return None
+    """Конфигурация пользователей из YAML (разбирается заново только при изменении файла)"""
+    try:
+        mtime = CONFIG_PATH.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    if _directory['mtime'] != mtime:
+        with _directory_lock:
+            if _directory['mtime'] != mtime:
+                with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+                    config = yaml.safe_load(f) or {}
+                _directory['users'] = dict((config.get('credentials') or {}).get('usernames') or {})
+                _directory['config'] = config
+                _directory['mtime'] = mtime
+    return _directory['config']
+
+
+def hash_password(password, salt=None, iterations=PASSWORD_ITERATIONS):
+    """Хеширование пароля с солью (PBKDF2-SHA256)"""
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac('sha256', str(password).encode(), salt.encode(), iterations).hex()
+    return f"{PASSWORD_SCHEME}${iterations}${salt}${digest}"
+
+
+def check_password(password, stored_password):
+    """Сравнение пароля с сохранённым значением за постоянное время"""
+    stored_password = str(stored_password)
+    if stored_password.startswith(PASSWORD_SCHEME + '$'):
+        try:
+            _, iterations, salt, _ = stored_password.split('$')
+            candidate = hash_password(password, salt, int(iterations))
+        except ValueError:
+            return False
+        return hmac.compare_digest(candidate.encode(), stored_password.encode())
+    # Устаревший формат: пароль в открытом виде
+    return hmac.compare_digest(str(password).encode(), stored_password.encode())
 
 
-def hash_password(password):
-    """Хеширование пароля"""
-    return hashlib.sha256(str(password).encode()).hexdigest()
+# Хеш для неизвестных логинов: время проверки не выдаёт существование пользователя
+_DUMMY_HASH = 'pbkdf2_sha256$100000$feb1364dd53124e0ded37fd98a246603$dbca3164148b9d920f38bb4a37206669e7c0ab59d946aa108a451508264efc6f'
 
 
 def verify_password(username, password):
     """Проверка пароля"""
-    config = load_users()
-    if config and username in config['credentials']['usernames']:
-        stored_password = str(config['credentials']['usernames'][username]['password'])
-        return str(password) == stored_password
-    return False
+    load_users()
+    user = _directory['users'].get(username)
+    if user is None:
+        check_password(password, _DUMMY_HASH)
+        return False
+    return check_password(password, user['password'])
 
 
 def get_user_info(username):
-    """Получение информации о пользователе"""
-    config = load_users()
-    if config and username in config['credentials']['usernames']:
-        return config['credentials']['usernames'][username]
-    return None
-
-
-def init_db():
-    """Инициализация базы данных для логов"""
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS visits (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL,
-            name TEXT,
-            login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            logout_time TIMESTAMP,
-            duration_minutes INTEGER,
-            ip_address TEXT,
-            user_agent TEXT
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS page_views (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL,
-            page TEXT,
-            view_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    """Получение информации о пользователе (без хеша пароля)"""
+    load_users()
+    user = _directory['users'].get(username)
+    if user is None:
+        return None
+    return {key: value for key, value in user.items() if key != 'password'}
+
+
+def load_kiosk_tokens():
+    """Токены киосков: [(токен, описание)] из переменной окружения и файла токенов"""
+    try:
+        mtime = KIOSK_TOKENS_PATH.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+
+    if _directory['kiosk_mtime'] != mtime or mtime is None:
+        with _directory_lock:
+            tokens = []
+            for item in os.getenv(KIOSK_TOKENS_ENV, '').split(','):
+                token, _, name = item.strip().partition(':')
+                if token:
+                    tokens.append((token, {'name': name or 'Экран цеха'}))
+            if mtime is not None:
+                with open(KIOSK_TOKENS_PATH, 'r', encoding='utf-8') as f:
+                    config = yaml.safe_load(f) or {}
+                tokens += [(str(k), v or {}) for k, v in (config.get('tokens') or {}).items()]
+            _directory['kiosk_tokens'] = tokens
+            _directory['kiosk_mtime'] = mtime
+    return _directory['kiosk_tokens']
+
+
+def get_kiosk_info(token):
+    """Описание экрана-киоска по токену (None, если токен неизвестен)"""
+    if not token:
+        return None
+    candidate = str(token).encode()
+    found = None
+    # Сравнение со всеми токенами за постоянное время, без раннего выхода
+    for known, info in load_kiosk_tokens():
+        if hmac.compare_digest(candidate, known.encode()):
+            found = info
+    return found
+
+
+def kiosk_login():
+    """Вход экрана-киоска по токену из параметра ?kiosk= (только просмотр)"""
+    token = st.query_params.get('kiosk')
+    kiosk_info = get_kiosk_info(token)
+    if not kiosk_info:
+        return False
+
+    st.session_state.authenticated = True
+    st.session_state.username = f"kiosk:{kiosk_info.get('name', token)}"
+    st.session_state.user_info = {'name': kiosk_info.get('name', 'Экран цеха'), 'role': 'kiosk'}
+    st.session_state.visit_id = None
+    return True
+
+
+# Размер страницы истории посещений на странице администратора
+VISIT_HISTORY_PAGE_SIZE = 50
+
+# Посещение без отметок активности дольше этого срока считается завершённым, мин
+VISIT_STALE_MINUTES = 5
+
+# Период проверки зависших посещений фоновым писателем, сек
+VISIT_SWEEP_SECONDS = 60
+
+
+def _visit_minutes(login_time, end_time):
+    if isinstance(login_time, str):
+        login_time = datetime.fromisoformat(login_time)
+    if isinstance(end_time, str):
+        end_time = datetime.fromisoformat(end_time)
+    return max(int((end_time - login_time).total_seconds() / 60), 0)
 
 
 def log_login(username, name):
-    """Логирование входа"""
-    init_db()
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO visits (username, name, login_time)
-        VALUES (?, ?, ?)
-    ''', (username, name, datetime.now()))
-    
-    visit_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    
+    """Логирование входа (вместе с обновлением сводных таблиц)"""
+    login_time = datetime.now()
+    with db.transaction() as conn:
+        visit_id = conn.execute(
+            'INSERT INTO visits (username, name, login_time, last_seen) VALUES (?, ?, ?, ?)',
+            (username, name, login_time, login_time)
+        ).lastrowid
+        conn.execute('''
+            INSERT INTO visit_user_stats (username, name, visit_count, last_visit)
+            VALUES (?, ?, 1, ?)
+            ON CONFLICT (username) DO UPDATE SET
+                name = excluded.name,
+                visit_count = visit_count + 1,
+                last_visit = excluded.last_visit
+        ''', (username, name, login_time))
+        new_user_today = conn.execute(
+            'INSERT OR IGNORE INTO visit_daily_users (day, username) VALUES (date(?), ?)',
+            (login_time, username)
+        ).rowcount
+        conn.execute('''
+            INSERT INTO visit_daily_stats (day, visits, users)
+            VALUES (date(?), 1, ?)
+            ON CONFLICT (day) DO UPDATE SET
+                visits = visits + 1,
+                users = users + excluded.users
+        ''', (login_time, new_user_today))
+    ensure_writer()
     return visit_id
 
 
@@ -95,71 +194,152 @@ def log_logout(visit_id):
     """Логирование выхода"""
     if not visit_id:
         return
-        
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Получаем время входа
-    cursor.execute('SELECT login_time FROM visits WHERE id = ?', (visit_id,))
-    result = cursor.fetchone()
-    
-    if result:
-        login_time = datetime.fromisoformat(result[0])
-        logout_time = datetime.now()
-        duration = int((logout_time - login_time).total_seconds() / 60)
-        
-        cursor.execute('''
-            UPDATE visits 
-            SET logout_time = ?, duration_minutes = ?
-            WHERE id = ?
-        ''', (logout_time, duration, visit_id))
-    
-    conn.commit()
-    conn.close()
 
+    with db.transaction() as conn:
+        # Получаем время входа (повторный выход не учитывается)
+        result = conn.execute(
+            'SELECT username, login_time FROM visits WHERE id = ? AND logout_time IS NULL', (visit_id,)
+        ).fetchone()
 
-def get_visit_stats():
-    """Получение статистики посещений"""
-    init_db()
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Все посещения
-    cursor.execute('''
-        SELECT username, name, login_time, logout_time, duration_minutes
+        if result:
+            username, login_time = result
+            logout_time = datetime.now()
+            duration = _visit_minutes(login_time, logout_time)
+
+            conn.execute(
+                'UPDATE visits SET logout_time = ?, last_seen = ?, duration_minutes = ? WHERE id = ?',
+                (logout_time, logout_time, duration, visit_id)
+            )
+            add_visit_minutes(conn, username, login_time, duration)
+
+
+def close_stale_visits(now=None):
+    """Закрытие посещений без отметок активности (вкладку закрыли без кнопки «Выход»).
+
+    Время выхода — последняя отметка активности, длительность считается по ней.
+    """
+    threshold = (now or datetime.now()) - timedelta(minutes=VISIT_STALE_MINUTES)
+    with db.transaction() as conn:
+        stale = conn.execute('''
+            SELECT id, username, login_time, COALESCE(last_seen, login_time)
+            FROM visits
+            WHERE logout_time IS NULL
+            AND COALESCE(last_seen, login_time) < ?
+        ''', (threshold,)).fetchall()
+
+        closed = 0
+        for visit_id, username, login_time, last_seen in stale:
+            duration = _visit_minutes(login_time, last_seen)
+            # Посещение мог уже закрыть другой воркер — минуты учитываются только один раз
+            updated = conn.execute(
+                'UPDATE visits SET logout_time = ?, duration_minutes = ? WHERE id = ? AND logout_time IS NULL',
+                (last_seen, duration, visit_id)
+            ).rowcount
+            if updated:
+                add_visit_minutes(conn, username, login_time, duration)
+                closed += 1
+    return closed
+
+
+register_periodic(close_stale_visits, VISIT_SWEEP_SECONDS)
+
+
+def count_online_sessions():
+    """Открытые посещения с отметкой активности за последние VISIT_STALE_MINUTES минут"""
+    online_since = datetime.now() - timedelta(minutes=VISIT_STALE_MINUTES)
+    return db.query('''
+        SELECT COUNT(*) FROM visits
+        WHERE logout_time IS NULL
+        AND last_seen >= ?
+    ''', (online_since,))[0][0]
+
+
+def get_peak_concurrency(days=7):
+    """Пик одновременных сессий за период: (число сессий, момент пика)"""
+    since = datetime.now() - timedelta(days=days)
+    rows = db.query('''
+        SELECT login_time, COALESCE(logout_time, last_seen, login_time)
         FROM visits
-        ORDER BY login_time DESC
-        LIMIT 100
-    ''')
-    visits = cursor.fetchall()
-    
-    # Статистика по пользователям
-    cursor.execute('''
-        SELECT username, name, 
-               COUNT(*) as visit_count,
-               SUM(duration_minutes) as total_minutes,
-               MAX(login_time) as last_visit
+        WHERE login_time > ?
+    ''', (since,))
+
+    # Проход по началам и концам сессий; при равном времени конец учитывается раньше начала
+    events = sorted([(str(start), 1) for start, _ in rows] + [(str(end), -1) for _, end in rows])
+    peak, peak_time, current = 0, None, 0
+    for moment, delta in events:
+        current += delta
+        if current > peak:
+            peak, peak_time = current, moment
+    return peak, peak_time
+
+
+def get_visit_history(cursor=None, limit=VISIT_HISTORY_PAGE_SIZE):
+    """Страница истории посещений, от новых к старым.
+
+    cursor — (login_time, id) последней строки предыдущей страницы.
+    """
+    if cursor is None:
+        return db.query('''
+            SELECT id, username, name, login_time, logout_time, duration_minutes
+            FROM visits
+            ORDER BY login_time DESC, id DESC
+            LIMIT ?
+        ''', (limit,))
+    return db.query('''
+        SELECT id, username, name, login_time, logout_time, duration_minutes
         FROM visits
-        GROUP BY username
+        WHERE (login_time, id) < (?, ?)
+        ORDER BY login_time DESC, id DESC
+        LIMIT ?
+    ''', (cursor[0], cursor[1], limit))
+
+
+def get_visit_stats():
+    """Получение статистики посещений (из сводных таблиц)"""
+    # Статистика по пользователям
+    user_stats = db.query('''
+        SELECT username, name, visit_count, total_minutes, last_visit
+        FROM visit_user_stats
         ORDER BY visit_count DESC
     ''')
-    user_stats = cursor.fetchall()
-    
-    # Активные сессии (без logout)
-    cursor.execute('''
-        SELECT username, name, login_time
+
+    # Посещения по дням за 30 дней
+    daily_stats = db.query('''
+        SELECT day, visits, users, total_minutes
+        FROM visit_daily_stats
+        WHERE day >= date('now', '-30 days')
+        ORDER BY day
+    ''')
+
+    # Сейчас онлайн: открытые посещения с недавней отметкой активности
+    online_since = datetime.now() - timedelta(minutes=VISIT_STALE_MINUTES)
+    active_sessions = db.query('''
+        SELECT username, name, login_time, last_seen
         FROM visits
         WHERE logout_time IS NULL
-        AND login_time > datetime('now', '-24 hours')
+        AND last_seen >= ?
+        ORDER BY last_seen DESC
+    ''', (online_since,))
+
+    # Просмотры страниц за 30 дней
+    page_stats = db.query('''
+        SELECT page,
+               SUM(kind = 'view') as views,
+               SUM(kind != 'view') as actions,
+               COUNT(DISTINCT username) as users,
+               MAX(view_time) as last_view
+        FROM page_views
+        WHERE view_time > datetime('now', '-30 days')
+        GROUP BY page
+        ORDER BY views DESC
     ''')
-    active_sessions = cursor.fetchall()
-    
-    conn.close()
-    
+
     return {
-        'visits': visits,
+        'total_visits': sum(row[2] for row in user_stats),
         'user_stats': user_stats,
-        'active_sessions': active_sessions
+        'daily_stats': daily_stats,
+        'active_sessions': active_sessions,
+        'page_stats': page_stats
     }
 
 
@@ -178,6 +358,12 @@ def login_form():
     
     # Если уже авторизован
     if st.session_state.authenticated:
+        if st.session_state.visit_id:
+            render_heartbeat()
+        return True
+
+    # Экран-киоск: вход по токену без формы
+    if kiosk_login():
         return True
     
     # Форма входа
@@ -232,6 +418,13 @@ def logout_button():
             st.rerun()
 
 
+def is_kiosk():
+    """Сессия экрана-киоска (только просмотр)"""
+    if st.session_state.get('user_info'):
+        return st.session_state.user_info.get('role') == 'kiosk'
+    return False
+
+
 def is_admin():
     """Проверка прав администратора"""
     if st.session_state.get('user_info'):
@@ -0,0 +1,96 @@
+"""Обмен с вычислительным процессом (app/compute_worker.py).
+
+Процесс держит снимок данных и заранее считает результаты тяжёлых
+заданий. Страница запрашивает готовый результат по локальному сокету
+(multiprocessing.connection). Если процесс не запущен, не ответил вовремя
+или работает на другой версии снимка, страница считает сама.
+
+multiprocessing.connection передаёт объекты pickle, поэтому ключ соединения
+SPINNING_COMPUTE_KEY обязателен: без него процесс не слушает сокет,
+а страницы к нему не обращаются. start_server.sh создаёт случайный ключ при запуске.
+"""
+import os
+import threading
+import time
+from multiprocessing.connection import Client, Listener, AuthenticationError
+
+from utils.constants import COMPUTE_CONFIG
+from utils.perf import record_timing
+
+# Адрес процесса: host:port или путь к unix-сокету; не задан — расчёт всегда в процессе страницы
+COMPUTE_ADDRESS_ENV = 'SPINNING_COMPUTE_ADDRESS'
+COMPUTE_KEY_ENV = 'SPINNING_COMPUTE_KEY'
+
+# Ответы процесса
+RESULT_OK = 'ok'
+RESULT_STALE = 'stale'      # у процесса другая версия снимка
+RESULT_ERROR = 'error'
+
+
+def compute_address():
+    address = os.getenv(COMPUTE_ADDRESS_ENV)
+    if not address:
+        return None
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return host or '127.0.0.1', int(port)
+    return address
+
+
+def _authkey():
+    key = os.getenv(COMPUTE_KEY_ENV)
+    return key.encode('utf-8') if key else None
+
+
+def request_result(job, version, key):
+    """Готовый результат задания: (True, результат) или (False, None), если считать придётся самим"""
+    address = compute_address()
+    authkey = _authkey()
+    if address is None or authkey is None or version is None:
+        return False, None
+
+    start = time.perf_counter()
+    try:
+        with Client(address, authkey=authkey) as conn:
+            conn.send((job, version, key))
+            if not conn.poll(COMPUTE_CONFIG['timeout_seconds']):
+                return False, None
+            status, result = conn.recv()
+    except (OSError, EOFError, AuthenticationError):
+        return False, None
+
+    if status != RESULT_OK:
+        return False, None
+    record_timing(f'compute.{job}', (time.perf_counter() - start) * 1000)
+    return True, result
+
+
+def serve(address, handler):
+    """Приём запросов: handler(job, version, key) -> (статус, результат); соединение — в своём потоке"""
+    authkey = _authkey()
+    if authkey is None:
+        raise RuntimeError(f"Не задан ключ соединения {COMPUTE_KEY_ENV}")
+    # Файл unix-сокета от прежнего запуска мешает слушать тот же путь
+    if isinstance(address, str) and os.path.exists(address):
+        os.remove(address)
+    listener = Listener(address, authkey=authkey)
+
+    def handle(conn):
+        with conn:
+            try:
+                job, version, key = conn.recv()
+                try:
+                    reply = handler(job, version, key)
+                except Exception as e:
+                    reply = (RESULT_ERROR, str(e))
+                conn.send(reply)
+            except (OSError, EOFError):
+                pass
+
+    with listener:
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, AuthenticationError):
+                continue
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
@@ -40,6 +40,83 @@ QUALITY_THRESHOLDS_50 = {
     'density_range': (28.3, 29.5)
 }
 
+# Профили продуктов по крутке. Страницы дашборда и контрольных карт
+# строятся по профилю: новый продукт — новая запись здесь и пара
+# страниц-обёрток в pages/
+TWIST_PROFILES = {
+    100: {
+        'twist': 100,
+        'label': 'Нить с круткой 100 кр/м',
+        'short_label': '100 кр/м',
+        'thresholds': QUALITY_THRESHOLDS,
+        'party_offset': 714,             # последняя партия на 10.04.2026 = №64
+        'key_suffix': '',                # суффикс ключей виджетов
+        'chart_key': 'twist100',         # префикс ключей графиков
+        'strength_bands': (260, 270, 280),  # границы цветов прочности в таблице машин
+        'cv_bands': (6, 9),              # границы цветов CV в таблице машин
+        'strength_axis': (250, 300),     # минимальный диапазон оси прочности
+        'speed_table': True,             # сравнение по скорости формования
+        'dashboard_page': 'dashboard.py',
+        'dashboard_icon': '🏭',
+        'spc_page': 'pages/2_Контрольные_карты_100_крм.py',
+        'spc_icon': '📊',
+    },
+    50: {
+        'twist': 50,
+        'label': 'Нить с круткой 50 кр/м',
+        'short_label': '50 кр/м',
+        'thresholds': QUALITY_THRESHOLDS_50,
+        'party_offset': 845,             # последняя партия на 10.04.2026 = №64
+        'key_suffix': '_50',
+        'chart_key': 'twist50',
+        'strength_bands': (250, 260, 270),
+        'cv_bands': (7, 10),
+        'strength_axis': (230, 280),
+        'speed_table': False,
+        'dashboard_page': 'pages/1_Дашборд_нити_с_круткой_50_крм.py',
+        'dashboard_icon': '🧵',
+        'spc_page': 'pages/3_Контрольные_карты_50_крм.py',
+        'spc_icon': '📈',
+    },
+}
+
+# Режим киоска (настенные экраны, вход по токену ?kiosk=<токен>)
+KIOSK_CONFIG = {
+    'poll_seconds': 30,      # период проверки версии данных
+}
+
+# Цели свежести данных (SLO): возраст показанного снимка и длительность загрузки
+FRESHNESS_SLO = {
+    'warn_minutes': 15,      # снимок старше — предупреждение
+    'stale_minutes': 60,     # снимок старше — данные устарели
+    'slow_fetch_ms': 15000,  # загрузка дольше — медленный источник
+}
+
+# Общий снимок данных для нескольких воркеров (SPINNING_SNAPSHOT_PATH)
+SNAPSHOT_CONFIG = {
+    'max_age_seconds': 300,  # снимок старше — воркер-писатель загружает данные заново
+}
+
+# Число партий на контрольных картах: варианты выбора и порог тяжёлых карт (p-карты, X-MR)
+SPC_PARTY_WINDOWS = [10, 15, 20, 25, 30, 50, 100, 200, 500, 1000, "Все"]
+SPC_HEAVY_PARTIES = 200
+
+# Горячая и холодная история (utils/history.py): в памяти — последние hot_parties
+# партий профиля (не меньше SPC_HEAVY_PARTIES: p-карты и X-MR берут сырые строки),
+# у старых на диске только характеристики подгрупп; None — без разделения.
+# Хранится история keep_versions последних снимков (сессии на прежнем снимке)
+HISTORY_CONFIG = {
+    'hot_parties': 200,
+    'keep_versions': 3,
+}
+
+# Вычислительный процесс app/compute_worker.py (адрес в SPINNING_COMPUTE_ADDRESS)
+COMPUTE_CONFIG = {
+    'timeout_seconds': 2.0,   # ожидание ответа; дольше — расчёт в процессе страницы
+    'refresh_seconds': 30,    # период проверки нового снимка данных
+    'max_results': 2000,      # результатов в памяти процесса (сверх — удаляются старые)
+}
+
 # Идентификатор таблицы по умолчанию
 DEFAULT_SHEET_ID = '1S1obWIvuasnedJrKNeOQvJuoT-vrZ7v6EgivXiYsotc'
 
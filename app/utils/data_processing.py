@@ -1,128 +1,270 @@
 import os
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 import streamlit as st
 import socket
 import time
+import json
+import hashlib
+from datetime import datetime
 
-from utils.constants import DEFAULT_SHEET_ID
+from utils.constants import DEFAULT_SHEET_ID, TWIST_PROFILES, SNAPSHOT_CONFIG
+from utils.perf import timed, tracked_cache
+from utils.freshness import record_fetch
+from utils.synthetic import make_sheet_records
+from utils.snapshot import snapshot_path, load_shared, mark_snapshot_stale
+from utils.history import split_history
 
-@st.cache_data(ttl=300, show_spinner=False)
-def load_data():
-    """Загрузка данных из Google Sheets"""
+
+def compute_snapshot_version(df):
+    """Версия снимка данных — хеш содержимого таблицы"""
+    hashed = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha1(hashed.tobytes()).hexdigest()[:12]
+
+
+def get_snapshot_version(df):
+    """Версия снимка из атрибутов DataFrame (вычисляется при отсутствии)"""
+    if df is None:
+        return None
+    version = df.attrs.get('snapshot_version')
+    if version is None:
+        version = compute_snapshot_version(df)
+        df.attrs['snapshot_version'] = version
+    return version
+
+# Локальный источник вместо Google Sheets: путь к CSV-выгрузке листа
+# или synthetic:<партии>x<машины> (синтетические данные обоих профилей крутки)
+OFFLINE_DATA_ENV = 'SPINNING_OFFLINE_DATA'
+
+# Обязательные колонки таблицы измерений
+REQUIRED_COLUMNS = ['№ партии', '№ ПМ', 'Относительная разрывная нагрузка, сН/текс']
+
+# Исправление названий колонок таблицы
+COLUMN_RENAMES = {
+    'Линейная плотность, текс': 'Линейная плотность, текс',
+    'Номер ПМ': '№ ПМ',
+    '№ ПМ': '№ ПМ',
+}
+
+
+def _get_credentials():
+    """Учётные данные сервисного аккаунта: Streamlit Secrets или credentials.json"""
+    scope = ['https://spreadsheets.google.com/feeds',
+            'https://www.googleapis.com/auth/drive']
+
+    # Пробуем использовать Streamlit Secrets (для Streamlit Cloud)
+    if "gcp_service_account" in st.secrets:
+        from google.oauth2.service_account import Credentials
+        return Credentials.from_service_account_info(
+            st.secrets["gcp_service_account"],
+            scopes=scope
+        )
+
+    # Fallback на файл credentials.json (для локального запуска)
+    from oauth2client.service_account import ServiceAccountCredentials
+    credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+    if not credentials_path:
+        local_path = os.path.join(os.path.dirname(__file__), '..', 'credentials.json')
+        root_path = os.path.join(os.path.dirname(__file__), '..', '..', 'credentials.json')
+        if os.path.exists(local_path):
+            credentials_path = local_path
+        elif os.path.exists(root_path):
+            credentials_path = root_path
+        else:
+            raise ValueError("Не найден файл credentials.json")
+    return ServiceAccountCredentials.from_json_keyfile_name(credentials_path, scope)
+
+
+def fetch_offline_records(source):
+    """Строки листа из локального источника (см. OFFLINE_DATA_ENV)"""
+    if source.startswith('synthetic:'):
+        n_parties, n_machines = (int(n) for n in source.split(':', 1)[1].split('x'))
+        return [record for twist in TWIST_PROFILES
+                for record in make_sheet_records(n_parties, n_machines, twist, seed=twist)]
+    return pd.read_csv(source, dtype=str, keep_default_na=False).to_dict('records')
+
+
+def fetch_records(sheet_id):
+    """Строки первого листа таблицы Google Sheets (или локального источника)"""
+    offline_source = os.getenv(OFFLINE_DATA_ENV)
+    if offline_source:
+        return fetch_offline_records(offline_source)
+
+    # Клиент Google Sheets нужен только при загрузке (импорт заметно удлиняет старт)
+    import gspread
+
+    # Увеличиваем таймаут подключения
+    socket.setdefaulttimeout(20)
+
+    client = gspread.authorize(_get_credentials())
+    sheet = client.open_by_key(sheet_id).sheet1
+    return sheet.get_all_records()
+
+
+def normalize_records(records):
+    """Таблица измерений из строк листа: названия колонок, числа, обязательные поля.
+
+    Возвращает (df, число строк до очистки). При непригодных данных — ValueError.
+    """
+    df = pd.DataFrame(records)
+
+    # Проверяем, что таблица не пуста
+    if len(df.columns) == 0:
+        raise ValueError("Таблица пуста или не содержит данных")
+
+    # Обработка данных - исправляем возможные проблемы с названиями колонок
+    rename_dict = {col: COLUMN_RENAMES[col.strip()] for col in df.columns
+                   if col.strip() in COLUMN_RENAMES and col != COLUMN_RENAMES[col.strip()]}
+    if rename_dict:
+        df = df.rename(columns=rename_dict)
+
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(
+            f"Отсутствуют обязательные колонки: {', '.join(missing_columns)}. "
+            f"Доступные колонки в таблице: {', '.join(df.columns.tolist())}"
+        )
+
+    # Находим колонку скорости
+    speed_col = None
+    for c in df.columns:
+        if 'Скорость' in c and 'формования' in c:
+            speed_col = c
+            break
+
+    numeric_columns = ['№ партии', '№ ПМ', 'Относительная разрывная нагрузка, сН/текс', 'Крутка']
+    if speed_col:
+        numeric_columns.append(speed_col)
+
+    for col in numeric_columns:
+        if col in df.columns:
+            # Заменяем запятые на точки перед конвертацией
+            df[col] = df[col].astype(str).str.replace(',', '.', regex=False)
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    if 'Линейная плотность, текс' in df.columns:
+        df['Линейная плотность, текс'] = pd.to_numeric(df['Линейная плотность, текс'], errors='coerce') / 10
+    if 'Коэффициент вариации, %' in df.columns:
+        df['Коэффициент вариации, %'] = pd.to_numeric(df['Коэффициент вариации, %'], errors='coerce') / 10
+
+    rows_raw = len(df)
+    df = coerce_mixed_columns(df.dropna(subset=REQUIRED_COLUMNS))
+
+    # Таблица (и снимок) упорядочена по крутке и партии: строки профиля и хвосты
+    # последних партий — непрерывные диапазоны, страницы берут их срезом без копии
+    sort_columns = [col for col in ('Крутка', '№ партии') if col in df.columns]
+    df = df.sort_values(sort_columns, kind='stable', na_position='last', ignore_index=True)
+    return df, rows_raw
+
+
+def coerce_mixed_columns(df):
+    """Приведение текстовых колонок листа к одному типу.
+
+    gspread отдаёт в одной колонке числа и пустые строки ('Пласт. вытяжка, %'),
+    а снимку Arrow нужен один тип на колонку: колонка, где все непустые значения —
+    числа (в том числе с десятичной запятой), становится числовой, остальные — строками.
+    """
+    df = df.copy()
+    for col in df.columns:
+        values = df[col]
+        if values.dtype != object and not isinstance(values.dtype, pd.StringDtype):
+            continue
+        blank = values.isna() | (values.astype(str).str.strip() == '')
+        numeric = pd.to_numeric(values.where(~blank).astype(str).str.replace(',', '.', regex=False), errors='coerce')
+        if (~blank).any() and numeric[~blank].notna().all():
+            df[col] = numeric
+        else:
+            df[col] = values.where(values.notna(), '').astype(str)
+    return df
+
+
+def fetch_data():
+    """Загрузка данных из Google Sheets (каждая попытка записывается в журнал загрузок)"""
     max_retries = 3
     retry_delay = 2
 
     sheet_id = os.getenv('GOOGLE_SHEET_ID', DEFAULT_SHEET_ID)
-    
-    for attempt in range(max_retries):
-        try:
-            # Настройка доступа к Google Sheets
-            scope = ['https://spreadsheets.google.com/feeds',
-                    'https://www.googleapis.com/auth/drive']
-            
-            # Пробуем использовать Streamlit Secrets (для Streamlit Cloud)
-            if "gcp_service_account" in st.secrets:
-                credentials = Credentials.from_service_account_info(
-                    st.secrets["gcp_service_account"],
-                    scopes=scope
-                )
-            else:
-                # Fallback на файл credentials.json (для локального запуска)
-                from oauth2client.service_account import ServiceAccountCredentials
-                credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-                if not credentials_path:
-                    local_path = os.path.join(os.path.dirname(__file__), '..', 'credentials.json')
-                    root_path = os.path.join(os.path.dirname(__file__), '..', '..', 'credentials.json')
-                    if os.path.exists(local_path):
-                        credentials_path = local_path
-                    elif os.path.exists(root_path):
-                        credentials_path = root_path
-                    else:
-                        st.error("Не найден файл credentials.json")
-                        return None
-                credentials = ServiceAccountCredentials.from_json_keyfile_name(
-                    credentials_path,
-                    scope
-                )
-            
-            # Увеличиваем таймаут подключения
-            socket.setdefaulttimeout(20)
-            
-            client = gspread.authorize(credentials)
-            sheet = client.open_by_key(sheet_id).sheet1
-            
-            # Получаем и обрабатываем данные
-            data = sheet.get_all_records()
-            df = pd.DataFrame(data)
-            
-            # Проверяем, что таблица не пуста
-            if len(df.columns) == 0:
-                st.error("Таблица пуста или не содержит данных")
-                return None
-            
-            # Обработка данных - исправляем возможные проблемы с названиями колонок
-            columns_list = df.columns.tolist()
-            rename_dict = {}
-            
-            for col in columns_list:
-                if col.strip() == 'Линейная плотность, текс ':
-                    rename_dict[col] = 'Линейная плотность, текс'
-                elif col.strip() == 'Номер ПМ':
-                    rename_dict[col] = '№ ПМ'
-                elif col.strip() == '№ ПМ ':
-                    rename_dict[col] = '№ ПМ'
-                elif col.strip() == '№ ПМ':
-                    rename_dict[col] = '№ ПМ'
-            
-            if rename_dict:
-                df = df.rename(columns=rename_dict)
-            
-            if 'Номер ПМ' in df.columns and '№ ПМ' not in df.columns:
-                df.columns = [col if col != 'Номер ПМ' else '№ ПМ' for col in df.columns]
-            
-            required_columns = ['№ партии', '№ ПМ', 'Относительная разрывная нагрузка, сН/текс']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                st.error(f"Отсутствуют обязательные колонки: {', '.join(missing_columns)}")
-                st.warning(f"Доступные колонки в таблице: {', '.join(df.columns.tolist())}")
+    fetch = {'started_at': datetime.now(), 'retries': 0}
+    start = time.perf_counter()
+
+    try:
+        for attempt in range(max_retries):
+            try:
+                fetch_start = time.perf_counter()
+                records = fetch_records(sheet_id)
+                fetch['fetch_ms'] = (time.perf_counter() - fetch_start) * 1000
+                break
+            except (socket.gaierror, socket.timeout) as e:
+                if attempt < max_retries - 1:
+                    fetch['retries'] += 1
+                    time.sleep(retry_delay)
+                    continue
+                fetch.update(status='network_error', error=str(e))
+                st.error(f"Ошибка сети: Проверьте подключение к интернету. {str(e)}")
                 return None
-            
-            # Находим колонку скорости
-            speed_col = None
-            for c in df.columns:
-                if 'Скорость' in c and 'формования' in c:
-                    speed_col = c
-                    break
-            
-            numeric_columns = ['№ партии', '№ ПМ', 'Относительная разрывная нагрузка, сН/текс', 'Крутка']
-            if speed_col:
-                numeric_columns.append(speed_col)
-            
-            for col in numeric_columns:
-                if col in df.columns:
-                    # Заменяем запятые на точки перед конвертацией
-                    df[col] = df[col].astype(str).str.replace(',', '.', regex=False)
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            if 'Линейная плотность, текс' in df.columns:
-                df['Линейная плотность, текс'] = pd.to_numeric(df['Линейная плотность, текс'], errors='coerce') / 10
-            if 'Коэффициент вариации, %' in df.columns:
-                df['Коэффициент вариации, %'] = pd.to_numeric(df['Коэффициент вариации, %'], errors='coerce') / 10
-
-            df = df.dropna(subset=required_columns)
-            
-            return df
-            
-        except (socket.gaierror, socket.timeout) as e:
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-                continue
-            st.error(f"Ошибка сети: Проверьте подключение к интернету. {str(e)}")
-            return None
-            
-        except Exception as e:
-            st.error(f"Ошибка при загрузке данных: {str(e)}")
-            return None
+
+        # Объём полученных данных — по JSON-представлению строк листа
+        fetch['bytes'] = len(json.dumps(records, ensure_ascii=False, default=str).encode('utf-8'))
+
+        parse_start = time.perf_counter()
+        df, rows_raw = normalize_records(records)
+        fetch['parse_ms'] = (time.perf_counter() - parse_start) * 1000
+
+        df.attrs['snapshot_version'] = compute_snapshot_version(df)
+        df.attrs['fetched_at'] = fetch['started_at']
+        fetch.update(status='ok', rows=len(df), rows_dropped=rows_raw - len(df),
+                     snapshot_version=df.attrs['snapshot_version'])
+
+        # В памяти остаются только горячие партии; характеристики старых — в манифесте на диске
+        try:
+            df = split_history(df)
+        except OSError as e:
+            fetch['error'] = f"Холодная история не записана: {e}"
+            st.warning(f"Холодная история не записана, длинные окна контрольных карт недоступны: {e}")
+        return df
+
+    except ValueError as e:
+        fetch.update(status='invalid', error=str(e))
+        st.error(str(e))
+        return None
+
+    except Exception as e:
+        fetch.update(status='error', error=str(e))
+        st.error(f"Ошибка при загрузке данных: {str(e)}")
+        return None
+
+    finally:
+        fetch['duration_ms'] = (time.perf_counter() - start) * 1000
+        record_fetch(fetch)
+
+
+def _data_cache():
+    """Кэш load_data: с общим снимком — один объект на процесс поверх mmap,
+    без него — копия таблицы на каждый вызов (st.cache_data)"""
+    ttl = SNAPSHOT_CONFIG['max_age_seconds']
+    if snapshot_path():
+        return st.cache_resource(ttl=ttl, show_spinner=False)
+    return st.cache_data(ttl=ttl, show_spinner=False)
+
+
+@timed('data.load_data')
+@tracked_cache('load_data', _data_cache())
+def load_data():
+    """Данные измерений: из источника или из общего снимка воркеров (SPINNING_SNAPSHOT_PATH)"""
+    path = snapshot_path()
+    if path is None:
+        return fetch_data()
+    return load_shared(fetch_data, path)
+
+
+def _clear_load_data(clear_cache=load_data.clear):
+    """Сброс кэша загрузки; общий снимок помечается устаревшим, чтобы «Обновить» загрузил данные заново"""
+    path = snapshot_path()
+    if path:
+        mark_snapshot_stale(path)
+    clear_cache()
+
+
+# Сброс только кэша процесса, без пометки общего снимка (фоновые процессы вроде export_static:
+# снимок обновляет воркер по max_age_seconds, а не каждый цикл наблюдения)
+load_data.clear_local = load_data.clear
+load_data.clear = _clear_load_data
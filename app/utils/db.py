@@ -0,0 +1,233 @@
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Файл базы; SPINNING_DB_PATH задаёт другой (бенчмарки и офлайн-прогоны не трогают рабочую базу)
+DB_PATH = Path(os.getenv('SPINNING_DB_PATH') or Path(__file__).parent.parent.parent / 'data' / 'visits.db')
+
+# Миграции схемы по порядку: версия базы (PRAGMA user_version) = число применённых.
+# Уже применённые миграции не меняются — только добавляются новые в конец.
+MIGRATIONS = [
+    # 1: исходные таблицы посещений и просмотров страниц
+    '''
+    CREATE TABLE IF NOT EXISTS visits (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        name TEXT,
+        login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        logout_time TIMESTAMP,
+        duration_minutes INTEGER,
+        ip_address TEXT,
+        user_agent TEXT
+    );
+    CREATE TABLE IF NOT EXISTS page_views (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        page TEXT,
+        view_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    ''',
+    # 2: тип события и подробности для трекинга просмотров и действий
+    '''
+    ALTER TABLE page_views ADD COLUMN kind TEXT DEFAULT 'view';
+    ALTER TABLE page_views ADD COLUMN detail TEXT;
+    CREATE INDEX IF NOT EXISTS idx_page_views_time ON page_views (view_time);
+    ''',
+    # 3: индексы посещений и сводные таблицы (ведутся при входе и выходе)
+    '''
+    CREATE INDEX IF NOT EXISTS idx_visits_user_login ON visits (username, login_time);
+    CREATE INDEX IF NOT EXISTS idx_visits_logout ON visits (logout_time);
+    CREATE INDEX IF NOT EXISTS idx_visits_login ON visits (login_time, id);
+    CREATE TABLE IF NOT EXISTS visit_user_stats (
+        username TEXT PRIMARY KEY,
+        name TEXT,
+        visit_count INTEGER NOT NULL DEFAULT 0,
+        total_minutes INTEGER NOT NULL DEFAULT 0,
+        last_visit TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS visit_daily_stats (
+        day TEXT PRIMARY KEY,
+        visits INTEGER NOT NULL DEFAULT 0,
+        users INTEGER NOT NULL DEFAULT 0,
+        total_minutes INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS visit_daily_users (
+        day TEXT NOT NULL,
+        username TEXT NOT NULL,
+        PRIMARY KEY (day, username)
+    ) WITHOUT ROWID;
+    INSERT OR REPLACE INTO visit_user_stats (username, name, visit_count, total_minutes, last_visit)
+        SELECT v.username,
+               (SELECT name FROM visits WHERE username = v.username ORDER BY login_time DESC LIMIT 1),
+               COUNT(*), COALESCE(SUM(v.duration_minutes), 0), MAX(v.login_time)
+        FROM visits v GROUP BY v.username;
+    INSERT OR IGNORE INTO visit_daily_users (day, username)
+        SELECT DISTINCT date(login_time), username FROM visits;
+    INSERT OR REPLACE INTO visit_daily_stats (day, visits, users, total_minutes)
+        SELECT date(login_time), COUNT(*), COUNT(DISTINCT username), COALESCE(SUM(duration_minutes), 0)
+        FROM visits GROUP BY date(login_time);
+    ''',
+    # 4: время последней активности посещения (отметки вкладки, закрытие зависших)
+    '''
+    ALTER TABLE visits ADD COLUMN last_seen TIMESTAMP;
+    CREATE INDEX IF NOT EXISTS idx_visits_open_seen ON visits (logout_time, last_seen);
+    ''',
+    # 5: поминутные агрегаты замеров производительности и обращений к кэшам
+    '''
+    CREATE TABLE IF NOT EXISTS perf_rollups (
+        bucket TEXT NOT NULL,
+        section TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        total_ms REAL NOT NULL,
+        max_ms REAL NOT NULL,
+        p50_ms REAL NOT NULL,
+        p95_ms REAL NOT NULL,
+        rows INTEGER NOT NULL DEFAULT 0,
+        bytes INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (bucket, section)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS perf_cache_rollups (
+        bucket TEXT NOT NULL,
+        name TEXT NOT NULL,
+        calls INTEGER NOT NULL,
+        misses INTEGER NOT NULL,
+        PRIMARY KEY (bucket, name)
+    ) WITHOUT ROWID;
+    ''',
+    # 6: журнал загрузок данных из Google Sheets
+    '''
+    CREATE TABLE IF NOT EXISTS fetch_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at TIMESTAMP NOT NULL,
+        status TEXT NOT NULL,
+        duration_ms REAL,
+        fetch_ms REAL,
+        parse_ms REAL,
+        bytes INTEGER,
+        rows INTEGER,
+        rows_dropped INTEGER,
+        retries INTEGER NOT NULL DEFAULT 0,
+        snapshot_version TEXT,
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_fetch_log_status ON fetch_log (status, id);
+    ''',
+    # 7: поминутные гистограммы замеров вместо «среднего медиан» и «максимума p95»:
+    # корзины складываются, квантили любого периода считаются по их сумме
+    '''
+    CREATE TABLE IF NOT EXISTS perf_rollup_buckets (
+        bucket TEXT NOT NULL,
+        section TEXT NOT NULL,
+        le_ms REAL NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (bucket, section, le_ms)
+    ) WITHOUT ROWID;
+    ALTER TABLE perf_rollups DROP COLUMN p50_ms;
+    ALTER TABLE perf_rollups DROP COLUMN p95_ms;
+    ''',
+]
+
+# Размер кэша подготовленных выражений на соединение
+STATEMENT_CACHE_SIZE = 128
+
+_local = threading.local()
+_migrate_lock = threading.Lock()
+_migrated = False
+
+
+def _connect():
+    """Новое соединение в режиме WAL: читатели не блокируются записью"""
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=5, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def _statements(script):
+    """Отдельные выражения скрипта миграции"""
+    statements, current = [], ''
+    for part in script.split(';'):
+        current += part + ';'
+        if sqlite3.complete_statement(current):
+            if current.strip(' \n;'):
+                statements.append(current.strip())
+            current = ''
+    return statements
+
+
+def _column_exists(conn, statement):
+    """ALTER TABLE ... ADD COLUMN для уже существующей колонки (база, мигрированная частично)"""
+    match = re.match(r'ALTER\s+TABLE\s+(\w+)\s+ADD\s+COLUMN\s+(\w+)', statement, re.IGNORECASE)
+    if not match:
+        return False
+    table, column = match.groups()
+    return any(row[1] == column for row in conn.execute(f'PRAGMA table_info({table})'))
+
+
+def migrate():
+    """Применение недостающих миграций (один раз на процесс).
+
+    Каждая миграция — отдельная транзакция BEGIN IMMEDIATE: версия перечитывается
+    под блокировкой записи, поэтому воркеры, стартующие одновременно, не применяют
+    одну миграцию дважды.
+    """
+    global _migrated
+    if _migrated:
+        return
+    with _migrate_lock:
+        if _migrated:
+            return
+        conn = _connect()
+        conn.isolation_level = None
+        try:
+            while True:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    version = conn.execute('PRAGMA user_version').fetchone()[0]
+                    if version >= len(MIGRATIONS):
+                        conn.execute('COMMIT')
+                        break
+                    for statement in _statements(MIGRATIONS[version]):
+                        if not _column_exists(conn, statement):
+                            conn.execute(statement)
+                    conn.execute(f'PRAGMA user_version = {version + 1}')
+                    conn.execute('COMMIT')
+                except BaseException:
+                    conn.execute('ROLLBACK')
+                    raise
+        finally:
+            conn.close()
+        _migrated = True
+
+
+def get_connection():
+    """Соединение текущего потока (создаётся при первом обращении)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        migrate()
+        conn = _connect()
+        _local.conn = conn
+    return conn
+
+
+@contextmanager
+def transaction():
+    """Транзакция на соединении потока: commit при успехе, rollback при ошибке"""
+    conn = get_connection()
+    with conn:
+        yield conn
+
+
+def execute(sql, params=()):
+    """Одиночная запись в отдельной транзакции, возвращает lastrowid"""
+    with transaction() as conn:
+        return conn.execute(sql, params).lastrowid
+
+
+def query(sql, params=()):
+    """Чтение всех строк запроса"""
+    return get_connection().execute(sql, params).fetchall()
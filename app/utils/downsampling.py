@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """Индексы точек по алгоритму Largest-Triangle-Three-Buckets.
+
+    Первая и последняя точки сохраняются всегда, остальные выбираются
+    по одной из каждой корзины — та, что образует треугольник наибольшей
+    площади с предыдущей выбранной точкой и средним следующей корзины.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # n_out - 2 корзины между первой и последней точкой
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+
+def downsample_indices(x, y, n_out, keep=None):
+    """Прореживание ряда LTTB с обязательным сохранением точек из keep"""
+    indices = lttb_indices(x, y, n_out)
+    if keep is not None and len(keep) > 0:
+        indices = np.union1d(indices, np.asarray(keep, dtype=int))
+    return indices
@@ -0,0 +1,139 @@
+import sqlite3
+from datetime import datetime
+
+import streamlit as st
+
+from utils import db
+from utils.constants import FRESHNESS_SLO
+from utils.perf import observe
+
+FETCH_COLUMNS = (
+    'started_at', 'status', 'duration_ms', 'fetch_ms', 'parse_ms', 'bytes',
+    'rows', 'rows_dropped', 'retries', 'snapshot_version', 'error'
+)
+INSERT_FETCH_SQL = (
+    f"INSERT INTO fetch_log ({', '.join(FETCH_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(FETCH_COLUMNS))})"
+)
+
+# Уровни свежести данных
+FRESH_OK = 'ok'
+FRESH_WARN = 'warn'
+FRESH_STALE = 'stale'
+
+
+def record_fetch(fetch):
+    """Запись попытки загрузки в журнал (ошибка журнала не мешает загрузке)"""
+    if fetch.get('duration_ms') is not None:
+        observe('fetch', (('status', fetch.get('status') or 'error'),), fetch['duration_ms'])
+    try:
+        db.execute(INSERT_FETCH_SQL, tuple(fetch.get(column) for column in FETCH_COLUMNS))
+    except sqlite3.Error:
+        pass
+
+
+def get_fetch_log(limit=50):
+    """Последние попытки загрузки, от новых к старым"""
+    return db.query(f'''
+        SELECT {', '.join(FETCH_COLUMNS)}
+        FROM fetch_log
+        ORDER BY id DESC
+        LIMIT ?
+    ''', (limit,))
+
+
+def get_last_fetch(status=None):
+    """Последняя попытка загрузки (или последняя с указанным статусом) как словарь"""
+    where, params = ('WHERE status = ?', (status,)) if status else ('', ())
+    rows = db.query(f'''
+        SELECT {', '.join(FETCH_COLUMNS)}
+        FROM fetch_log {where}
+        ORDER BY id DESC
+        LIMIT 1
+    ''', params)
+    return dict(zip(FETCH_COLUMNS, rows[0])) if rows else None
+
+
+def get_last_change():
+    """Время первой загрузки текущей версии снимка (когда данные в таблице последний раз менялись)"""
+    last_ok = get_last_fetch('ok')
+    if last_ok is None:
+        return None
+    rows = db.query('''
+        SELECT MIN(started_at) FROM fetch_log
+        WHERE status = 'ok' AND snapshot_version = ?
+        AND id > COALESCE((SELECT MAX(id) FROM fetch_log
+                           WHERE status = 'ok' AND snapshot_version != ?), 0)
+    ''', (last_ok['snapshot_version'], last_ok['snapshot_version']))
+    return rows[0][0]
+
+
+def data_checked_at(df):
+    """Момент, на который показанный снимок подтверждён источником.
+
+    Если последняя успешная загрузка (в любой сессии) вернула ту же версию
+    снимка, данные актуальны на момент этой загрузки.
+    """
+    if df is None:
+        return None
+    checked_at = df.attrs.get('fetched_at')
+    try:
+        last_ok = get_last_fetch('ok')
+    except sqlite3.Error:
+        last_ok = None
+    if last_ok and last_ok['snapshot_version'] == df.attrs.get('snapshot_version'):
+        last_ok_at = datetime.fromisoformat(last_ok['started_at'])
+        if checked_at is None or last_ok_at > checked_at:
+            checked_at = last_ok_at
+    return checked_at
+
+
+def data_age_minutes(checked_at):
+    """Возраст данных, мин (None — время загрузки неизвестно)"""
+    if checked_at is None:
+        return None
+    return (datetime.now() - checked_at).total_seconds() / 60
+
+
+def freshness_level(age_minutes):
+    """Уровень свежести по возрасту снимка и целям FRESHNESS_SLO"""
+    if age_minutes is None or age_minutes < FRESHNESS_SLO['warn_minutes']:
+        return FRESH_OK
+    if age_minutes < FRESHNESS_SLO['stale_minutes']:
+        return FRESH_WARN
+    return FRESH_STALE
+
+
+def _format_age(minutes):
+    if minutes < 1:
+        return 'только что'
+    if minutes < 60:
+        return f"{int(minutes)} мин назад"
+    return f"{minutes / 60:.1f} ч назад"
+
+
+def render_data_age(df):
+    """Время загрузки показанных данных для шапки страницы"""
+    checked_at = data_checked_at(df)
+    if checked_at is None:
+        text = 'Время загрузки неизвестно'
+    else:
+        text = f"Данные на {checked_at.strftime('%d.%m.%Y %H:%M')} ({_format_age(data_age_minutes(checked_at))})"
+    st.markdown(f"<span style='color:#64748b;font-size:12px;'>{text}</span>", unsafe_allow_html=True)
+
+
+def render_freshness_banner(df):
+    """Предупреждение об устаревших данных или сбое последней загрузки"""
+    age = data_age_minutes(data_checked_at(df))
+    level = freshness_level(age)
+    if level == FRESH_STALE:
+        st.error(f"⚠️ Данные устарели: получены {_format_age(age)}. Нажмите «Обновить».")
+    elif level == FRESH_WARN:
+        st.warning(f"Данные получены {_format_age(age)}")
+
+    try:
+        last_fetch = get_last_fetch()
+    except sqlite3.Error:
+        return
+    if last_fetch and last_fetch['status'] != 'ok':
+        st.error(f"Последняя загрузка данных не удалась ({last_fetch['started_at'][:16]}): {last_fetch['error']}")
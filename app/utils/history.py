@@ -0,0 +1,192 @@
+"""Горячая и холодная история измерений.
+
+В памяти процесса (load_data, общий снимок, агрегаты профилей) остаются
+только последние HISTORY_CONFIG['hot_parties'] партий каждого профиля
+крутки. Для более старых партий при загрузке на диск записывается манифест
+снимка со списком холодных партий и заранее посчитанными характеристиками
+подгрупп каждой из них (manifests/<версия снимка>.pkl.gz). Сырые строки
+холодных партий не сохраняются: X-MR строится только по окнам горячей части.
+
+Манифесты последних keep_versions снимков хранятся вместе: сессии, которые
+ещё держат прежний снимок, видят его историю. Запись и удаление идут под
+блокировкой каталога (страницы, export_static).
+
+Карты X̄-R, X̄-S и p-карты длинных окон («Все», 500, 1000 партий) строятся
+по характеристикам из манифеста. Если манифеста снимка нет, окно за пределами
+горячей части не строится молча по горячим партиям: window_party_count
+возвращает None, страница показывает предупреждение. Число холодных партий
+каждого профиля хранится в attrs горячей таблицы (cold_parties) и в снимке,
+поэтому отсутствие манифеста отличается от истории без холодных партий.
+"""
+import gzip
+import os
+import pickle
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from utils.constants import HISTORY_CONFIG, TWIST_PROFILES
+from utils.perf import timed, tracked_cache
+from utils.snapshot import writer_lock
+
+# Каталог холодной истории; SPINNING_HISTORY_DIR задаёт другой
+HISTORY_DIR = Path(os.getenv('SPINNING_HISTORY_DIR') or Path(__file__).parent.parent.parent / 'data' / 'history')
+MANIFEST_DIR = 'manifests'
+
+TWIST_COL = 'Крутка'
+PARTY_COL = '№ партии'
+STRENGTH_COL = 'Относительная разрывная нагрузка, сН/текс'
+CV_COL = 'Коэффициент вариации, %'
+
+
+def subgroup_stats(df, metric_col, threshold=None, mode='less', party_col=PARTY_COL):
+    """Характеристики подгрупп по партиям: n, mean, range, std и число несоответствий (defects)"""
+    data = df[[party_col, metric_col]].dropna(subset=[metric_col])
+    values = data[metric_col]
+    groups = values.groupby(data[party_col], sort=True)
+    stats = pd.DataFrame({
+        'n': groups.count(),
+        'mean': groups.mean(),
+        'range': groups.max() - groups.min(),
+        'std': groups.std(ddof=1),
+    })
+    if threshold is not None:
+        defects = values < threshold if mode == 'less' else values > threshold
+        stats['defects'] = defects.groupby(data[party_col], sort=True).sum()
+    return stats
+
+
+def profile_stats(df, profile):
+    """Характеристики подгрупп прочности и CV с порогами профиля: {колонка: таблица}"""
+    thresholds = profile['thresholds']
+    return {
+        STRENGTH_COL: subgroup_stats(df, STRENGTH_COL, thresholds['strength_min'], 'less'),
+        CV_COL: subgroup_stats(df, CV_COL, thresholds['cv_max'], 'greater'),
+    }
+
+
+def _write_pickle(obj, path):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _read_pickle(path):
+    with gzip.open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _manifest_path(version):
+    return HISTORY_DIR / MANIFEST_DIR / f'{version}.pkl.gz'
+
+
+def _prune_versions():
+    """Удаление манифестов старше keep_versions последних снимков и партиций сырых строк прежних версий"""
+    manifests = sorted((HISTORY_DIR / MANIFEST_DIR).glob('*.pkl.gz'), key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in manifests[HISTORY_CONFIG['keep_versions']:]:
+        path.unlink(missing_ok=True)
+    for path in HISTORY_DIR.glob('*/*.pkl.gz'):
+        if path.parent.name != MANIFEST_DIR:
+            path.unlink(missing_ok=True)
+
+
+@timed('history.split')
+def split_history(df):
+    """Запись холодных партий на диск; возвращает горячую часть таблицы.
+
+    Без версии снимка, без колонки крутки или при hot_parties = None таблица не делится.
+    """
+    hot_parties = HISTORY_CONFIG['hot_parties']
+    version = df.attrs.get('snapshot_version')
+    if hot_parties is None or version is None or TWIST_COL not in df.columns:
+        return df
+
+    manifest = {'snapshot_version': version, 'twists': {}}
+    cold_parties = {}
+    cold_mask = pd.Series(False, index=df.index)
+    with writer_lock(HISTORY_DIR / 'history', wait=True):
+        for twist, profile in TWIST_PROFILES.items():
+            is_twist = df[TWIST_COL] == twist
+            parties = sorted(df.loc[is_twist, PARTY_COL].unique())
+            if len(parties) > hot_parties:
+                is_cold = is_twist & (df[PARTY_COL] < parties[-hot_parties])
+            else:
+                is_cold = pd.Series(False, index=df.index)
+            cold = df[is_cold]
+            cold_mask |= is_cold
+            cold_parties[str(twist)] = int(cold[PARTY_COL].nunique())
+            manifest['twists'][twist] = {
+                'parties': sorted(cold[PARTY_COL].unique()),
+                'stats': profile_stats(cold, profile),
+            }
+        _manifest_path(version).parent.mkdir(parents=True, exist_ok=True)
+        _write_pickle(manifest, _manifest_path(version))
+        _prune_versions()
+
+    hot = df[~cold_mask]
+    hot.attrs = dict(df.attrs, cold_parties=cold_parties)
+    return hot
+
+
+@tracked_cache('history_manifest', st.cache_resource(show_spinner=False, max_entries=4))
+def _read_manifest(version):
+    # Ошибка чтения не кэшируется: манифест, записанный позже, прочитается при следующем обращении
+    return _read_pickle(_manifest_path(version))
+
+
+def _load_manifest(version):
+    try:
+        return _read_manifest(version)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def cold_history(twist, version):
+    """Холодная история профиля снимка: {'parties', 'stats'} или None"""
+    if version is None or HISTORY_CONFIG['hot_parties'] is None:
+        return None
+    manifest = _load_manifest(version)
+    if manifest is None:
+        return None
+    return manifest['twists'].get(twist)
+
+
+def cold_history_missing(version, cold_count):
+    """У профиля есть холодные партии (cold_count из attrs снимка), а манифеста нет (не записан или уже удалён).
+
+    Таблица, которую не удалось разделить, целиком в памяти: холодных партий у неё нет.
+    """
+    if not cold_count or version is None:
+        return False
+    return _load_manifest(version) is None
+
+
+def window_party_count(version, hot_count, cold_count, n_parties):
+    """Число партий окна; None — окно выходит за горячую часть, а холодная история недоступна"""
+    if n_parties != "Все" and n_parties <= hot_count:
+        return n_parties
+    if cold_history_missing(version, cold_count):
+        return None
+    if n_parties == "Все":
+        return hot_count + cold_count
+    return n_parties
+
+
+def cold_window(twist, version, hot_count, n_parties):
+    """Холодная часть окна последних n_parties партий: {'parties', 'stats'}; None — окно в горячей части"""
+    history = cold_history(twist, version)
+    if not history or not history['parties']:
+        return None
+    if n_parties == "Все":
+        parties = history['parties']
+    elif n_parties > hot_count:
+        parties = history['parties'][-(n_parties - hot_count):]
+    else:
+        return None
+    first = parties[0]
+    return {
+        'parties': parties,
+        'stats': {column: stats[stats.index >= first] for column, stats in history['stats'].items()},
+    }
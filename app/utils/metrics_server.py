@@ -0,0 +1,157 @@
+"""Метрики процесса в текстовом формате Prometheus на локальном HTTP-порту.
+
+Сервер запускается в фоновом потоке процесса Streamlit (app/serve.py) на
+127.0.0.1:<SPINNING_METRICS_PORT> и отдаёт GET /metrics. Все значения
+берутся из памяти процесса и локальной базы — сеть не нужна.
+"""
+import os
+import resource
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from utils.auth import count_online_sessions
+from utils.freshness import get_last_fetch
+from utils.perf import LATENCY_BUCKETS_MS, get_cache_stats, get_histograms
+from utils.tracking import get_tracking_stats
+
+# Порт метрик; не задан — сервер метрик не запускается
+METRICS_PORT_ENV = 'SPINNING_METRICS_PORT'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Гистограммы perf: метрика -> (имя Prometheus, описание)
+HISTOGRAMS = {
+    'fetch': ('spinning_fetch_duration_seconds', 'Длительность загрузки данных из источника'),
+    'rerun': ('spinning_rerun_duration_seconds', 'Длительность перезапуска страницы'),
+    'section': ('spinning_section_duration_seconds', 'Длительность секции или функции'),
+}
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in pairs
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def _metric(lines, name, kind, help_text, samples):
+    """Метрика с заголовками HELP/TYPE; samples — [(метки, значение)]"""
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+    for labels, value in samples:
+        lines.append(f'{name}{_labels(labels)} {value}')
+
+
+def _rss_bytes():
+    """Текущий RSS процесса (Linux /proc; иначе None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def _histogram_lines(lines):
+    histograms = get_histograms()
+    for metric, (name, help_text) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (hist_metric, labels), histogram in sorted(histograms.items()):
+            if hist_metric != metric:
+                continue
+            for bound, count in zip(LATENCY_BUCKETS_MS, histogram['buckets']):
+                lines.append(f'{name}_bucket{_labels(labels + (("le", bound / 1000),))} {count}')
+            lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {histogram["count"]}')
+            lines.append(f'{name}_sum{_labels(labels)} {histogram["sum_ms"] / 1000}')
+            lines.append(f'{name}_count{_labels(labels)} {histogram["count"]}')
+
+
+def render_metrics():
+    """Текст всех метрик процесса"""
+    lines = []
+    _histogram_lines(lines)
+
+    caches = get_cache_stats()
+    _metric(lines, 'spinning_cache_calls_total', 'counter', 'Обращения к кэшу',
+            [((('cache', name),), counts['calls']) for name, counts in sorted(caches.items())])
+    _metric(lines, 'spinning_cache_misses_total', 'counter', 'Промахи кэша (вычисления)',
+            [((('cache', name),), counts['misses']) for name, counts in sorted(caches.items())])
+
+    # Значения из базы: при ошибке SQLite метрика пропускается
+    try:
+        last_ok = get_last_fetch('ok')
+        online = count_online_sessions()
+    except sqlite3.Error:
+        last_ok, online = None, None
+    if last_ok:
+        age = (datetime.now() - datetime.fromisoformat(last_ok['started_at'])).total_seconds()
+        _metric(lines, 'spinning_snapshot_age_seconds', 'gauge',
+                'Время с последней успешной загрузки данных', [((), age)])
+        _metric(lines, 'spinning_snapshot_rows', 'gauge', 'Строк в последнем снимке данных',
+                [((), last_ok['rows'] or 0)])
+    if online is not None:
+        _metric(lines, 'spinning_active_sessions', 'gauge',
+                'Открытые посещения с недавней отметкой активности', [((), online)])
+
+    tracking = get_tracking_stats()
+    _metric(lines, 'spinning_tracking_events_total', 'counter', 'События посещаемости по результату',
+            [((('result', key),), tracking[key]) for key in ('enqueued', 'written', 'dropped', 'failed')])
+    _metric(lines, 'spinning_tracking_task_failures_total', 'counter', 'Ошибки периодических задач фонового писателя',
+            [((), tracking['task_failed'])])
+    _metric(lines, 'spinning_tracking_queue_size', 'gauge', 'События в очереди записи',
+            [((), tracking['queued'])])
+
+    rss = _rss_bytes()
+    if rss is not None:
+        _metric(lines, 'process_resident_memory_bytes', 'gauge', 'RSS процесса', [((), rss)])
+    # ru_maxrss: килобайты в Linux, байты в macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    _metric(lines, 'process_max_resident_memory_bytes', 'gauge', 'Пиковый RSS процесса', [((), peak)])
+    _metric(lines, 'process_cpu_seconds_total', 'counter', 'Процессорное время процесса',
+            [((), time.process_time())])
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics — метрики; остальные пути — 404"""
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=None):
+    """Запуск сервера метрик в фоновом потоке (один на процесс); None — порт не задан или занят"""
+    global _server
+    port = port or os.getenv(METRICS_PORT_ENV)
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(('127.0.0.1', int(port)), MetricsHandler)
+            except OSError as e:
+                print(f"Метрики: порт {port} недоступен ({e})")
+                return None
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
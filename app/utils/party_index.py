@@ -0,0 +1,76 @@
+"""Индекс партий снимка данных.
+
+Строится один раз на снимок и профиль крутки (components.metrics.get_profile_aggregates).
+Снимок упорядочен по крутке и номеру партии (normalize_records), поэтому строки
+профиля (twist_rows), любой партии и любого хвоста «последние k партий» занимают
+непрерывный диапазон строк. Срезы — iloc по этому диапазону: в каждом воркере
+это представления над mmap снимка, без копирования данных и без повторных
+sorted(unique()) и isin на каждом перезапуске.
+"""
+import numpy as np
+
+TWIST_COL = 'Крутка'
+PARTY_COL = '№ партии'
+
+
+def twist_rows(df, twist):
+    """Строки профиля крутки: срез iloc, если таблица упорядочена по крутке, иначе фильтр (копия)"""
+    if TWIST_COL not in df.columns:
+        return df
+    values = df[TWIST_COL].to_numpy(dtype=float)
+    # Пропуски крутки — в конце таблицы
+    known = values[:np.count_nonzero(~np.isnan(values))]
+    if np.isnan(known).any() or (known[1:] < known[:-1]).any():
+        return df[df[TWIST_COL] == twist]
+    return df.iloc[np.searchsorted(known, twist, 'left'):np.searchsorted(known, twist, 'right')]
+
+
+class PartyIndex:
+    """Партии по возрастанию, границы их строк и подписи для отображения"""
+
+    def __init__(self, df, party_offset=0):
+        df = df[df[PARTY_COL].notna()] if df[PARTY_COL].hasnans else df
+        values = df[PARTY_COL].to_numpy()
+        order = np.argsort(values, kind='stable')
+        # Данные обычно уже идут по партиям — тогда таблица не копируется
+        if len(order) and (order != np.arange(len(order))).any():
+            df = df.iloc[order]
+            values = values[order]
+        starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]]) if len(values) else np.array([], dtype=int)
+
+        self.df = df
+        self.party_offset = party_offset
+        self.parties = values[starts]
+        self.offsets = np.append(starts, len(values))
+        self.labels = self.parties.astype(int) - party_offset
+        self._positions = {party: i for i, party in enumerate(self.parties.tolist())}
+
+    def __len__(self):
+        return len(self.parties)
+
+    def last_parties(self, k):
+        """Номера последних k партий"""
+        return self.parties[max(len(self.parties) - k, 0):]
+
+    def last_n(self, k):
+        """Строки последних k партий"""
+        return self.df.iloc[self.offsets[max(len(self.parties) - k, 0)]:]
+
+    def party(self, party):
+        """Строки одной партии (пустая таблица, если партии нет)"""
+        i = self._positions.get(party)
+        if i is None:
+            return self.df.iloc[:0]
+        return self.df.iloc[self.offsets[i]:self.offsets[i + 1]]
+
+    def label(self, party):
+        """Номер партии для отображения (со смещением профиля)"""
+        return int(party) - self.party_offset
+
+
+def last_parties_rows(df, n, party_index=None):
+    """Строки последних n партий: срез индекса или, без индекса, фильтр таблицы"""
+    if party_index is not None:
+        return party_index.last_n(n)
+    recent = sorted(df[PARTY_COL].dropna().unique())[-n:]
+    return df[df[PARTY_COL].isin(recent)]
@@ -0,0 +1,384 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils import db
+from utils.tracking import register_periodic
+
+# Размер кольцевого буфера замеров (общий для всего процесса)
+TIMINGS_BUFFER_SIZE = 2000
+
+# Период сброса агрегатов замеров в SQLite, сек
+PERF_ROLLUP_SECONDS = 60
+
+# Секции, замеряющие перезапуск страницы целиком
+RERUN_SUFFIXES = ('.full_render', '.page')
+
+# Границы гистограмм задержек (метрики Prometheus), мс
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Границы корзин поминутных гистограмм (perf_rollup_buckets), мс: шаг 25 %, от 1 мс до ~2 мин
+ROLLUP_BUCKETS_MS = tuple(round(1.25 ** i, 2) for i in range(53)) + (float('inf'),)
+
+UPSERT_ROLLUP_SQL = '''
+    INSERT INTO perf_rollups (bucket, section, count, total_ms, max_ms, rows, bytes)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (bucket, section) DO UPDATE SET
+        max_ms = MAX(max_ms, excluded.max_ms),
+        total_ms = total_ms + excluded.total_ms,
+        rows = rows + excluded.rows,
+        bytes = bytes + excluded.bytes,
+        count = count + excluded.count
+'''
+UPSERT_ROLLUP_BUCKET_SQL = '''
+    INSERT INTO perf_rollup_buckets (bucket, section, le_ms, count) VALUES (?, ?, ?, ?)
+    ON CONFLICT (bucket, section, le_ms) DO UPDATE SET
+        count = count + excluded.count
+'''
+UPSERT_CACHE_ROLLUP_SQL = '''
+    INSERT INTO perf_cache_rollups (bucket, name, calls, misses) VALUES (?, ?, ?, ?)
+    ON CONFLICT (bucket, name) DO UPDATE SET
+        calls = calls + excluded.calls,
+        misses = misses + excluded.misses
+'''
+
+_timings = deque(maxlen=TIMINGS_BUFFER_SIZE)
+# Замеры, ещё не попавшие в агрегаты SQLite
+_pending = deque(maxlen=TIMINGS_BUFFER_SIZE * 10)
+_lock = threading.Lock()
+# Обращения к кэшам: имя -> {'calls', 'misses'} всего и с последнего сброса
+_cache_stats = {}
+_cache_pending = {}
+# Накопительные гистограммы задержек: (метрика, метки) -> {'buckets', 'sum_ms', 'count'}
+_histograms = {}
+
+
+def _array_bytes(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(index=False)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return len(value) * 8
+    return 0
+
+
+def payload_bytes(obj):
+    """Оценка объёма результата: таблица, график plotly, словарь массивов"""
+    if obj is None:
+        return None
+    if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)):
+        return _array_bytes(obj)
+    if isinstance(obj, str):
+        return len(obj.encode('utf-8'))
+    if isinstance(obj, dict):
+        return sum(_array_bytes(value) for value in obj.values())
+    if hasattr(obj, 'data') and hasattr(obj, 'layout'):
+        # График: объём рядов точек, уходящих в браузер
+        return sum(
+            _array_bytes(trace[key]) for trace in obj.data
+            for key in ('x', 'y', 'z', 'text', 'customdata') if key in trace
+        )
+    return None
+
+
+def _rows(args, result):
+    """Число обработанных строк: первая таблица среди аргументов или результат-таблица"""
+    for arg in args:
+        if isinstance(arg, pd.DataFrame):
+            return len(arg)
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    return None
+
+
+def record_timing(section, elapsed_ms, rows=None, payload=None):
+    """Сохранение замера секции: время, строки на входе, объём результата"""
+    # Фоновые потоки (прогрев, вычислительный процесс) работают без сессии
+    in_session = get_script_run_ctx(suppress_warning=True) is not None
+    try:
+        user = st.session_state.get('username') if in_session else None
+    except Exception:
+        user = None
+    entry = {'section': section, 'ms': elapsed_ms, 'ts': time.time(),
+             'rows': rows, 'bytes': payload, 'user': user}
+    with _lock:
+        _timings.append(entry)
+        _pending.append(entry)
+    observe('section', (('section', section),), elapsed_ms)
+    if section.endswith(RERUN_SUFFIXES):
+        observe('rerun', (('page', section.rsplit('.', 1)[0]),), elapsed_ms)
+
+    # Последние значения для текущей сессии (для панели замеров)
+    if not in_session:
+        return
+    try:
+        st.session_state.setdefault('section_timings', {})[section] = round(elapsed_ms, 1)
+    except Exception:
+        pass
+
+
+def observe(metric, labels, elapsed_ms):
+    """Замер в накопительную гистограмму метрики; labels — кортеж пар (метка, значение)"""
+    with _lock:
+        histogram = _histograms.get((metric, labels))
+        if histogram is None:
+            histogram = {'buckets': [0] * len(LATENCY_BUCKETS_MS), 'sum_ms': 0.0, 'count': 0}
+            _histograms[(metric, labels)] = histogram
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                histogram['buckets'][i] += 1
+        histogram['sum_ms'] += elapsed_ms
+        histogram['count'] += 1
+
+
+def get_histograms():
+    """Копия гистограмм задержек процесса: {(метрика, метки): {'buckets', 'sum_ms', 'count'}}"""
+    with _lock:
+        return {key: {**h, 'buckets': list(h['buckets'])} for key, h in _histograms.items()}
+
+
+@contextmanager
+def timed_section(section):
+    """Контекстный менеджер для замера секции страницы.
+
+    В выдаваемый словарь можно записать 'rows' и 'bytes' замера.
+    """
+    measure = {}
+    start = time.perf_counter()
+    try:
+        yield measure
+    finally:
+        record_timing(section, (time.perf_counter() - start) * 1000,
+                      measure.get('rows'), measure.get('bytes'))
+
+
+def _timed_call(section, func, args, kwargs):
+    with timed_section(section) as measure:
+        result = func(*args, **kwargs)
+        measure['rows'] = _rows(args, result)
+        measure['bytes'] = payload_bytes(result)
+    return result
+
+
+def timed(section):
+    """Декоратор для замера функции: время, строки входной таблицы и объём результата"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return _timed_call(section, func, args, kwargs)
+        return wrapper
+    return decorator
+
+
+def timed_profile(page, section):
+    """Декоратор замера секции страницы профиля крутки.
+
+    Первый аргумент функции — профиль из TWIST_PROFILES, имя секции
+    получается вида <page>_<крутка>.<section>.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(profile, *args, **kwargs):
+            return _timed_call(f"{page}_{profile['twist']}.{section}", func, (profile,) + args, kwargs)
+        return wrapper
+    return decorator
+
+
+def _count_cache(name, key):
+    with _lock:
+        _cache_stats.setdefault(name, {'calls': 0, 'misses': 0})[key] += 1
+        _cache_pending.setdefault(name, {'calls': 0, 'misses': 0})[key] += 1
+
+
+def tracked_cache(name, cache):
+    """Кэширование декоратором Streamlit с подсчётом попаданий.
+
+    Тело функции выполняется только при промахе, поэтому промахи
+    считаются внутри кэшируемой функции, а обращения — снаружи.
+    """
+    def decorator(func):
+        @wraps(func)
+        def compute(*args, **kwargs):
+            _count_cache(name, 'misses')
+            return func(*args, **kwargs)
+        cached = cache(compute)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            _count_cache(name, 'calls')
+            return cached(*args, **kwargs)
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+
+def get_cache_stats():
+    """Обращения и промахи кэшей текущего процесса"""
+    with _lock:
+        stats = {name: dict(counts) for name, counts in _cache_stats.items()}
+    for counts in stats.values():
+        calls = counts['calls']
+        counts['hit_rate'] = (calls - counts['misses']) / calls if calls else None
+    return stats
+
+
+def get_recent_timings(section=None):
+    """Последние замеры из кольцевого буфера"""
+    with _lock:
+        items = list(_timings)
+    if section is not None:
+        items = [t for t in items if t['section'] == section]
+    return items
+
+
+def _timings_frame(items):
+    df = pd.DataFrame(items)
+    df[['rows', 'bytes']] = df[['rows', 'bytes']].astype(float)
+    return df
+
+
+def summarize_timings(items=None):
+    """p50/p95 по секциям из кольцевого буфера"""
+    items = get_recent_timings() if items is None else items
+    if not items:
+        return pd.DataFrame(columns=['section', 'count', 'p50_ms', 'p95_ms', 'max_ms', 'rows', 'bytes'])
+    grouped = _timings_frame(items).groupby('section')
+    summary = pd.DataFrame({
+        'count': grouped['ms'].size(),
+        'p50_ms': grouped['ms'].median(),
+        'p95_ms': grouped['ms'].quantile(0.95),
+        'max_ms': grouped['ms'].max(),
+        'rows': grouped['rows'].mean(),
+        'bytes': grouped['bytes'].mean(),
+    })
+    return summary.reset_index().sort_values('p95_ms', ascending=False)
+
+
+def get_slowest_reruns(limit=15):
+    """Самые долгие перезапуски страниц из кольцевого буфера"""
+    reruns = [t for t in get_recent_timings() if t['section'].endswith(RERUN_SUFFIXES)]
+    return sorted(reruns, key=lambda t: -t['ms'])[:limit]
+
+
+def flush_rollups():
+    """Сброс накопленных замеров в поминутные агрегаты SQLite"""
+    with _lock:
+        items = list(_pending)
+        _pending.clear()
+        cache_items = [(name, dict(counts)) for name, counts in _cache_pending.items()]
+        _cache_pending.clear()
+    if not items and not cache_items:
+        return
+
+    now_bucket = datetime.now().strftime('%Y-%m-%d %H:%M')
+    rollups, buckets = [], []
+    if items:
+        df = _timings_frame(items)
+        df['bucket'] = [time.strftime('%Y-%m-%d %H:%M', time.localtime(ts)) for ts in df['ts']]
+        for (bucket, section), group in df.groupby(['bucket', 'section']):
+            ms = group['ms'].to_numpy()
+            rollups.append((
+                bucket, section, len(ms), float(ms.sum()), float(ms.max()),
+                int(group['rows'].sum()), int(group['bytes'].sum())
+            ))
+            # Корзина замера — первая граница не меньше него
+            counts = np.bincount(np.searchsorted(ROLLUP_BUCKETS_MS, ms), minlength=len(ROLLUP_BUCKETS_MS))
+            buckets += [(bucket, section, ROLLUP_BUCKETS_MS[i], int(counts[i])) for i in np.flatnonzero(counts)]
+    with db.transaction() as conn:
+        conn.executemany(UPSERT_ROLLUP_SQL, rollups)
+        conn.executemany(UPSERT_ROLLUP_BUCKET_SQL, buckets)
+        conn.executemany(UPSERT_CACHE_ROLLUP_SQL, [
+            (now_bucket, name, counts['calls'], counts['misses']) for name, counts in cache_items
+        ])
+
+
+register_periodic(flush_rollups, PERF_ROLLUP_SECONDS)
+
+
+def bucket_quantile(buckets, q, max_ms):
+    """Квантиль по корзинам гистограммы [(граница, число)]: интерполяция внутри корзины"""
+    total = sum(count for _, count in buckets)
+    if not total:
+        return None
+    target = q * total
+    seen, lower = 0, 0.0
+    for bound, count in sorted(buckets):
+        if count and seen + count >= target:
+            upper = max_ms if bound == float('inf') else bound
+            return min(lower + (upper - lower) * (target - seen) / count, max_ms)
+        seen += count
+        lower = bound
+    return max_ms
+
+
+def _rollup_buckets(key_sql, since):
+    """Суммы корзин гистограмм за период: {ключ: [(граница, число)]}"""
+    buckets = {}
+    for *key, bound, count in db.query(f'''
+        SELECT {key_sql}, le_ms, SUM(count)
+        FROM perf_rollup_buckets
+        WHERE bucket >= strftime('%Y-%m-%d %H:%M', 'now', 'localtime', ?)
+        GROUP BY {key_sql}, le_ms
+    ''', (since,)):
+        buckets.setdefault(tuple(key), []).append((bound, count))
+    return buckets
+
+
+def get_rollup_history(hours=24):
+    """Агрегаты замеров за последние часы (из SQLite): по секциям и по часам.
+
+    p50 и p95 — квантили всех замеров периода по сумме поминутных гистограмм.
+    """
+    since = f'-{hours} hours'
+    section_buckets = _rollup_buckets('section', since)
+    by_section = []
+    for section, count, mean_ms, max_ms, rows, payload in db.query('''
+        SELECT section, SUM(count), SUM(total_ms) / SUM(count), MAX(max_ms),
+               SUM(rows) / SUM(count), SUM(bytes) / SUM(count)
+        FROM perf_rollups
+        WHERE bucket >= strftime('%Y-%m-%d %H:%M', 'now', 'localtime', ?)
+        GROUP BY section
+    ''', (since,)):
+        buckets = section_buckets.get((section,), [])
+        by_section.append((section, count, mean_ms, bucket_quantile(buckets, 0.5, max_ms),
+                           bucket_quantile(buckets, 0.95, max_ms), max_ms, rows, payload))
+    by_section.sort(key=lambda row: -(row[4] if row[4] is not None else row[2]))
+
+    hour_sql = "substr(bucket, 1, 13) || ':00'"
+    hour_buckets = _rollup_buckets(f'{hour_sql}, section', since)
+    by_hour = [
+        (hour, section, mean_ms, bucket_quantile(hour_buckets.get((hour, section), []), 0.95, max_ms))
+        for hour, section, mean_ms, max_ms in db.query(f'''
+            SELECT {hour_sql}, section, SUM(total_ms) / SUM(count), MAX(max_ms)
+            FROM perf_rollups
+            WHERE bucket >= strftime('%Y-%m-%d %H:%M', 'now', 'localtime', ?)
+            GROUP BY 1, section
+            ORDER BY 1
+        ''', (since,))
+    ]
+    cache = db.query('''
+        SELECT name, SUM(calls), SUM(misses)
+        FROM perf_cache_rollups
+        WHERE bucket >= strftime('%Y-%m-%d %H:%M', 'now', 'localtime', ?)
+        GROUP BY name
+    ''', (since,))
+    return {'by_section': by_section, 'by_hour': by_hour, 'cache': cache}
+
+
+def render_timings_panel():
+    """Панель с временем отрисовки секций (только для администратора)"""
+    timings = st.session_state.get('section_timings')
+    if not timings:
+        return
+    with st.sidebar.expander("⏱ Время секций, мс", expanded=False):
+        for section, ms in sorted(timings.items(), key=lambda x: -x[1]):
+            st.markdown(f"<span style='font-size:12px;'>{section}: <b>{ms}</b></span>", unsafe_allow_html=True)
@@ -0,0 +1,210 @@
+"""Профилирование перезапуска страницы по параметру ?profile=1 (только администратор).
+
+Фоновый поток каждые PROFILE_INTERVAL_MS снимает стек потока скрипта
+через sys._current_frames(). Функции страниц не нужно менять. После
+перезапуска в data/profiles/ сохраняются три файла:
+- <имя>.speedscope.json — флеймграф для https://www.speedscope.app;
+- <имя>.folded — свёрнутые стеки для flamegraph.pl;
+- <имя>.top.txt — самые долгие функции (собственное и полное время).
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+import streamlit as st
+
+from utils.auth import is_admin
+
+PROFILES_DIR = Path(os.getenv('SPINNING_PROFILES_DIR') or Path(__file__).parent.parent.parent / 'data' / 'profiles')
+APP_ROOT = str(Path(__file__).parent.parent)
+PROFILER_FILE = os.path.join('utils', 'profiler.py')
+
+# Период снятия стека, мс
+PROFILE_INTERVAL_MS = 5
+
+# Строк в таблице самых долгих функций
+PROFILE_TOP_N = 30
+
+# Хранится профилей (старые удаляются)
+PROFILES_KEEP = 50
+
+PROFILE_SUFFIXES = ('.speedscope.json', '.folded', '.top.txt')
+
+
+def profiling_requested():
+    try:
+        return st.query_params.get('profile') == '1' and is_admin()
+    except Exception:
+        return False
+
+
+def _frame_key(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(APP_ROOT):
+        filename = os.path.relpath(filename, APP_ROOT)
+    elif 'site-packages' in filename:
+        filename = filename.split('site-packages', 1)[1].lstrip(os.sep)
+    return getattr(code, 'co_qualname', code.co_name), filename, code.co_firstlineno
+
+
+class StackSampler:
+    """Сэмплирующий профайлер одного потока: стеки от корня к листу и время между снимками"""
+
+    def __init__(self, thread_id, interval_ms=PROFILE_INTERVAL_MS):
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_key(frame))
+                frame = frame.f_back
+            stack.reverse()
+            # Кадры Streamlit и профайлера над профилируемой функцией не нужны
+            own = [i for i, (_, filename, _) in enumerate(stack) if filename == PROFILER_FILE]
+            self.samples.append((tuple(stack[own[-1] + 1:] if own else stack), (now - last) * 1000))
+            last = now
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _frame_name(frame):
+    name, filename, line = frame
+    return f"{name} ({filename}:{line})"
+
+
+def to_speedscope(samples, name):
+    """Профиль в формате speedscope (sampled)"""
+    frames = {}
+    indexed = []
+    for stack, weight in samples:
+        indexed.append([frames.setdefault(frame, len(frames)) for frame in stack])
+    weights = [weight for _, weight in samples]
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'spinning-dashboard',
+        'shared': {'frames': [
+            {'name': frame[0], 'file': frame[1], 'line': frame[2]} for frame in frames
+        ]},
+        'profiles': [{
+            'type': 'sampled', 'name': name, 'unit': 'milliseconds',
+            'startValue': 0, 'endValue': sum(weights),
+            'samples': indexed, 'weights': weights,
+        }],
+    }
+
+
+def to_folded(samples):
+    """Свёрнутые стеки: «кадр;кадр;...;кадр время_мкс» на строку"""
+    folded = {}
+    for stack, weight in samples:
+        key = ';'.join(_frame_name(frame) for frame in stack)
+        folded[key] = folded.get(key, 0) + weight
+    return '\n'.join(f"{key} {round(weight * 1000)}" for key, weight in sorted(folded.items())) + '\n'
+
+
+def top_functions(samples, limit=PROFILE_TOP_N):
+    """Функции по полному времени: [(функция, собственное мс, полное мс, доля)]"""
+    self_ms = {}
+    total_ms = {}
+    for stack, weight in samples:
+        if not stack:
+            continue
+        self_ms[stack[-1]] = self_ms.get(stack[-1], 0) + weight
+        # Рекурсивная функция считается в стеке один раз
+        for frame in set(stack):
+            total_ms[frame] = total_ms.get(frame, 0) + weight
+    elapsed = sum(weight for _, weight in samples) or 1
+    ranked = sorted(total_ms.items(), key=lambda item: -item[1])[:limit]
+    return [(_frame_name(frame), self_ms.get(frame, 0), total, total / elapsed) for frame, total in ranked]
+
+
+def format_top(rows, name, elapsed_ms, sample_count):
+    lines = [f"{name}: {elapsed_ms:.0f} мс, {sample_count} снимков стека", '',
+             f"{'Собств., мс':>12}{'Всего, мс':>12}{'Доля':>8}  Функция"]
+    for func, self_ms, total_ms, share in rows:
+        lines.append(f"{self_ms:>12.1f}{total_ms:>12.1f}{share:>8.1%}  {func}")
+    return '\n'.join(lines) + '\n'
+
+
+def _cleanup(directory):
+    bases = sorted({path.name.split('.')[0] for path in directory.glob('*.top.txt')})
+    for base in bases[:-PROFILES_KEEP]:
+        for suffix in PROFILE_SUFFIXES:
+            (directory / f"{base}{suffix}").unlink(missing_ok=True)
+
+
+def save_profile(samples, name):
+    """Три файла профиля в PROFILES_DIR; возвращает общее имя файлов"""
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    base = f"{datetime.now():%Y%m%d-%H%M%S}_{name}"
+    elapsed = sum(weight for _, weight in samples)
+    with open(PROFILES_DIR / f"{base}.speedscope.json", 'w', encoding='utf-8') as f:
+        json.dump(to_speedscope(samples, name), f, ensure_ascii=False)
+    with open(PROFILES_DIR / f"{base}.folded", 'w', encoding='utf-8') as f:
+        f.write(to_folded(samples))
+    with open(PROFILES_DIR / f"{base}.top.txt", 'w', encoding='utf-8') as f:
+        f.write(format_top(top_functions(samples), name, elapsed, len(samples)))
+    _cleanup(PROFILES_DIR)
+    return base
+
+
+@contextmanager
+def profile_rerun(name):
+    """Профилирование блока в потоке скрипта (файлы сохраняются и при st.rerun/st.stop)"""
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        if sampler.samples:
+            base = save_profile(sampler.samples, name)
+            st.sidebar.caption(f"Профиль сохранён: {base} (страница «Производительность»)")
+
+
+def profiled_page(page):
+    """Декоратор страницы профиля крутки: при ?profile=1 у администратора перезапуск профилируется"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(twist, *args, **kwargs):
+            if not profiling_requested():
+                return func(twist, *args, **kwargs)
+            with profile_rerun(f"{page}_{twist}"):
+                return func(twist, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def list_profiles():
+    """Сохранённые профили, от новых к старым: [(имя, {суффикс: путь})]"""
+    if not PROFILES_DIR.exists():
+        return []
+    profiles = {}
+    for path in PROFILES_DIR.iterdir():
+        for suffix in PROFILE_SUFFIXES:
+            if path.name.endswith(suffix):
+                profiles.setdefault(path.name[:-len(suffix)], {})[suffix] = path
+    return sorted(profiles.items(), reverse=True)
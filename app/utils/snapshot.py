@@ -0,0 +1,118 @@
+"""Общий снимок данных для нескольких воркеров Streamlit.
+
+Снимок — файл Arrow IPC, который записывает один воркер (писатель
+выбирается блокировкой файла), а все воркеры читают через mmap.
+Числовые колонки без пропусков отображаются в pandas без копирования:
+страницы файла лежат в кэше ОС один раз на все процессы.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pyarrow as pa
+
+from utils.constants import SNAPSHOT_CONFIG
+
+# Путь к файлу снимка; не задан — каждый процесс загружает данные сам
+SNAPSHOT_PATH_ENV = 'SPINNING_SNAPSHOT_PATH'
+
+
+def snapshot_path():
+    return os.getenv(SNAPSHOT_PATH_ENV) or None
+
+
+def write_snapshot(df, path):
+    """Атомарная запись снимка: временный файл и переименование (читатели держат старый файл).
+
+    Колонки должны быть одного типа (normalize_records приводит смешанные колонки листа).
+    """
+    metadata = {
+        'snapshot_version': df.attrs.get('snapshot_version') or '',
+        'fetched_at': df.attrs['fetched_at'].isoformat() if df.attrs.get('fetched_at') else '',
+        'cold_parties': json.dumps(df.attrs.get('cold_parties') or {}),
+    }
+    # attrs пишутся в свои поля метаданных, а не в метаданные pandas
+    frame = df.copy(deep=False)
+    frame.attrs = {}
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    """DataFrame поверх отображённого в память снимка (только чтение)"""
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    df = table.to_pandas(split_blocks=True)
+    metadata = {key.decode(): value.decode() for key, value in (table.schema.metadata or {}).items()}
+    df.attrs['snapshot_version'] = metadata.get('snapshot_version') or None
+    if metadata.get('fetched_at'):
+        df.attrs['fetched_at'] = datetime.fromisoformat(metadata['fetched_at'])
+    if metadata.get('cold_parties'):
+        df.attrs['cold_parties'] = json.loads(metadata['cold_parties'])
+    return df
+
+
+def snapshot_age(path):
+    """Возраст снимка в секундах (None — снимка нет)"""
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def mark_snapshot_stale(path):
+    """Снимок считается устаревшим: следующий писатель загрузит данные заново"""
+    try:
+        os.utime(path, (0, 0))
+    except OSError:
+        pass
+
+
+@contextmanager
+def writer_lock(path, wait=False):
+    """Блокировка писателя снимка; внутри — True, если блокировка получена"""
+    try:
+        import fcntl
+    except ImportError:
+        # Без fcntl (Windows) несколько воркеров не запускаются: процесс сам себе писатель
+        yield True
+        return
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f'{path}.lock', 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_shared(fetch, path):
+    """Данные из общего снимка; устаревший снимок обновляет воркер, получивший блокировку.
+
+    fetch() загружает данные из источника (None — загрузка не удалась, тогда
+    показывается прежний снимок). Пока снимка нет, воркеры ждут писателя.
+    """
+    with writer_lock(path, wait=snapshot_age(path) is None) as is_writer:
+        age = snapshot_age(path)
+        if is_writer and (age is None or age >= SNAPSHOT_CONFIG['max_age_seconds']):
+            df = fetch()
+            if df is not None:
+                write_snapshot(df, path)
+            elif age is None:
+                return None
+    if snapshot_age(path) is None:
+        return None
+    return read_snapshot(path)
@@ -0,0 +1,86 @@
+import numpy as np
+
+from utils.constants import COLORS, QUALITY_THRESHOLDS
+
+# Коды статуса показателя
+STATUS_NA = -1
+STATUS_GOOD = 0
+STATUS_WARN = 1
+STATUS_BAD = 2
+
+# Цвета по коду статуса; последний элемент — для STATUS_NA (индекс -1)
+STATUS_PALETTE = (COLORS['success'], COLORS['warning'], COLORS['danger'], COLORS['muted'])
+
+# Цветовые шкалы таблицы машин (по возрастанию значения)
+STRENGTH_BAND_PALETTE = ('#ef4444', '#f97316', '#eab308', '#22c55e')  # красный, оранжевый, жёлтый, зелёный
+CV_BAND_PALETTE = ('#22c55e', '#f97316', '#ef4444')                   # зелёный, оранжевый, красный
+
+# Уровни числа отклонений машины: 2+ — внимание, 4+ — критично
+PROBLEM_BANDS = (2, 4)
+PROBLEM_PALETTE = (COLORS['accent'], COLORS['warning'], COLORS['danger'])
+
+
+def _as_float(values):
+    return np.asarray(values, dtype=float)
+
+
+def check_values(values, threshold, mode='greater'):
+    """Маска соответствия норме: greater — не ниже порога, less — не выше, range — в диапазоне"""
+    values = _as_float(values)
+    if mode == 'greater':
+        return values >= threshold
+    if mode == 'less':
+        return values <= threshold
+    if mode == 'range':
+        low, high = threshold
+        return (values >= low) & (values <= high)
+    return np.ones(values.shape, dtype=bool)
+
+
+def status_codes(values, threshold, mode='greater'):
+    """Коды статуса массива значений: норма / отклонение / нет данных"""
+    values = _as_float(values)
+    codes = np.where(check_values(values, threshold, mode), STATUS_GOOD, STATUS_BAD)
+    codes[np.isnan(values)] = STATUS_NA
+    return codes
+
+
+def quality_status(strength, cv, thresholds=None):
+    """Статус машины по двум показателям: обе в норме / одна / ни одной"""
+    thresholds = thresholds or QUALITY_THRESHOLDS
+    strength_ok = check_values(strength, thresholds['strength_min'], 'greater')
+    cv_ok = check_values(cv, thresholds['cv_max'], 'less')
+    return np.select([strength_ok & cv_ok, strength_ok | cv_ok], [STATUS_GOOD, STATUS_WARN], STATUS_BAD)
+
+
+def trend_status(values, threshold, mode='greater'):
+    """Статус точек ряда относительно его среднего и порога (для спарклайнов)"""
+    values = _as_float(values)
+    mean_val = np.nanmean(values)
+    if mode == 'greater':
+        conditions = [values >= mean_val, values < threshold]
+    elif mode == 'less':
+        conditions = [values <= mean_val, values > threshold]
+    else:
+        return status_codes(values, threshold, mode)
+    return np.select(conditions, [STATUS_GOOD, STATUS_BAD], STATUS_WARN)
+
+
+def status_colors(codes, palette=STATUS_PALETTE):
+    """Массив цветов по кодам статуса"""
+    return np.asarray(palette, dtype=object)[np.asarray(codes, dtype=int)]
+
+
+def band_colors(values, edges, palette):
+    """Цвета по интервалам значений: palette[i] для edges[i-1] <= v < edges[i]"""
+    return np.asarray(palette, dtype=object)[np.digitize(_as_float(values), edges)]
+
+
+def strength_band_colors(values, profile):
+    """Цвета прочности в таблице машин по шкале профиля крутки"""
+    return band_colors(values, profile['strength_bands'], STRENGTH_BAND_PALETTE)
+
+
+def cv_band_colors(values, profile):
+    """Цвета CV в таблице машин по шкале профиля крутки"""
+    return band_colors(values, profile['cv_bands'], CV_BAND_PALETTE)
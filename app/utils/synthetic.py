@@ -0,0 +1,71 @@
+"""Синтетические данные цеха: партии × машины с реалистичным разбросом.
+
+Используются бенчмарками и офлайн-режимом вместо Google Sheets.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.constants import TWIST_PROFILES
+
+STRENGTH_COL = 'Относительная разрывная нагрузка, сН/текс'
+CV_COL = 'Коэффициент вариации, %'
+DENSITY_COL = 'Линейная плотность, текс'
+PLAST_COL = 'Пласт. вытяжка, %'
+SPEED_COL = 'Скорость формования, м/мин'
+NOTE_COL = 'Примечание'
+
+# Доля строк с незаполненным номером партии (отбрасываются при загрузке)
+MISSING_SHARE = 0.005
+
+
+def make_shop_frame(n_parties, n_machines, twist=100, seed=0):
+    """Таблица измерений в том виде, в каком её возвращает normalize_records"""
+    profile = TWIST_PROFILES[twist]
+    rng = np.random.default_rng(seed)
+    size = n_parties * n_machines
+
+    parties = np.repeat(np.arange(n_parties) + profile['party_offset'] + 1, n_machines).astype(float)
+    machines = np.tile(np.arange(1, n_machines + 1), n_parties).astype(float)
+
+    # Прочность: норма профиля, смещение машины и медленный дрейф по партиям
+    strength_mean = profile['thresholds']['strength_min'] + 8
+    machine_bias = rng.normal(0, 4, n_machines)
+    drift = np.sin(np.arange(n_parties) / 25) * 3
+    strength = (strength_mean + np.tile(machine_bias, n_parties)
+                + np.repeat(drift, n_machines) + rng.normal(0, 6, size))
+
+    df = pd.DataFrame({
+        '№ партии': parties,
+        '№ ПМ': machines,
+        'Крутка': float(twist),
+        STRENGTH_COL: strength.round(1),
+        CV_COL: np.abs(rng.normal(7.5, 1.5, size)).round(1),
+        DENSITY_COL: rng.normal(28.9, 0.4, size).round(2),
+        PLAST_COL: np.where(machines % 2 == 1, 60, 65),
+        SPEED_COL: np.where(machines % 3 == 0, 188.0, 164.0),
+    })
+    return df
+
+
+def make_sheet_records(n_parties, n_machines, twist=100, seed=0):
+    """Строки листа в формате gspread get_all_records: десятичная запятая,
+    плотность и CV умножены на 10, часть номеров партий и вытяжек не заполнена."""
+    df = make_shop_frame(n_parties, n_machines, twist, seed)
+    rng = np.random.default_rng(seed + 1)
+
+    sheet = pd.DataFrame({
+        '№ партии': df['№ партии'].astype(int).astype(str),
+        '№ ПМ': df['№ ПМ'].astype(int),
+        'Крутка': df['Крутка'].astype(int),
+        STRENGTH_COL: df[STRENGTH_COL].astype(str).str.replace('.', ',', regex=False),
+        CV_COL: (df[CV_COL] * 10).round().astype(int),
+        DENSITY_COL: (df[DENSITY_COL] * 10).round().astype(int),
+        PLAST_COL: df[PLAST_COL],
+        SPEED_COL: df[SPEED_COL].astype(int),
+    })
+    sheet.loc[rng.random(len(sheet)) < MISSING_SHARE, '№ партии'] = ''
+    # Как в листе: числа и пустые ячейки в одной колонке, текст с пропусками
+    sheet[PLAST_COL] = sheet[PLAST_COL].astype(object)
+    sheet.loc[rng.random(len(sheet)) < MISSING_SHARE, PLAST_COL] = ''
+    sheet[NOTE_COL] = np.where(rng.random(len(sheet)) < MISSING_SHARE, 'перезаправка', '')
+    return sheet.to_dict('records')
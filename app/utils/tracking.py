@@ -0,0 +1,202 @@
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from utils import db
+
+# Ограничение очереди событий: при переполнении новые события отбрасываются
+TRACKING_QUEUE_SIZE = 10000
+
+# Максимум событий в одной транзакции записи
+TRACKING_BATCH_SIZE = 500
+
+# Пауза фонового писателя между сбросами, сек (события копятся в пачку)
+TRACKING_FLUSH_INTERVAL = 2.0
+
+# Период отметок активности открытой вкладки, сек
+HEARTBEAT_SECONDS = 60
+
+INSERT_EVENT_SQL = 'INSERT INTO page_views (username, page, kind, detail, view_time) VALUES (?, ?, ?, ?, ?)'
+UPDATE_LAST_SEEN_SQL = 'UPDATE visits SET last_seen = ? WHERE id = ? AND logout_time IS NULL'
+# Посещение, закрытое как зависшее до этой отметки (явный выход позже отметки не открывается)
+SELECT_CLOSED_VISIT_SQL = 'SELECT username, login_time, duration_minutes FROM visits WHERE id = ? AND logout_time < ?'
+REOPEN_VISIT_SQL = 'UPDATE visits SET logout_time = NULL, duration_minutes = NULL, last_seen = ? WHERE id = ?'
+
+_queue = queue.Queue(maxsize=TRACKING_QUEUE_SIZE)
+_stats = {'enqueued': 0, 'dropped': 0, 'written': 0, 'failed': 0, 'batches': 0, 'heartbeats': 0, 'task_failed': 0}
+# Последняя отметка активности по посещению: частые отметки схлопываются до одной
+_heartbeats = {}
+_heartbeats_lock = threading.Lock()
+# Периодические задачи фонового писателя: [функция, интервал, время следующего запуска]
+_periodic = []
+_stats_lock = threading.Lock()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _count(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+def _drain(limit=TRACKING_BATCH_SIZE):
+    """Забрать из очереди до limit событий без ожидания"""
+    batch = []
+    while len(batch) < limit:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _take_heartbeats():
+    global _heartbeats
+    with _heartbeats_lock:
+        heartbeats, _heartbeats = _heartbeats, {}
+    return [(ts, visit_id) for visit_id, ts in heartbeats.items()]
+
+
+def add_visit_minutes(conn, username, login_time, duration):
+    """Учёт длительности завершённого посещения в сводных таблицах"""
+    conn.execute(
+        'UPDATE visit_user_stats SET total_minutes = total_minutes + ? WHERE username = ?',
+        (duration, username)
+    )
+    conn.execute(
+        'UPDATE visit_daily_stats SET total_minutes = total_minutes + ? WHERE day = date(?)',
+        (duration, login_time)
+    )
+
+
+def _touch_visits(conn, heartbeats):
+    """Отметки активности; посещение, закрытое как зависшее, открывается снова"""
+    for ts, visit_id in heartbeats:
+        if conn.execute(UPDATE_LAST_SEEN_SQL, (ts, visit_id)).rowcount:
+            continue
+        closed = conn.execute(SELECT_CLOSED_VISIT_SQL, (visit_id, ts)).fetchone()
+        if closed:
+            # Минуты закрытия снимаются: при следующем закрытии посещение учтётся целиком
+            username, login_time, duration = closed
+            conn.execute(REOPEN_VISIT_SQL, (ts, visit_id))
+            add_visit_minutes(conn, username, login_time, -(duration or 0))
+
+
+def _write_batch(batch, heartbeats=()):
+    """Запись пачки событий и отметок активности одной транзакцией"""
+    if not batch and not heartbeats:
+        return
+    try:
+        with db.transaction() as conn:
+            if batch:
+                conn.executemany(INSERT_EVENT_SQL, batch)
+            if heartbeats:
+                _touch_visits(conn, heartbeats)
+        _count('written', len(batch))
+        _count('heartbeats', len(heartbeats))
+        _count('batches')
+    except sqlite3.Error:
+        _count('failed', len(batch) + len(heartbeats))
+
+
+def _run_periodic():
+    now = time.monotonic()
+    for task in _periodic:
+        func, interval, next_run = task
+        if now >= next_run:
+            task[2] = now + interval
+            # Ошибка одной задачи не останавливает писатель: остальные задачи и запись событий продолжаются
+            try:
+                func()
+            except Exception as e:
+                _count('task_failed')
+                print(f"Фоновая задача {getattr(func, '__name__', func)} не выполнена: {e!r}")
+
+
+def _writer_loop():
+    while True:
+        # Пауза между сбросами: события и отметки успевают накопиться в пачку
+        time.sleep(TRACKING_FLUSH_INTERVAL)
+        _write_batch(_drain(), _take_heartbeats())
+        _run_periodic()
+
+
+def ensure_writer():
+    """Запуск фонового писателя (при первом событии или входе, а не при импорте)"""
+    global _writer
+    if _writer is not None:
+        return
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_writer_loop, name='tracking-writer', daemon=True)
+            _writer.start()
+            atexit.register(flush)
+
+
+def flush():
+    """Синхронная запись всех накопленных событий (при завершении процесса)"""
+    _write_batch(_drain(), _take_heartbeats())
+    batch = _drain()
+    while batch:
+        _write_batch(batch)
+        batch = _drain()
+
+
+def register_periodic(func, interval):
+    """Регистрация периодической задачи фонового писателя (например, закрытие зависших посещений).
+
+    Писатель при этом не запускается: задачи выполняются, когда процесс начнёт писать события.
+    """
+    _periodic.append([func, interval, time.monotonic() + interval])
+
+
+def track_event(page, kind='view', detail=None, username=None):
+    """Постановка события в очередь (без обращения к базе в потоке страницы)"""
+    if username is None:
+        username = st.session_state.get('username') or 'anonymous'
+    try:
+        _queue.put_nowait((username, page, kind, detail, datetime.now()))
+        _count('enqueued')
+    except queue.Full:
+        _count('dropped')
+    ensure_writer()
+
+
+def track_heartbeat(visit_id=None):
+    """Отметка активности посещения (пишется пачкой фоновым писателем)"""
+    if visit_id is None:
+        visit_id = st.session_state.get('visit_id')
+    if not visit_id:
+        return
+    with _heartbeats_lock:
+        _heartbeats[visit_id] = datetime.now()
+    ensure_writer()
+
+
+@st.fragment(run_every=HEARTBEAT_SECONDS)
+def render_heartbeat():
+    """Фоновая отметка активности открытой вкладки (без перезапуска страницы)"""
+    track_heartbeat()
+
+
+def track_page_view(page):
+    """Просмотр страницы: записывается при переходе на страницу, а не на каждый перезапуск"""
+    if st.session_state.get('_tracked_page') == page:
+        return
+    st.session_state._tracked_page = page
+    track_event(page, 'view')
+
+
+def get_tracking_stats():
+    """Счётчики очереди событий текущего процесса"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['queued'] = _queue.qsize()
+    with _heartbeats_lock:
+        stats['pending_heartbeats'] = len(_heartbeats)
+    return stats
@@ -0,0 +1,120 @@
+"""Общие функции бенчмарков: замер, сохранение результатов, сравнение с базовой линией"""
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from statistics import median
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCH_DIR, '..', 'app')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+sys.path.append(APP_DIR)
+
+# Повторы замера: не меньше MIN_REPEATS и не дольше MIN_TIME суммарно
+MIN_REPEATS = 3
+MAX_REPEATS = 20
+MIN_TIME = 0.5
+
+# Одиночный прогон дольше этого — повторы не нужны, сек
+SLOW_RUN = 2.0
+
+# Допустимое ухудшение относительно базовой линии (медиана времени, пик памяти)
+DEFAULT_TOLERANCE = 1.25
+
+
+def measure(func, repeats=None):
+    """Время (мс) серии прогонов и пик памяти одного прогона по tracemalloc (байт)"""
+    times = []
+    total = 0.0
+    while True:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed * 1000)
+        total += elapsed
+        if repeats is not None:
+            if len(times) >= repeats:
+                break
+        elif elapsed > SLOW_RUN or len(times) >= MAX_REPEATS or (len(times) >= MIN_REPEATS and total >= MIN_TIME):
+            break
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_ms': median(times),
+        'min_ms': min(times),
+        'repeats': len(times),
+        'peak_bytes': peak,
+    }
+
+
+def environment():
+    """Версии интерпретатора и библиотек для сопоставимости результатов"""
+    import numpy
+    import pandas
+    import plotly
+    import streamlit
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'plotly': plotly.__version__,
+        'streamlit': streamlit.__version__,
+    }
+
+
+def result_key(result):
+    return f"{result['case']}@{result['scale']}"
+
+
+def save_results(results, suite, path=None):
+    """Сохранение результатов в JSON (по умолчанию benchmarks/results/<suite>-<время>.json)"""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{suite}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'suite': suite, 'environment': environment(), 'results': results}, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return {result_key(r): r for r in json.load(f)['results']}
+
+
+def compare(results, baseline, metrics, tolerance=DEFAULT_TOLERANCE):
+    """Отношение к базовой линии по каждой метрике; список ухудшений сверх допуска"""
+    regressions = []
+    for result in results:
+        base = baseline.get(result_key(result))
+        if base is None:
+            continue
+        for metric in metrics:
+            if not base.get(metric) or result.get(metric) is None:
+                continue
+            ratio = result[metric] / base[metric]
+            result[f'{metric}_ratio'] = ratio
+            if ratio > tolerance:
+                regressions.append((result_key(result), metric, ratio))
+    return regressions
+
+
+def print_table(results, columns):
+    """Таблица результатов в консоль: columns — [(ключ, заголовок, формат)]"""
+    rows = [[fmt.format(r[key]) if r.get(key) is not None else '—' for key, _, fmt in columns] for r in results]
+    headers = [title for _, title, _ in columns]
+    widths = [max(len(h), *(len(row[i]) for row in rows)) if rows else len(h) for i, h in enumerate(headers)]
+    print('  '.join(h.ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(cell.ljust(w) for cell, w in zip(row, widths)))
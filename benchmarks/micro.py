@@ -0,0 +1,142 @@
+"""Микробенчмарки загрузки, метрик, графиков и контрольных карт.
+
+Функции запускаются на синтетических данных цеха нескольких масштабов
+(партии × машины). Для каждой функции замеряются время (медиана и
+минимум серии прогонов) и пиковая память одного прогона (tracemalloc).
+Результаты сохраняются в JSON и сравниваются с базовой линией.
+
+Запуск:
+    python benchmarks/micro.py                       # все масштабы
+    python benchmarks/micro.py --scales 10x20 100x50 # выбранные масштабы
+    python benchmarks/micro.py --cases calc_xbar_r_data detect_out_of_control
+    python benchmarks/micro.py --save-baseline       # записать базовую линию
+"""
+import argparse
+import inspect
+import logging
+import os
+import sys
+
+from common import (
+    BENCH_DIR, DEFAULT_TOLERANCE, measure, save_results, load_results, compare, print_table
+)
+
+from components.charts import create_heatmap, create_problem_machines_chart
+from components.metrics import calculate_party_metrics
+from components.spc import calc_xbar_r_data, calc_p_chart_data, calc_xmr_data, detect_out_of_control
+from utils.constants import GAUGE_CONFIG, TWIST_PROFILES
+from utils.data_processing import normalize_records
+from utils.synthetic import make_shop_frame, make_sheet_records, STRENGTH_COL, CV_COL
+
+# Масштабы данных: партии × машины
+SCALES = {
+    '10x20': (10, 20),
+    '100x50': (100, 50),
+    '1000x100': (1000, 100),
+    '5000x200': (5000, 200),
+}
+
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline_micro.json')
+
+PROFILE = TWIST_PROFILES[100]
+THRESHOLDS = PROFILE['thresholds']
+
+
+def _raw(func):
+    """Функция без обёртки замеров perf (бенчмарк меряет само вычисление)"""
+    return inspect.unwrap(func)
+
+
+def prepare(n_parties, n_machines, cases):
+    """Входные данные масштаба для выбранных функций (подготовка в замер не входит)"""
+    df = make_shop_frame(n_parties, n_machines)
+    ctx = {'df': df, 'last_party': df['№ партии'].max()}
+    if 'normalize_records' in cases:
+        ctx['records'] = make_sheet_records(n_parties, n_machines)
+    if 'detect_out_of_control' in cases:
+        ctx['xbar'] = _raw(calc_xbar_r_data)(df, STRENGTH_COL, offset=PROFILE['party_offset'])
+    return ctx
+
+
+CASES = {
+    'normalize_records': lambda ctx: normalize_records(ctx['records']),
+    'calculate_party_metrics': lambda ctx: calculate_party_metrics(
+        ctx['df'][ctx['df']['№ партии'] == ctx['last_party']], thresholds=THRESHOLDS),
+    'create_heatmap': lambda ctx: _raw(create_heatmap)(
+        ctx['df'], STRENGTH_COL, 'Прочность', GAUGE_CONFIG['strength']),
+    'create_problem_machines_chart': lambda ctx: _raw(create_problem_machines_chart)(
+        ctx['df'], 10, THRESHOLDS['strength_min'], THRESHOLDS['cv_max']),
+    'calc_xbar_r_data': lambda ctx: _raw(calc_xbar_r_data)(
+        ctx['df'], STRENGTH_COL, offset=PROFILE['party_offset']),
+    'calc_p_chart_data': lambda ctx: _raw(calc_p_chart_data)(
+        ctx['df'], CV_COL, THRESHOLDS['cv_max'], mode='greater', offset=PROFILE['party_offset']),
+    'calc_xmr_data': lambda ctx: _raw(calc_xmr_data)(
+        ctx['df'], 1, STRENGTH_COL, offset=PROFILE['party_offset']),
+    'detect_out_of_control': lambda ctx: _raw(detect_out_of_control)(
+        ctx['xbar']['x_bars'], ctx['xbar']['x_bar_bar'], ctx['xbar']['x_ucl'], ctx['xbar']['x_lcl']),
+}
+
+COLUMNS = [
+    ('case', 'Функция', '{}'),
+    ('scale', 'Масштаб', '{}'),
+    ('rows', 'Строк', '{}'),
+    ('median_ms', 'Медиана, мс', '{:.2f}'),
+    ('min_ms', 'Минимум, мс', '{:.2f}'),
+    ('repeats', 'Прогонов', '{}'),
+    ('peak_mb', 'Пик, МБ', '{:.2f}'),
+    ('median_ms_ratio', 'Время к базе', '{:.2f}'),
+    ('peak_bytes_ratio', 'Память к базе', '{:.2f}'),
+]
+
+
+def run(scales, cases, repeats=None):
+    results = []
+    for scale in scales:
+        n_parties, n_machines = SCALES[scale]
+        ctx = prepare(n_parties, n_machines, cases)
+        for case in cases:
+            stats = measure(lambda: CASES[case](ctx), repeats)
+            result = {'case': case, 'scale': scale, 'rows': n_parties * n_machines, **stats,
+                      'peak_mb': stats['peak_bytes'] / 2**20}
+            results.append(result)
+            print(f"{case} @ {scale}: {result['median_ms']:.2f} мс, пик {result['peak_mb']:.2f} МБ", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Микробенчмарки на синтетических данных цеха')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=list(SCALES),
+                        help='масштабы партии×машины')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES),
+                        help='замеряемые функции')
+    parser.add_argument('--repeats', type=int, default=None,
+                        help='фиксированное число прогонов (по умолчанию — адаптивно)')
+    parser.add_argument('--output', default=None, help='файл результатов JSON')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='базовая линия для сравнения')
+    parser.add_argument('--save-baseline', action='store_true', help='сохранить результаты как базовую линию')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='допустимое отношение к базовой линии')
+    args = parser.parse_args()
+
+    # Предупреждения Streamlit о запуске вне сервера не нужны
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    results = run(args.scales, args.cases, args.repeats)
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        regressions = compare(results, load_results(args.baseline), ['median_ms', 'peak_bytes'], args.tolerance)
+
+    print_table(results, COLUMNS)
+    path = save_results(results, 'micro', BASELINE_FILE if args.save_baseline else args.output)
+    print(f"\nРезультаты: {path}")
+
+    if regressions:
+        print(f"\nУхудшения сверх допуска {args.tolerance}:")
+        for key, metric, ratio in regressions:
+            print(f"  {key}: {metric} ×{ratio:.2f}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""Бенчмарки страниц целиком через streamlit.testing AppTest.
+
+Каждая страница выполняется без браузера в авторизованной сессии
+администратора на локальных данных (SPINNING_OFFLINE_DATA) и с
+отдельной временной базой посещений. Замеряются время первого и
+повторного перезапуска, число элементов страницы и объём их
+сериализованных сообщений, а также стоимость типичных действий —
+выбора партии и числа партий на контрольных картах. AppTest после
+действия перезапускает весь скрипт, даже если виджет во фрагменте, —
+время действий здесь верхняя оценка.
+
+Запуск:
+    python benchmarks/pages.py                          # synthetic:100x30
+    python benchmarks/pages.py --data synthetic:500x60  # больше данных
+    python benchmarks/pages.py --data export.csv        # выгрузка листа
+    python benchmarks/pages.py --save-baseline
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from statistics import median
+
+from common import (
+    APP_DIR, BENCH_DIR, DEFAULT_TOLERANCE, save_results, load_results, compare, print_table
+)
+
+# Страницы: имя -> путь относительно app/
+PAGES = {
+    'dashboard_100': 'dashboard.py',
+    'dashboard_50': 'pages/1_Дашборд_нити_с_круткой_50_крм.py',
+    'spc_100': 'pages/2_Контрольные_карты_100_крм.py',
+    'spc_50': 'pages/3_Контрольные_карты_50_крм.py',
+    'admin_stats': 'pages/5_Статистика_для_администратора.py',
+    'admin_perf': 'pages/6_Производительность.py',
+}
+
+# Действия на страницах: (ключ selectbox, индексы выбираемых вариантов по очереди)
+INTERACTIONS = {
+    'dashboard_100': [('party_selector', (1, 0))],
+    'dashboard_50': [('party_selector_50', (1, 0))],
+    'spc_100': [('spc_n_parties', (5, 2))],
+    'spc_50': [('spc_n_parties_50', (5, 2))],
+}
+
+DEFAULT_DATA = 'synthetic:100x30'
+DEFAULT_RERUNS = 5
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline_pages.json')
+
+ADMIN_SESSION = {
+    'authenticated': True,
+    'username': 'benchmark',
+    'user_info': {'name': 'Бенчмарк', 'role': 'admin'},
+    'visit_id': None,
+}
+
+COLUMNS = [
+    ('case', 'Страница / действие', '{}'),
+    ('first_ms', 'Первый, мс', '{:.0f}'),
+    ('median_ms', 'Медиана, мс', '{:.0f}'),
+    ('min_ms', 'Минимум, мс', '{:.0f}'),
+    ('elements', 'Элементов', '{}'),
+    ('payload_kb', 'Сообщения, КБ', '{:.1f}'),
+    ('median_ms_ratio', 'Время к базе', '{:.2f}'),
+    ('payload_bytes_ratio', 'Объём к базе', '{:.2f}'),
+]
+
+
+def _elements(block, acc):
+    """Листовые элементы дерева страницы"""
+    children = getattr(block, 'children', None)
+    if isinstance(children, dict):
+        for child in children.values():
+            _elements(child, acc)
+    else:
+        acc.append(block)
+    return acc
+
+
+def page_stats(at):
+    """Число элементов страницы и объём их сериализованных сообщений"""
+    elements = _elements(at.main, []) + _elements(at.sidebar, [])
+    payload = sum(e.proto.ByteSize() for e in elements if getattr(e, 'proto', None) is not None)
+    return len(elements), payload
+
+
+def _timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+
+def open_page(page):
+    """Сессия AppTest с главным скриптом dashboard.py, переключённая на страницу"""
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(APP_DIR, 'dashboard.py'), default_timeout=600)
+    for key, value in ADMIN_SESSION.items():
+        at.session_state[key] = value
+    if PAGES[page] != 'dashboard.py':
+        at.switch_page(PAGES[page])
+    return at
+
+
+def bench_page(page, data, reruns):
+    at = open_page(page)
+    first = _timed_run(at)
+    times = [_timed_run(at) for _ in range(reruns)]
+    elements, payload = page_stats(at)
+    results = [{
+        'case': page, 'scale': data, 'first_ms': first, 'median_ms': median(times), 'min_ms': min(times),
+        'elements': elements, 'payload_bytes': payload, 'payload_kb': payload / 1024,
+    }]
+
+    for key, indexes in INTERACTIONS.get(page, []):
+        times = []
+        for i in range(reruns):
+            at.selectbox(key=key).select_index(indexes[i % len(indexes)])
+            times.append(_timed_run(at))
+        elements, payload = page_stats(at)
+        results.append({
+            'case': f"{page}:{key}", 'scale': data, 'first_ms': None,
+            'median_ms': median(times), 'min_ms': min(times),
+            'elements': elements, 'payload_bytes': payload, 'payload_kb': payload / 1024,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарки страниц через AppTest')
+    parser.add_argument('--data', default=DEFAULT_DATA,
+                        help='локальные данные: synthetic:<партии>x<машины> или путь к CSV')
+    parser.add_argument('--pages', nargs='+', choices=list(PAGES), default=list(PAGES))
+    parser.add_argument('--reruns', type=int, default=DEFAULT_RERUNS, help='повторных перезапусков на замер')
+    parser.add_argument('--output', default=None, help='файл результатов JSON')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='базовая линия для сравнения')
+    parser.add_argument('--save-baseline', action='store_true', help='сохранить результаты как базовую линию')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='допустимое отношение к базовой линии')
+    args = parser.parse_args()
+
+    # До первого импорта приложения: локальные данные, временные базы посещений и измерений
+    os.environ['SPINNING_OFFLINE_DATA'] = args.data
+    work_dir = tempfile.mkdtemp(prefix='spinning-bench-')
+    os.environ['SPINNING_DB_PATH'] = os.path.join(work_dir, 'visits.db')
+    os.environ['SPINNING_HISTORY_DIR'] = os.path.join(work_dir, 'history')
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    results = []
+    for page in args.pages:
+        page_results = bench_page(page, args.data, args.reruns)
+        for result in page_results:
+            print(f"{result['case']}: {result['median_ms']:.0f} мс", file=sys.stderr)
+        results.extend(page_results)
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        regressions = compare(results, load_results(args.baseline), ['median_ms', 'payload_bytes'], args.tolerance)
+
+    print_table(results, COLUMNS)
+    path = save_results(results, 'pages', BASELINE_FILE if args.save_baseline else args.output)
+    print(f"\nРезультаты: {path}")
+
+    if regressions:
+        print(f"\nУхудшения сверх допуска {args.tolerance}:")
+        for key, metric, ratio in regressions:
+            print(f"  {key}: {metric} ×{ratio:.2f}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Профиль холодного старта: время импорта модулей страниц.
+
+Каждый модуль импортируется в новом интерпретаторе с -X importtime.
+Замеряется полное время импорта (медиана по запускам), а в отчёте
+показаны пакеты и модули, которые дают больше всего собственного
+времени импорта.
+
+Запуск:
+    python benchmarks/startup.py                     # все страницы
+    python benchmarks/startup.py --modules dashboard --top 30
+    python benchmarks/startup.py --save-baseline
+"""
+import argparse
+import os
+import subprocess
+import sys
+from statistics import median
+
+from common import APP_DIR, BENCH_DIR, DEFAULT_TOLERANCE, save_results, load_results, compare, print_table
+
+# Модули, которые импортирует первая сессия страницы
+MODULES = {
+    'dashboard': 'components.dashboard_page',
+    'spc': 'components.spc_page',
+    'data_processing': 'utils.data_processing',
+    'charts': 'components.charts',
+}
+
+DEFAULT_RUNS = 3
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline_startup.json')
+
+COLUMNS = [
+    ('case', 'Модуль', '{}'),
+    ('median_ms', 'Медиана, мс', '{:.0f}'),
+    ('min_ms', 'Минимум, мс', '{:.0f}'),
+    ('modules', 'Модулей', '{}'),
+    ('median_ms_ratio', 'Время к базе', '{:.2f}'),
+]
+
+
+def import_profile(module):
+    """Строки -X importtime одного импорта: [(модуль, собственное мкс, накопленное мкс)]"""
+    code = f"import sys; sys.path.insert(0, {os.path.abspath(APP_DIR)!r}); import {module}"
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=APP_DIR)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def bench_module(key, runs):
+    module = MODULES[key]
+    times = []
+    for _ in range(runs):
+        rows = import_profile(module)
+        times.append(next(cumulative for name, _, cumulative in rows if name == module) / 1000)
+    result = {'case': key, 'scale': 'import', 'median_ms': median(times), 'min_ms': min(times),
+              'repeats': runs, 'modules': len(rows)}
+    return result, rows
+
+
+def print_breakdown(key, rows, top):
+    """Собственное время импорта по пакетам верхнего уровня и самые дорогие модули"""
+    packages = {}
+    for name, self_us, _ in rows:
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    print(f"\n{key}: пакеты по собственному времени импорта")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:<30}{self_us / 1000:>9.1f} мс")
+    print(f"{key}: модули")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[1])[:top]:
+        print(f"  {name:<50}{self_us / 1000:>9.1f} мс  (с зависимостями {cumulative_us / 1000:.1f} мс)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Профиль времени импорта модулей страниц')
+    parser.add_argument('--modules', nargs='+', choices=list(MODULES), default=list(MODULES))
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='запусков интерпретатора на модуль')
+    parser.add_argument('--top', type=int, default=15, help='строк в разбивке по пакетам и модулям')
+    parser.add_argument('--output', default=None, help='файл результатов JSON')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='базовая линия для сравнения')
+    parser.add_argument('--save-baseline', action='store_true', help='сохранить результаты как базовую линию')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='допустимое отношение к базовой линии')
+    args = parser.parse_args()
+
+    results = []
+    for key in args.modules:
+        result, rows = bench_module(key, args.runs)
+        results.append(result)
+        print_breakdown(key, rows, args.top)
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        regressions = compare(results, load_results(args.baseline), ['median_ms'], args.tolerance)
+
+    print()
+    print_table(results, COLUMNS)
+    path = save_results(results, 'startup', BASELINE_FILE if args.save_baseline else args.output)
+    print(f"\nРезультаты: {path}")
+
+    if regressions:
+        print(f"\nУхудшения сверх допуска {args.tolerance}:")
+        for key, metric, ratio in regressions:
+            print(f"  {key}: {metric} ×{ratio:.2f}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,12 @@
 #!/bin/bash
 # Настройка автозапуска дашборда при включении Mac
+#
+# ./setup_autostart.sh      — один процесс Streamlit
+# ./setup_autostart.sh 4    — 4 воркера за nginx (см. start_server.sh)
 
 DASHBOARD_DIR="$HOME/Dashboard"
 PLIST_NAME="com.spinning.dashboard.plist"
+WORKERS="${1:-1}"
 
 echo "🔧 Настройка автозапуска..."
 
@@ -16,8 +20,10 @@ fi
 # Создаём LaunchAgents если не существует
 mkdir -p ~/Library/LaunchAgents
 
-# Обновляем путь в plist
-sed "s|~/Dashboard|$DASHBOARD_DIR|g" "$DASHBOARD_DIR/$PLIST_NAME" > ~/Library/LaunchAgents/$PLIST_NAME
+# Обновляем путь и число воркеров в plist
+sed -e "s|~/Dashboard|$DASHBOARD_DIR|g" \
+    -e "/DASHBOARD_WORKERS/{n;s|<string>[0-9]*</string>|<string>$WORKERS</string>|;}" \
+    "$DASHBOARD_DIR/$PLIST_NAME" > ~/Library/LaunchAgents/$PLIST_NAME
 
 # Загружаем агент
 launchctl unload ~/Library/LaunchAgents/$PLIST_NAME 2>/dev/null
@@ -26,7 +32,7 @@ launchctl load ~/Library/LaunchAgents/$PLIST_NAME
 echo ""
 echo "✅ Автозапуск настроен!"
 echo ""
-echo "Дашборд будет автоматически запускаться при включении Mac."
+echo "Дашборд будет автоматически запускаться при включении Mac (воркеров: $WORKERS)."
 echo ""
 echo "Команды управления:"
 echo "  Остановить:  launchctl unload ~/Library/LaunchAgents/$PLIST_NAME"
@@ -1,18 +1,115 @@
 #!/bin/bash
 # Запуск дашборда как сервера
+#
+# Несколько воркеров: ./start_server.sh 4 (или DASHBOARD_WORKERS=4).
+# Воркеры слушают 127.0.0.1:8511..., перед ними nginx на порту 8501
+# с привязкой клиента к воркеру (ip_hash). Данные загружает один воркер
+# в общий снимок data/snapshot/, остальные читают его через mmap.
+# Контрольные карты заранее считает app/compute_worker.py.
+# app/serve.py запускает streamlit run и прогревает кэши до первой сессии.
 
 cd "$(dirname "$0")"
 source venv/bin/activate
 
+PORT=8501
+WORKERS="${1:-${DASHBOARD_WORKERS:-1}}"
+FIRST_WORKER_PORT=8511
+# Метрики Prometheus: http://127.0.0.1:9101/metrics (у воркеров — 9101, 9102, ...)
+FIRST_METRICS_PORT=9101
+
 echo "🚀 Запуск дашборда..."
-echo "📍 Локальный доступ: http://localhost:8501"
-echo "📍 Сетевой доступ: http://$(ipconfig getifaddr en0):8501"
+echo "📍 Локальный доступ: http://localhost:$PORT"
+echo "📍 Сетевой доступ: http://$(ipconfig getifaddr en0):$PORT"
 echo ""
 echo "Для остановки нажмите Ctrl+C"
 echo ""
 
-streamlit run app/dashboard.py \
-    --server.port 8501 \
-    --server.address 0.0.0.0 \
-    --server.headless true \
-    --browser.gatherUsageStats false
+if [ "$WORKERS" -le 1 ]; then
+    SPINNING_METRICS_PORT=$FIRST_METRICS_PORT exec python app/serve.py \
+        --server.port $PORT \
+        --server.address 0.0.0.0 \
+        --server.headless true \
+        --browser.gatherUsageStats false
+fi
+
+if ! command -v nginx &> /dev/null; then
+    echo "❌ Для нескольких воркеров нужен nginx: brew install nginx"
+    exit 1
+fi
+
+export SPINNING_SNAPSHOT_PATH="$PWD/data/snapshot/measurements.arrow"
+NGINX_DIR="$PWD/data/nginx"
+mkdir -p "$NGINX_DIR/logs" "$(dirname "$SPINNING_SNAPSHOT_PATH")"
+
+# Остановка всех воркеров и nginx при выходе
+PIDS=()
+trap 'kill "${PIDS[@]}" 2>/dev/null; wait' EXIT INT TERM
+
+# Вычислительный процесс: готовые контрольные карты для всех воркеров.
+# Ключ соединения случайный на каждый запуск (по сокету передаются объекты pickle)
+export SPINNING_COMPUTE_ADDRESS="127.0.0.1:8520"
+export SPINNING_COMPUTE_KEY="${SPINNING_COMPUTE_KEY:-$(python -c 'import secrets; print(secrets.token_hex(16))')}"
+python app/compute_worker.py &
+PIDS+=($!)
+echo "🧮 Вычислительный процесс: $SPINNING_COMPUTE_ADDRESS"
+
+UPSTREAMS=""
+for ((i = 0; i < WORKERS; i++)); do
+    WORKER_PORT=$((FIRST_WORKER_PORT + i))
+    SPINNING_METRICS_PORT=$((FIRST_METRICS_PORT + i)) python app/serve.py \
+        --server.port $WORKER_PORT \
+        --server.address 127.0.0.1 \
+        --server.headless true \
+        --browser.gatherUsageStats false &
+    PIDS+=($!)
+    UPSTREAMS="$UPSTREAMS        server 127.0.0.1:$WORKER_PORT;
+"
+    echo "⚙️  Воркер $((i + 1)): 127.0.0.1:$WORKER_PORT"
+done
+
+# Сессия Streamlit живёт в памяти воркера: клиент всегда попадает на один и тот же (ip_hash)
+cat > "$NGINX_DIR/nginx.conf" <<CONF
+worker_processes 1;
+pid $NGINX_DIR/nginx.pid;
+error_log $NGINX_DIR/logs/error.log;
+events { worker_connections 1024; }
+http {
+    access_log $NGINX_DIR/logs/access.log;
+    client_body_temp_path $NGINX_DIR/client_body;
+    proxy_temp_path $NGINX_DIR/proxy;
+    upstream dashboard {
+        ip_hash;
+$UPSTREAMS    }
+    server {
+        listen $PORT;
+        location / {
+            proxy_pass http://dashboard;
+            proxy_http_version 1.1;
+            proxy_set_header Upgrade \$http_upgrade;
+            proxy_set_header Connection "upgrade";
+            proxy_set_header Host \$host;
+            proxy_set_header X-Forwarded-For \$proxy_add_x_forwarded_for;
+            proxy_buffering off;
+            proxy_read_timeout 86400;
+        }
+    }
+}
+CONF
+
+nginx -c "$NGINX_DIR/nginx.conf" -g 'daemon off;' &
+PIDS+=($!)
+echo "🔀 nginx: порт $PORT → $WORKERS воркеров"
+
+# Процесс держится, пока работают все воркеры, вычислительный процесс и nginx.
+# kill -0 со списком pid успешен, если жив хотя бы один, поэтому каждый проверяется
+# отдельно; при падении любого выходим с ошибкой (trap останавливает остальных,
+# launchd перезапускает). wait -n нет в bash 3.2 macOS
+while true; do
+    for pid in "${PIDS[@]}"; do
+        if ! kill -0 "$pid" 2>/dev/null; then
+            echo "❌ Процесс $pid завершился — остановка всех процессов"
+            exit 1
+        fi
+    done
+    sleep 5
+done
@@ -0,0 +1,335 @@
+"""Нагрузочный тест: N одновременных сессий Streamlit по websocket.
+
+Поднимает приложение на локальных данных (SPINNING_OFFLINE_DATA) с
+временными базой посещений и списком пользователей либо подключается
+к уже запущенному серверу (--url). Каждый виртуальный пользователь
+проходит сценарий:
+- вход через форму;
+- дашборд и выбор другой партии;
+- контрольные карты;
+- 1000 партий на контрольных картах;
+- возврат на дашборд.
+
+Раскрытие машин в сетке дашборда выполняется в браузере без запроса к
+серверу: содержимое экспандеров уже входит в ответ дашборда, поэтому
+отдельного шага для него нет.
+
+Отчёт:
+- перцентили задержки по шагам и доля отказов;
+- загрузка CPU сервера;
+- прирост RSS сервера на одну сессию.
+
+Запуск:
+    python tools/load_test.py --users 10
+    python tools/load_test.py --users 25 --ramp 10 --iterations 3 --data synthetic:1000x30
+    python tools/load_test.py --url http://server:8501 --user <логин> --password <пароль> --pid <pid>
+
+Требуется пакет websockets; для замеров сервера на macOS — psutil.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from statistics import median
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+from st_client import StreamlitClient
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app', 'dashboard.py')
+
+LOADTEST_USER = 'loadtest'
+LOADTEST_PASSWORD = 'loadtest'
+
+# Страница контрольных карт и число партий в сценарии
+SPC_PAGE = 'Контрольные карты 100 крм'
+SPC_PARTIES = '1000'
+
+# Ожидание готовности сервера, сек
+STARTUP_TIMEOUT = 60
+
+PERCENTILES = (50, 95, 99)
+
+
+# ============================================================
+# ЗАМЕРЫ ПРОЦЕССА СЕРВЕРА
+# ============================================================
+
+def process_sample(pid):
+    """(процессорное время в секундах, RSS в байтах) процесса сервера или None"""
+    if pid is None:
+        return None
+    if psutil is not None:
+        process = psutil.Process(pid)
+        times = process.cpu_times()
+        return times.user + times.system, process.memory_info().rss
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open(f'/proc/{pid}/status') as f:
+            rss_kb = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+    except OSError:
+        return None
+    ticks = os.sysconf('SC_CLK_TCK')
+    return (int(fields[11]) + int(fields[12])) / ticks, rss_kb * 1024
+
+
+# ============================================================
+# СЕРВЕР НА ЛОКАЛЬНЫХ ДАННЫХ
+# ============================================================
+
+def write_users_file(path):
+    """Временный список пользователей с учётной записью нагрузочного теста"""
+    from utils.auth import hash_password
+    import yaml
+    config = {'credentials': {'usernames': {LOADTEST_USER: {
+        'name': 'Нагрузочный тест', 'password': hash_password(LOADTEST_PASSWORD), 'role': 'admin'
+    }}}}
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+
+
+def start_server(port, data):
+    """Запуск streamlit run с локальными данными, временными базами и пользователями"""
+    work_dir = tempfile.mkdtemp(prefix='spinning-load-')
+    env = dict(os.environ)
+    env['SPINNING_OFFLINE_DATA'] = data
+    env['SPINNING_DB_PATH'] = os.path.join(work_dir, 'visits.db')
+    env['SPINNING_HISTORY_DIR'] = os.path.join(work_dir, 'history')
+    env['SPINNING_USERS_PATH'] = os.path.join(work_dir, 'users.yaml')
+    write_users_file(env['SPINNING_USERS_PATH'])
+
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', APP_SCRIPT,
+         '--server.port', str(port), '--server.headless', 'true',
+         '--browser.gatherUsageStats', 'false', '--server.fileWatcherType', 'none'],
+        env=env, stdout=subprocess.DEVNULL, stderr=open(os.path.join(work_dir, 'server.log'), 'w')
+    )
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'Сервер завершился, см. {work_dir}/server.log')
+        try:
+            with urllib.request.urlopen(f'{url}/_stcore/health', timeout=2) as response:
+                if response.status == 200:
+                    return server, url
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError('Сервер не ответил за отведённое время')
+
+
+# ============================================================
+# СЦЕНАРИЙ ВИРТУАЛЬНОГО ПОЛЬЗОВАТЕЛЯ
+# ============================================================
+
+class Stats:
+    """Задержки и отказы по шагам сценария"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.failures = {}
+        self.errors = []
+        self.bytes = 0
+
+    def record(self, step, result):
+        self.latencies.setdefault(step, []).append(result.elapsed_ms)
+        self.bytes += result.bytes
+        if result.exceptions:
+            self.fail(step, result.exceptions[0])
+
+    def fail(self, step, error):
+        self.failures[step] = self.failures.get(step, 0) + 1
+        self.errors.append(f'{step}: {error}')
+
+
+async def user_flow(url, stats, args, logged_in):
+    client = StreamlitClient(url, timeout=args.timeout)
+    step = 'connect'
+    try:
+        await client.connect()
+        step = 'open'
+        stats.record(step, await client.rerun())
+
+        step = 'login'
+        client.set_value('text_input', 'Логин', args.user)
+        client.set_value('text_input', 'Пароль', args.password)
+        stats.record(step, await client.click('Войти'))
+        logged_in.append(1)
+
+        for _ in range(args.iterations):
+            step = 'party_select'
+            parties = client.widget('selectbox', 'party_selector').options
+            client.set_value('selectbox', 'party_selector', parties[min(1, len(parties) - 1)])
+            stats.record(step, await client.rerun())
+
+            step = 'spc'
+            stats.record(step, await client.open_page(SPC_PAGE))
+
+            step = 'spc_1000'
+            client.set_value('selectbox', 'spc_n_parties', SPC_PARTIES)
+            stats.record(step, await client.rerun())
+
+            step = 'dashboard'
+            stats.record(step, await client.open_page(''))
+            await asyncio.sleep(args.think)
+    except Exception as e:
+        stats.fail(step, f'{type(e).__name__}: {e}')
+    finally:
+        await client.close()
+
+
+async def run_load(url, args, pid):
+    stats = Stats()
+    logged_in = []
+    samples = []
+
+    async def sampler():
+        while True:
+            sample = process_sample(pid)
+            if sample:
+                samples.append((time.perf_counter(), len(logged_in), *sample))
+            await asyncio.sleep(0.5)
+
+    sampler_task = asyncio.create_task(sampler())
+    baseline = process_sample(pid)
+    start = time.perf_counter()
+    tasks = []
+    for i in range(args.users):
+        tasks.append(asyncio.create_task(user_flow(url, stats, args, logged_in)))
+        if args.ramp and i < args.users - 1:
+            await asyncio.sleep(args.ramp / args.users)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    final = process_sample(pid)
+    sampler_task.cancel()
+    return stats, elapsed, baseline, final, samples
+
+
+# ============================================================
+# ОТЧЁТ
+# ============================================================
+
+def percentile(values, p):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(p / 100 * len(values)) - 1))
+    return values[index]
+
+
+def build_report(stats, elapsed, baseline, final, samples, args):
+    steps = {}
+    for step, latencies in stats.latencies.items():
+        steps[step] = {
+            'count': len(latencies),
+            'failures': stats.failures.get(step, 0),
+            'median_ms': median(latencies),
+            **{f'p{p}_ms': percentile(latencies, p) for p in PERCENTILES},
+            'max_ms': max(latencies),
+        }
+    for step, count in stats.failures.items():
+        steps.setdefault(step, {'count': 0, 'failures': count})
+
+    total = sum(s['count'] for s in steps.values())
+    failures = sum(stats.failures.values())
+    report = {
+        'users': args.users,
+        'iterations': args.iterations,
+        'data': args.data,
+        'elapsed_s': elapsed,
+        'steps': steps,
+        'steps_per_s': total / elapsed if elapsed else None,
+        'failure_rate': failures / (total + failures) if total + failures else 0.0,
+        'received_mb': stats.bytes / 2**20,
+        'errors': stats.errors[:20],
+    }
+    if baseline and final:
+        peak_rss = max(sample[3] for sample in samples) if samples else final[1]
+        report['server'] = {
+            'cpu_percent': (final[0] - baseline[0]) / elapsed * 100,
+            'rss_start_mb': baseline[1] / 2**20,
+            'rss_peak_mb': peak_rss / 2**20,
+            'rss_end_mb': final[1] / 2**20,
+            'rss_per_session_mb': (peak_rss - baseline[1]) / 2**20 / args.users,
+        }
+    return report
+
+
+def print_report(report):
+    print(f"\nПользователей: {report['users']}, итераций: {report['iterations']}, "
+          f"данные: {report['data']}, время: {report['elapsed_s']:.1f} с")
+    header = f"{'Шаг':<14}{'Всего':>7}{'Отказов':>9}" + ''.join(f"{f'p{p}, мс':>11}" for p in PERCENTILES) + f"{'Макс, мс':>11}"
+    print(header)
+    for step, s in report['steps'].items():
+        if not s['count']:
+            print(f"{step:<14}{0:>7}{s['failures']:>9}")
+            continue
+        print(f"{step:<14}{s['count']:>7}{s['failures']:>9}"
+              + ''.join(f"{s[f'p{p}_ms']:>11.0f}" for p in PERCENTILES) + f"{s['max_ms']:>11.0f}")
+    print(f"\nШагов в секунду: {report['steps_per_s']:.2f}, отказов: {report['failure_rate']:.1%}, "
+          f"принято: {report['received_mb']:.1f} МБ")
+    server = report.get('server')
+    if server:
+        print(f"Сервер: CPU {server['cpu_percent']:.0f}%, RSS {server['rss_start_mb']:.0f} → "
+              f"пик {server['rss_peak_mb']:.0f} МБ, на сессию {server['rss_per_session_mb']:.1f} МБ")
+    for error in report['errors']:
+        print(f"  ! {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный тест одновременных сессий Streamlit')
+    parser.add_argument('--users', type=int, default=10, help='одновременных сессий')
+    parser.add_argument('--ramp', type=float, default=0.0, help='время подключения всех сессий, сек')
+    parser.add_argument('--iterations', type=int, default=1, help='повторов сценария после входа')
+    parser.add_argument('--think', type=float, default=1.0, help='пауза пользователя между повторами, сек')
+    parser.add_argument('--data', default='synthetic:1000x30', help='локальные данные сервера')
+    parser.add_argument('--port', type=int, default=8599, help='порт запускаемого сервера')
+    parser.add_argument('--url', default=None, help='адрес уже запущенного сервера (без запуска своего)')
+    parser.add_argument('--pid', type=int, default=None, help='PID уже запущенного сервера для замеров')
+    parser.add_argument('--user', default=LOADTEST_USER)
+    parser.add_argument('--password', default=LOADTEST_PASSWORD)
+    parser.add_argument('--timeout', type=float, default=120, help='ожидание ответа на шаг, сек')
+    parser.add_argument('--output', default=None, help='файл отчёта JSON')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url, pid = args.url, args.pid
+    else:
+        server, url = start_server(args.port, args.data)
+        pid = server.pid
+
+    try:
+        # Прогрев: первая сессия загружает данные и заполняет кэши
+        warmup = Stats()
+        warmup_args = argparse.Namespace(**{**vars(args), 'iterations': 1, 'think': 0})
+        asyncio.run(user_flow(url, warmup, warmup_args, []))
+        if warmup.errors:
+            print(f"Прогрев не удался: {warmup.errors[0]}")
+            sys.exit(1)
+
+        report = build_report(*asyncio.run(run_load(url, args, pid)), args)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    sys.exit(1 if report['failure_rate'] else 0)
+
+
+if __name__ == '__main__':
+    main()
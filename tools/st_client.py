@@ -0,0 +1,147 @@
+"""Минимальный клиент протокола Streamlit по websocket (без браузера).
+
+Клиент делает то же, что страница в браузере:
+- открывает /_stcore/stream;
+- запрашивает перезапуск скрипта с состояниями виджетов;
+- собирает элементы страницы из дельт до сообщения script_finished.
+
+Используется нагрузочным тестом tools/load_test.py.
+
+Требуется пакет websockets (pip install websockets).
+"""
+import asyncio
+import time
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+# Статусы завершения, после которых перезапуск считается выполненным
+FINISHED_STATUSES = (
+    ForwardMsg.FINISHED_SUCCESSFULLY,
+    ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+)
+
+# Виджеты, которые клиент умеет заполнять: тип элемента -> поле значения WidgetState
+WIDGET_TYPES = {
+    'text_input': 'string_value',
+    'selectbox': 'string_value',
+    'button': 'trigger_value',
+}
+
+
+def stream_url(base_url):
+    """Адрес websocket по адресу сервера (http://host:port)"""
+    return base_url.replace('http://', 'ws://').replace('https://', 'wss://').rstrip('/') + '/_stcore/stream'
+
+
+class RunResult:
+    """Итог одного перезапуска: время, принятые байты и сообщения, ошибки страницы"""
+
+    def __init__(self):
+        self.elapsed_ms = 0.0
+        self.bytes = 0
+        self.messages = 0
+        self.exceptions = []
+
+
+class StreamlitClient:
+    """Сессия Streamlit: страницы приложения, текущие виджеты и их значения"""
+
+    def __init__(self, base_url, timeout=120):
+        if websockets is None:
+            raise RuntimeError('Для клиента нужен пакет websockets: pip install websockets')
+        self.url = stream_url(base_url)
+        self.timeout = timeout
+        self.ws = None
+        self.pages = {}           # url_pathname -> page_script_hash
+        self.page_hash = ''
+        self.widgets = {}         # (тип, подпись или ключ) -> proto элемента
+        self.widget_values = {}   # id -> (поле, значение), отправляются при каждом перезапуске
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, subprotocols=['streamlit'], max_size=None)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    def _collect_element(self, element):
+        kind = element.WhichOneof('type')
+        if kind not in WIDGET_TYPES:
+            return
+        widget = getattr(element, kind)
+        self.widgets[(kind, widget.label)] = widget
+        # Ключ виджета — последняя часть id вида ...-<key>
+        if widget.id and '-' in widget.id:
+            self.widgets[(kind, widget.id.rsplit('-', 1)[-1])] = widget
+
+    def _handle(self, msg, result):
+        kind = msg.WhichOneof('type')
+        if kind == 'new_session':
+            self.pages = {page.url_pathname: page.page_script_hash for page in msg.new_session.app_pages}
+            self.page_hash = msg.new_session.page_script_hash
+        elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+            element = msg.delta.new_element
+            if element.WhichOneof('type') == 'exception':
+                result.exceptions.append(element.exception.message)
+            self._collect_element(element)
+        elif kind == 'script_finished':
+            return msg.script_finished in FINISHED_STATUSES
+        return False
+
+    async def rerun(self, triggers=None):
+        """Перезапуск скрипта текущей страницы; triggers — {id: значение} разовых триггеров"""
+        back = BackMsg()
+        state = back.rerun_script
+        state.page_script_hash = self.page_hash
+        for widget_id, (field, value) in self.widget_values.items():
+            widget_state = state.widget_states.widgets.add()
+            widget_state.id = widget_id
+            setattr(widget_state, field, value)
+        for widget_id, value in (triggers or {}).items():
+            widget_state = state.widget_states.widgets.add()
+            widget_state.id = widget_id
+            widget_state.trigger_value = value
+
+        result = RunResult()
+        start = time.perf_counter()
+        await self.ws.send(back.SerializeToString())
+        while True:
+            data = await asyncio.wait_for(self.ws.recv(), self.timeout)
+            result.bytes += len(data)
+            result.messages += 1
+            if self._handle(ForwardMsg.FromString(data), result):
+                break
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    async def open_page(self, url_pathname=''):
+        """Переход на страницу приложения (по адресу страницы, '' — главная)"""
+        if url_pathname and self.pages and url_pathname not in self.pages:
+            raise KeyError(f'Нет страницы {url_pathname!r}; есть: {sorted(self.pages)}')
+        self.page_hash = self.pages.get(url_pathname, '')
+        self.widgets = {}
+        self.widget_values = {}
+        return await self.rerun()
+
+    def widget(self, kind, name):
+        widget = self.widgets.get((kind, name))
+        if widget is None:
+            raise KeyError(f'На странице нет виджета {kind} {name!r}')
+        return widget
+
+    def set_value(self, kind, name, value):
+        """Значение виджета (текст или вариант selectbox в том виде, как он показан)"""
+        widget = self.widget(kind, name)
+        if kind == 'selectbox' and value not in widget.options:
+            raise ValueError(f'Нет варианта {value!r} в {name!r}')
+        self.widget_values[widget.id] = (WIDGET_TYPES[kind], value)
+
+    async def click(self, name):
+        """Нажатие кнопки (по подписи или ключу)"""
+        return await self.rerun({self.widget('button', name).id: True})